@@ -1,85 +1,385 @@
 # bench.py — ultra-light metrics with near-zero hot-path overhead
 from __future__ import annotations
-import os, time, json, threading, queue, math
-from dataclasses import dataclass, asdict
+import os, time, json, threading, math, itertools
+from array import array
 
 BENCH_ENABLED = os.getenv("BENCH", "1") not in ("0", "false", "False", "")
+BENCH_RAW = os.getenv("BENCH_RAW", "1") not in ("0", "false", "False", "")
+BENCH_SUMMARY_S = float(os.getenv("BENCH_SUMMARY_S", "60"))
+BENCH_SINK = os.getenv("BENCH_SINK", "jsonl")   # "jsonl" or "binary" (see bench_binlog.py)
+
+KINDS = ("span", "mark", "value", "summary")
+SPAN, MARK, VALUE, SUMMARY = 0, 1, 2, 3
+_NAN = math.nan
+
+
+class Span:
+    """
+    Context manager timing one block. Reusable: build it once with
+    bench.span(name) and enter it as often as you like, from one thread
+    at a time. Extra tags are fixed when it is created.
+    """
+    __slots__ = ("_bench", "name", "extra", "_start")
+
+    def __init__(self, bench: "Bench", name: str, extra: dict | None):
+        self._bench = bench
+        self.name = name
+        self.extra = extra
+        self._start = 0
+
+    def __enter__(self):
+        self._start = self._bench._now()
+        return None
+
+    def __exit__(self, *exc):
+        b = self._bench
+        end = b._now()
+        b._put(self.name, SPAN, (end - self._start) / 1e9, self.extra, end)
+        return False
+
+
+class Histogram:
+    """
+    Log-bucketed (HDR-style) histogram: SUB buckets per power of two, so
+    any recorded value is within ~3.1% of its bucket's upper edge (worst at
+    the bottom of each octave). Values <= 0 share one bucket; +inf lands in
+    the top one; exponents are clamped to +-EXP_LIMIT, which caps
+    a histogram at a few thousand buckets however long it runs. count, sum,
+    min and max are exact. Histograms with the same layout merge by adding
+    counts, so per-window or per-process snapshots can be combined.
+    """
+    SUB = 32
+    EXP_LIMIT = 40        # 2**-40 .. 2**40 (~1e-12 .. ~1e12)
+    __slots__ = ("counts", "n", "total", "min", "max")
+
+    def __init__(self):
+        self.counts = {}  # bucket index -> count
+        self.n = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    @classmethod
+    def bucket(cls, v: float) -> int:
+        if not v > 0:
+            return -1
+        if v == math.inf:
+            return (2 * cls.EXP_LIMIT + 1) * cls.SUB - 1
+        m, e = math.frexp(v)   # v = m * 2**e, 0.5 <= m < 1
+        if e > cls.EXP_LIMIT:
+            return (2 * cls.EXP_LIMIT + 1) * cls.SUB - 1
+        if e < -cls.EXP_LIMIT:
+            return 0
+        return (e + cls.EXP_LIMIT) * cls.SUB + int((m - 0.5) * 2 * cls.SUB)
+
+    @classmethod
+    def upper_edge(cls, index: int) -> float:
+        if index < 0:
+            return 0.0
+        e, sub = divmod(index, cls.SUB)
+        return math.ldexp(0.5 + (sub + 1) / (2 * cls.SUB), e - cls.EXP_LIMIT)
+
+    def record(self, v: float):
+        i = self.bucket(v)
+        self.counts[i] = self.counts.get(i, 0) + 1
+        self.n += 1
+        self.total += v
+        if v < self.min: self.min = v
+        if v > self.max: self.max = v
+
+    def merge(self, other: "Histogram") -> "Histogram":
+        for i, c in other.counts.items():
+            self.counts[i] = self.counts.get(i, 0) + c
+        self.n += other.n
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def copy(self) -> "Histogram":
+        return Histogram().merge(self)
+
+    def percentile(self, q: float) -> float:
+        """q in [0, 100]; clamped to the exact min/max."""
+        if not self.n:
+            return _NAN
+        target = q / 100 * self.n
+        seen = 0
+        for i in sorted(self.counts):
+            seen += self.counts[i]
+            if seen >= target:
+                return min(max(self.upper_edge(i), self.min), self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        if not self.n:
+            return {"n": 0}
+        return {"n": self.n, "mean": self.total / self.n, "p50": self.percentile(50),
+                "p90": self.percentile(90), "p99": self.percentile(99), "max": self.max}
+
+
+class JsonlSink:
+    """
+    Appends one JSON object per record to path, opened per flush. Sinks take
+    batches of (t_ns, name id, kind, value, extra) tuples plus the Bench's
+    id -> name list, which only ever grows.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._names_json = []   # name id -> JSON-encoded name
+
+    def write(self, records: list, names: list[str]):
+        names_json = self._names_json
+        while len(names_json) < len(names):
+            names_json.append(json.dumps(names[len(names_json)]))
+        line = self._line
+        lines = [line(t_ns, names_json[nid], kind, v, extra) for t_ns, nid, kind, v, extra in records]
+        with open(self.path, "a") as f:
+            f.write("".join(lines))
+
+    def close(self):
+        pass
+
+    @staticmethod
+    def _line(t_ns: int, name_json: str, kind: int, value: float, extra) -> str:
+        v = "null" if value != value else (repr(value) if math.isfinite(value) else json.dumps(value))
+        ex = json.dumps(extra, separators=(",", ":"), default=str) if extra else "{}"
+        return (f'{{"t_ns":{t_ns},"name":{name_json},"kind":"{KINDS[kind]}","value":{v},'
+                f'"extra":{ex},"t":{t_ns / 1e9}}}\n')
+
+
+def make_sink(kind: str, path: str):
+    if kind == "jsonl":
+        return JsonlSink(path)
+    if kind == "binary":
+        from bench_binlog import BinarySink
+        return BinarySink(path)
+    raise ValueError(f"Unknown bench sink {kind!r} (use 'jsonl' or 'binary')")
+
+
+class _NullSpan:
+    __slots__ = ()
+    def __enter__(self): return None
+    def __exit__(self, *exc): return False
+
+_NULL_SPAN = _NullSpan()
 
-@dataclass
-class Point:
-    t_ns: int
-    name: str
-    kind: str          # "span","mark","value"
-    value: float|None  # seconds for spans/marks, arbitrary for values
-    extra: dict
 
 class Bench:
-    def __init__(self, flush_path="/tmp/buttontalk_metrics.jsonl", flush_interval=2.0, max_queue=5000):
-        self.enabled = BENCH_ENABLED
-        self.q = queue.SimpleQueue() if self.enabled else None
+    """
+    Metrics go into a preallocated ring of fixed-width records: parallel
+    arrays for timestamp, interned name id + kind and value, plus a slot for
+    the (usually empty) extra dict. A full ring drops new records and counts
+    them (self.dropped) instead of growing; the flusher thread drains it in
+    bulk every flush_interval seconds and hands the batch to the sink:
+    JSONL appended to flush_path, or with sink="binary" (BENCH_SINK=binary)
+    struct-packed segments next to it, see bench_binlog.py. Any object with
+    write(records, names) and close() can be passed as the sink too.
+
+    While draining, every span and value also lands in a Histogram per name
+    (off the hot path). Every summary_interval seconds each name that saw
+    data gets one compact "summary" record (n, mean, p50/p90/p99, max for
+    that window, plus "of", the kind summarised), and snapshot() returns
+    the histograms since start. With raw=False (BENCH_RAW=0) only the
+    summaries are written, so the file grows by a few lines per name per
+    interval however busy the box is.
+
+    Writers take no lock: next() on an itertools.count hands out slots
+    atomically under the GIL, and a slot's sequence number is written last
+    to publish it. The flusher stops at the first unpublished slot and
+    picks it up next time.
+    """
+
+    def __init__(self, flush_path="/tmp/buttontalk_metrics.jsonl", flush_interval=2.0, max_queue=16384,
+                 enabled: bool | None = None, summary_interval: float = BENCH_SUMMARY_S, raw: bool = BENCH_RAW,
+                 sink=BENCH_SINK):
+        self.enabled = BENCH_ENABLED if enabled is None else enabled
         self.flush_path = flush_path
+        self.sink = make_sink(sink, flush_path) if isinstance(sink, str) else sink
         self.flush_interval = flush_interval
-        self._stop = False
+        self.summary_interval = summary_interval
+        self.raw = raw
+        self._window = {}      # name id -> Histogram since the last summary
+        self._totals = {}      # name id -> Histogram of earlier windows
+        self._kinds = {}       # name id -> kind it was first recorded as (summaries say "of")
+        self._last_summary = time.monotonic()
+        self.capacity = max_queue
+        self.dropped = 0
+        self._dropped_reported = 0
+        self._stop = threading.Event()
         self._thread = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        # name interning: id -> name, name -> id
+        self._names = []
+        self._ids = {}
+        # the ring; _read/_write count records ever consumed/produced
+        if self.enabled:
+            self._seqs = array("q", [-1]) * max_queue   # sequence number published in each slot
+            self._t = array("q", bytes(8 * max_queue))
+            self._meta = array("i", bytes(4 * max_queue))  # name id << 2 | kind
+            self._val = array("d", bytes(8 * max_queue))
+            self._extra = [None] * max_queue
+        self._seq = itertools.count()
+        self._read = 0
+        self._write = 0   # approximate (racy) count produced, only used for the full check
         # cache monotonic to avoid attribute lookup in hot path
         self._now = time.perf_counter_ns
 
     # ---------- Hot-path API (all branch-predicted no-ops when disabled) ----------
     def mark(self, name: str, **extra):
         if not self.enabled: return
-        self.q.put(Point(self._now(), name, "mark", None, extra))
+        self._put(name, MARK, _NAN, extra, self._now())
 
     def value(self, name: str, v: float, **extra):
         if not self.enabled: return
-        self.q.put(Point(self._now(), name, "value", float(v), extra))
+        self._put(name, VALUE, float(v), extra, self._now())
 
     def span(self, name: str, **extra):
-        """Usage: with bench.span('stt.record'): ..."""
-        if not self.enabled:
-            class _Null: 
-                def __enter__(self): return None
-                def __exit__(self, *a): return False
-            return _Null()
-        start_ns = self._now()
-        def _exit(exc_type, exc, tb):
-            dur_s = (self._now() - start_ns) / 1e9
-            self.q.put(Point(self._now(), name, "span", dur_s, extra))
-            return False
-        class _Ctx:
-            def __enter__(self): return None
-            def __exit__(self, *a): return _exit(*a)
-        return _Ctx()
+        """Usage: with bench.span('stt.record'): ... (the returned Span can be reused)"""
+        if not self.enabled: return _NULL_SPAN
+        return Span(self, name, extra)
+
+    def _intern(self, name: str) -> int:
+        with self._lock:
+            nid = self._ids.get(name)
+            if nid is None:
+                nid = len(self._names)
+                self._names.append(name)
+                self._ids[name] = nid
+            return nid
+
+    def _put(self, name: str, kind: int, value: float, extra, t_ns: int):
+        nid = self._ids.get(name)
+        if nid is None:
+            nid = self._intern(name)
+        if self._write - self._read >= self.capacity:
+            self.dropped += 1
+            return
+        w = next(self._seq)
+        i = w % self.capacity
+        self._t[i] = t_ns
+        self._meta[i] = nid << 2 | kind
+        self._val[i] = value
+        self._extra[i] = extra or None
+        self._seqs[i] = w
+        self._write = w + 1
 
     # ---------- Background flush ----------
     def start(self):
         if not self.enabled or self._thread: return
-        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="bench-flush", daemon=True)
         self._thread.start()
 
     def stop(self):
-        self._stop = True
-        if self._thread: self._thread.join(timeout=1.0)
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self.enabled:
+            self.summarize()
+            self.sink.close()
 
     def _run(self):
-        buf = []
-        last = time.time()
-        while not self._stop:
-            try:
-                p = self.q.get(timeout=0.2)
-                buf.append(p)
-            except Exception:
-                pass
-            now = time.time()
-            if buf and (now - last) >= self.flush_interval:
-                # write once per interval to minimise I/O
-                with open(self.flush_path, "a") as f:
-                    for pt in buf:
-                        rec = asdict(pt)
-                        # convert ns timestamp + keep as seconds too
-                        rec["t"] = pt.t_ns / 1e9
-                        rec["t_ns"] = pt.t_ns
-                        f.write(json.dumps(rec, separators=(",",":")) + "\n")
-                buf.clear()
-                last = now
+        while not self._stop.wait(self.flush_interval):
+            if time.monotonic() - self._last_summary >= self.summary_interval:
+                self.summarize()
+            else:
+                self.flush()
+
+    def summarize(self):
+        """Write one summary record per name seen since the last one, then start a new window."""
+        if not self.enabled: return
+        self.flush()
+        with self._flush_lock:
+            now = time.monotonic()
+            window_s = round(now - self._last_summary, 3)
+            self._last_summary = now
+            t_ns = self._now()
+            records = []
+            for nid, hist in self._window.items():
+                if not hist.n:
+                    continue
+                records.append((t_ns, nid, SUMMARY, float(hist.n),
+                                dict(hist.summary(), window_s=window_s, of=KINDS[self._kinds.get(nid, VALUE)])))
+                total = self._totals.get(nid)
+                if total is None:
+                    self._totals[nid] = hist
+                else:
+                    total.merge(hist)
+            self._window = {}
+            if records:
+                self.sink.write(records, self._names)
+
+    def snapshot(self) -> dict[str, Histogram]:
+        """Independent copies of each name's histogram since start; merge() them across runs or processes."""
+        if not self.enabled: return {}
+        self.flush()
+        with self._flush_lock:
+            out = {}
+            for nid in set(self._totals) | set(self._window):
+                hist = Histogram()
+                for part in (self._totals.get(nid), self._window.get(nid)):
+                    if part is not None:
+                        hist.merge(part)
+                out[self._names[nid]] = hist
+            return out
+
+    def flush(self):
+        """Drain everything published so far to the sink in one write."""
+        if not self.enabled: return
+        with self._flush_lock:
+            records, r, lost = self._drain()
+            self.dropped += lost
+            dropped = self.dropped - self._dropped_reported
+            self._dropped_reported += dropped
+            if dropped:
+                records.append((self._now(), self._intern("bench.dropped"), VALUE, float(dropped), None))
+            self._read = r
+            if records:
+                self.sink.write(records, self._names)
+
+    def _drain(self) -> tuple[list[tuple], int, int]:
+        cap = self.capacity
+        seqs, t, meta, val, extra = self._seqs, self._t, self._meta, self._val, self._extra
+        raw = self.raw
+        window = self._window
+        records = []
+        lost = 0
+        r = self._read
+        while True:
+            i = r % cap
+            seq = seqs[i]
+            if seq < r:
+                break                      # not published yet
+            if seq > r:
+                lost += 1                  # overwritten by a racing writer near full
+                r += 1
+                continue
+            m = meta[i]
+            kind = m & 3
+            v = val[i]
+            if kind != MARK and v == v:
+                hist = window.get(m >> 2)
+                if hist is None:
+                    hist = window[m >> 2] = Histogram()
+                    self._kinds.setdefault(m >> 2, kind)
+                hist.record(v)
+            if raw:
+                records.append((t[i], m >> 2, kind, v, extra[i]))
+            extra[i] = None
+            r += 1
+        return records, r, lost
 
 bench = Bench()
+
+
+if __name__ == "__main__":
+    import sys
+    if sys.argv[1:2] == ["report"]:
+        from bench_report import main
+        sys.exit(main(sys.argv[2:]))
+    print("usage: python -m bench report PATH [--compare NEW] [...]  (see python -m bench report -h)")
+    sys.exit(2)
@@ -0,0 +1,271 @@
+# bench_report.py — read bench.py's JSONL: percentile tables and run-to-run regression checks
+"""
+Usage (from the project root):
+  python -m bench report /tmp/buttontalk_metrics.jsonl
+  python -m bench report metrics.jsonl --prefix test. --run-mark test.start
+  python -m bench report base.jsonl --compare new.jsonl --threshold 0.10 --alpha 0.01
+  python -m bench report /tmp/buttontalk_metrics.bin   # BENCH_SINK=binary segments
+
+Files (JSONL, or bench_binlog segments) are streamed record by record; each
+metric keeps a bounded Histogram plus a fixed-size random sample for the
+significance test, so memory does not grow with file size. --compare exits
+with status 1 when any gated metric's median moved the wrong way by more
+than --threshold and a one-sided Mann-Whitney U test says the shift is
+significant at --alpha. Latencies (spans, *_s, *_ms) regress upwards,
+rates (*_per_s, hits) downwards; other values are shown but not gated.
+
+Files written with BENCH_RAW=0 only hold per-window summary records. Metrics
+with no raw records are rebuilt from those: n and max are exact, mean and
+percentiles are n-weighted averages over windows (kind column "summ"), and
+the significance test compares window medians. --compare exits with status 2
+when the two runs share no metrics, and a --run-mark that never occurs is
+an error.
+"""
+from __future__ import annotations
+import sys, json, math, random, argparse
+
+import bench_binlog
+from bench import Histogram
+
+SAMPLE_SIZE = 4096
+RATE_SUFFIXES = ("_per_s", "_hits", ".hit", "hit_rate")
+LATENCY_SUFFIXES = ("_s", "_ms")
+
+
+def direction(name: str, kind: str) -> int:
+    """+1 when a larger value is worse (latency), -1 when it is better (rate), 0 when not gated."""
+    if name.endswith(RATE_SUFFIXES):
+        return -1
+    if kind == "span" or name.endswith(LATENCY_SUFFIXES):
+        return 1
+    return 0
+
+
+def in_seconds(name: str, kind: str) -> bool:
+    return kind == "span" or (name.endswith("_s") and not name.endswith("_per_s"))
+
+
+class Series:
+    """
+    One metric in one run: histogram for percentiles, reservoir sample for
+    tests; or, when only summary records were written, the list of windows.
+    """
+    __slots__ = ("kind", "hist", "sample", "windows", "_rng")
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.hist = Histogram()
+        self.sample = []
+        self.windows = []   # summary extras; ignored once raw records exist
+        self._rng = random.Random(0)
+
+    @property
+    def summarized(self) -> bool:
+        return not self.hist.n and bool(self.windows)
+
+    @property
+    def n(self) -> int:
+        return sum(w["n"] for w in self.windows) if self.summarized else self.hist.n
+
+    def _weighted(self, key: str) -> float:
+        total = sum(w["n"] for w in self.windows)
+        return sum(w[key] * w["n"] for w in self.windows) / total if total else math.nan
+
+    def mean(self) -> float:
+        if self.summarized:
+            return self._weighted("mean")
+        return self.hist.total / self.hist.n if self.hist.n else math.nan
+
+    def percentile(self, q: int) -> float:
+        """q of 50, 90 or 99 when built from summaries."""
+        return self._weighted(f"p{q}") if self.summarized else self.hist.percentile(q)
+
+    def max(self) -> float:
+        return max(w["max"] for w in self.windows) if self.summarized else self.hist.max
+
+    def test_sample(self) -> list[float]:
+        return [w["p50"] for w in self.windows] if self.summarized else self.sample
+
+    def add(self, v: float):
+        self.hist.record(v)
+        if len(self.sample) < SAMPLE_SIZE:
+            self.sample.append(v)
+        else:
+            j = self._rng.randrange(self.hist.n)
+            if j < SAMPLE_SIZE:
+                self.sample[j] = v
+
+
+def iter_records(path: str):
+    """Records from a JSONL file or from binary segments (bench_binlog), as dicts."""
+    if bench_binlog.is_binlog(path):
+        yield from bench_binlog.iter_records(path)
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue                      # torn last line of a live file
+
+
+def _last_mark(path: str, mark: str) -> int:
+    last = None
+    for n, rec in enumerate(iter_records(path)):
+        if rec.get("name") == mark:
+            last = n
+    if last is None:
+        raise ValueError(f"run mark {mark!r} not found in {path}")
+    return last
+
+
+def read_series(path: str, prefix: str = "", run_mark: str | None = None) -> dict[str, Series]:
+    """Spans, values and summaries per name; with run_mark, only what follows its last occurrence."""
+    start = _last_mark(path, run_mark) if run_mark else 0
+    series = {}
+    for n, rec in enumerate(iter_records(path)):
+        if n < start:
+            continue
+        kind, name, v = rec.get("kind"), rec.get("name", ""), rec.get("value")
+        if kind not in ("span", "value", "summary") or v is None or not name.startswith(prefix):
+            continue
+        extra = rec.get("extra") or {}
+        s = series.get(name)
+        if s is None:
+            s = series[name] = Series(extra.get("of", "value") if kind == "summary" else kind)
+        if kind == "summary":
+            if extra.get("n"):
+                s.windows.append(extra)
+        else:
+            s.add(float(v))
+    return series
+
+
+def _fmt(v: float, seconds: bool) -> str:
+    if v != v:
+        return "-"
+    if seconds:
+        return f"{v * 1000:.1f}ms" if abs(v) < 10 else f"{v:.2f}s"
+    return f"{v:.4g}"
+
+
+def print_table(series: dict[str, Series], out=None):
+    out = out or sys.stdout
+    groups = {}
+    for name in sorted(series):
+        groups.setdefault(name.split(".", 1)[0], []).append(name)
+    width = max([len(n) for n in series] + [10])
+    for group, names in groups.items():
+        print(f"\n[{group}]", file=out)
+        print(f"  {'metric':<{width}} {'kind':<5} {'n':>6} {'mean':>9} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}",
+              file=out)
+        for name in names:
+            s = series[name]
+            sec = in_seconds(name, s.kind)
+            cells = [s.mean(), s.percentile(50), s.percentile(90), s.percentile(99), s.max()]
+            kind = "summ" if s.summarized else s.kind
+            print(f"  {name:<{width}} {kind:<5} {s.n:>6} " + " ".join(f"{_fmt(c, sec):>9}" for c in cells),
+                  file=out)
+
+
+def mann_whitney_greater(base: list[float], new: list[float]) -> float:
+    """One-sided p-value that `new` tends to be larger than `base` (normal approximation, tie-corrected)."""
+    n1, n2 = len(base), len(new)
+    if not n1 or not n2:
+        return 1.0
+    pooled = sorted([(v, 0) for v in base] + [(v, 1) for v in new])
+    rank_new = 0.0
+    tie_term = 0.0
+    i = 0
+    while i < len(pooled):
+        j = i
+        while j + 1 < len(pooled) and pooled[j + 1][0] == pooled[i][0]:
+            j += 1
+        rank = (i + j) / 2 + 1
+        t = j - i + 1
+        tie_term += t ** 3 - t
+        rank_new += rank * sum(1 for k in range(i, j + 1) if pooled[k][1])
+        i = j + 1
+    u = rank_new - n2 * (n2 + 1) / 2
+    n = n1 + n2
+    var = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1))) if n > 1 else 0.0
+    if var <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(var)   # continuity correction
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def compare(base: dict[str, Series], new: dict[str, Series], threshold: float, alpha: float,
+            min_samples: int, out=None) -> list[str]:
+    """Prints a diff table; returns the names that regressed."""
+    out = out or sys.stdout
+    regressions = []
+    names = sorted(set(base) & set(new))
+    width = max([len(n) for n in names] + [10])
+    print(f"\n  {'metric':<{width}} {'base p50':>9} {'new p50':>9} {'change':>8} {'base p90':>9} {'new p90':>9} "
+          f"{'p-value':>8}", file=out)
+    for name in names:
+        b, nw = base[name], new[name]
+        sec = in_seconds(name, b.kind)
+        b50, n50 = b.percentile(50), nw.percentile(50)
+        change = (n50 - b50) / abs(b50) if b50 else math.nan
+        d = direction(name, b.kind)
+        bs, ns = b.test_sample(), nw.test_sample()
+        if d > 0:
+            p = mann_whitney_greater(bs, ns)    # new slower?
+        elif d < 0:
+            p = mann_whitney_greater(ns, bs)    # new lower rate?
+        else:
+            p = math.nan
+        flag = ""
+        if (d and len(bs) >= min_samples and len(ns) >= min_samples
+                and change == change and change * d > threshold and p < alpha):
+            flag = "  REGRESSION"
+            regressions.append(name)
+        p_cell = f"{p:>8.4f}" if p == p else f"{'-':>8}"
+        print(f"  {name:<{width}} {_fmt(b50, sec):>9} {_fmt(n50, sec):>9} {change:>+8.1%} "
+              f"{_fmt(b.percentile(90), sec):>9} {_fmt(nw.percentile(90), sec):>9} {p_cell}{flag}",
+              file=out)
+    only = sorted(set(base) ^ set(new))
+    if only:
+        print(f"\n  only in one run: {', '.join(only)}", file=out)
+    return regressions
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m bench report", description=__doc__.split("\n\n")[0])
+    ap.add_argument("path", help="Metrics JSONL or binlog path (the baseline when --compare is given)")
+    ap.add_argument("--compare", metavar="NEW", help="Second run to check against PATH")
+    ap.add_argument("--prefix", default="", help="Only metrics whose name starts with this")
+    ap.add_argument("--run-mark", default=None, help="Only records after the last mark with this name, e.g. test.start")
+    ap.add_argument("--threshold", type=float, default=0.10, help="Median slowdown that counts (0.10 = 10%%)")
+    ap.add_argument("--alpha", type=float, default=0.01, help="Significance level")
+    ap.add_argument("--min-samples", type=int, default=5,
+                    help="Per run: values, or summary windows when only summaries were written")
+    args = ap.parse_args(argv)
+
+    try:
+        base = read_series(args.path, args.prefix, args.run_mark)
+        new = read_series(args.compare, args.prefix, args.run_mark) if args.compare else None
+    except ValueError as e:
+        ap.error(str(e))
+    except OSError as e:
+        ap.error(f"can't read {e.filename or args.path}: {e.strerror or e}")
+    if new is None:
+        print_table(base)
+        return 0
+    if not set(base) & set(new):
+        print(f"\n❌ No metrics in common between {args.path} and {args.compare}")
+        return 2
+    regressions = compare(base, new, args.threshold, args.alpha, args.min_samples)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("\n✅ No significant regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
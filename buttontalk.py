@@ -11,26 +11,34 @@ A voice-triggered local assistant using:
 Now with: coloured logs + backlight pulse for "thinking"
 """
 
-from gpiozero import Button
-from gpiozero.pins.lgpio import LGPIOFactory
 from signal import pause
 from pathlib import Path
-import os, sys, time, wave, queue, re, json, subprocess, shutil, signal, logging
-import sounddevice as sd
-from vosk import Model, KaldiRecognizer
+from typing import TYPE_CHECKING
+import os, sys, time, signal, logging, threading
 from colorama import Fore, Style, init as color_init
-from piper_tts import synthesize_to_file
+from piper_tts import synthesize_stream, voice_fingerprint, get_voice, PcmChunk
 from modules.llm_handler import LLMHandler
-from modules.display_handler import DisplayHandler
+from modules.streaming_stt import StreamingTranscriber
+from modules.capture_buffer import CaptureBuffer
+from modules.speech_pipeline import SpeechPipeline
+from modules.segmenter import SentenceSegmenter
+from modules.audio_player import AudioPlayer
+from modules.tts_cache import TTSCache
+from modules.conversation import ConversationManager
+from modules.warmup import Warmup, STARTING, ALL_READY, FAILED
+from modules.turn_trace import TurnTrace
 import argparse
 
 from bench import bench
 
+# gpiozero, sounddevice, Vosk and the display driver are imported where they
+# are first used, so importing this module (tests, harness) stays cheap.
+if TYPE_CHECKING:
+    from gpiozero import Button
+
 # === Setup ===
 bench.start()  # background flusher
 
-sd.default.latency = ('low', 'low')  # ask nicely for small buffers
-
 color_init(autoreset=True)
 logging.basicConfig(
     level=logging.INFO,
@@ -39,45 +47,105 @@ logging.basicConfig(
 )
 
 PROJECT_ROOT = Path(__file__).resolve().parent
-TMP_AUDIO = PROJECT_ROOT / "tts_output"
-TMP_AUDIO.mkdir(parents=True, exist_ok=True)
+TMP_AUDIO = PROJECT_ROOT / "tts_output"   # created on first use
 MODEL_PATH = str(PROJECT_ROOT / "models" / "vosk-model-small-en-us-0.15")
 SAMPLE_RATE = 16000
 BLOCK_SIZE = 2048
-PAUSE = 1.0
+MAX_RECORD_SECONDS = float(os.getenv("MAX_RECORD_SECONDS", "30"))
+SAVE_RECORDING = os.getenv("SAVE_RECORDING") == "1"  # keep tts_output/recording.wav for debugging
+VAD_TAIL_MS = int(os.getenv("VAD_TAIL_MS", "300"))         # hands-free: silence that ends an utterance
+VAD_PREROLL_MS = int(os.getenv("VAD_PREROLL_MS", "200"))   # audio kept from before the detected onset
+# Inter-sentence pause, inserted into the output stream as silence samples
+PAUSE_SAMPLES = int(os.getenv("TTS_PAUSE_SAMPLES", "5500"))  # ~0.25 s at Piper's 22.05 kHz
+TTS_SPLIT_CLAUSES = os.getenv("TTS_SPLIT_CLAUSES") == "1"    # earlier first audio, flatter prosody
+# Streamed reply -> speakable chunks: the first one may end at a comma once it
+# has this many words (0 = whole sentences only); nothing longer than MAX_CHARS
+SEGMENT_CLAUSE_WORDS = int(os.getenv("SEGMENT_CLAUSE_WORDS", "6"))
+SEGMENT_MAX_CHARS = int(os.getenv("SEGMENT_MAX_CHARS", "200"))
+TTS_CACHE_MB = int(os.getenv("TTS_CACHE_MB", "64"))           # 0 disables the phrase cache
+
+HELLO = "Hello! I'm ready when you are."
+NO_INPUT = "I didn’t catch anything. Please try again."
+ONLINE = "Hello! I'm online and ready to hang out."
+GOODBYE = "Goodbye!"
+NOT_READY = "Sorry, my brain is still waking up. Try again in a moment."
+CANNED_PHRASES = [HELLO, NO_INPUT, ONLINE, GOODBYE, NOT_READY]
+LLM_READY_TIMEOUT = float(os.getenv("LLM_READY_TIMEOUT", "60"))
+RETRY_WAIT_S = float(os.getenv("RETRY_WAIT_S", "10"))   # a turn's wait for a failed component's reload
+
+capture = CaptureBuffer(SAMPLE_RATE, max_seconds=MAX_RECORD_SECONDS)
+
+tts_cache = None   # ensure_tts_cache(): reading the voice config must not happen at import
 
 vosk_model = None
 llm = None
-conversation = [{"role": "system", "content": "You are a helpful and friendly AI assistant. Your main nterface is over voice, so keep things consise and do not use emojis or anything that will confuse the synthetic speech engine. Keep your answers brief and to the point. Rather ask the user if he or she would like to know more, but even so - keep things short and snappy"}]
+SYSTEM_PROMPT = "You are a helpful and friendly AI assistant. Your main nterface is over voice, so keep things consise and do not use emojis or anything that will confuse the synthetic speech engine. Keep your answers brief and to the point. Rather ask the user if he or she would like to know more, but even so - keep things short and snappy"
+CONTEXT_TOKENS = int(os.getenv("CONTEXT_TOKENS", "1200"))  # prompt budget; older turns get summarised
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "ollama")
+LLM_MODEL = os.getenv("LLM_MODEL", "gemma3:1b")
+# Optional "provider:model" to hedge with, e.g. groq:llama-3.1-8b-instant
+LLM_HEDGE = os.getenv("LLM_HEDGE", "")
+HEDGE_DEADLINE_S = float(os.getenv("HEDGE_DEADLINE_S", "1.5"))  # until TTFT history takes over
+# Ollama: keep the model loaded between turns, and ping it while idle so the
+# system prompt stays in its prompt cache (ping interval < keep-alive)
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+KEEP_WARM_S = float(os.getenv("KEEP_WARM_S", "600"))    # 0 disables the idle pings
+# Semantic answer cache: needs an Ollama embedding model (`ollama pull nomic-embed-text`)
+SEMANTIC_CACHE = os.getenv("SEMANTIC_CACHE") == "1"
+EMBED_MODEL = os.getenv("EMBED_MODEL", "nomic-embed-text")
+SEMANTIC_THRESHOLD = float(os.getenv("SEMANTIC_THRESHOLD", "0.92"))
+conversation = ConversationManager(SYSTEM_PROMPT, budget_tokens=CONTEXT_TOKENS)
 
 # === Utility functions ===
 def print_banner(text, color=Fore.CYAN):
     border = f"{color}{'═' * (len(text) + 4)}{Style.RESET_ALL}"
     print(f"\n{border}\n{color}║ {text} ║{Style.RESET_ALL}\n{border}\n")
 
-def speak(text: str, filename: str):
-    """Convert text to speech and play."""
+def ensure_player():
+    global player
+    if player is None:
+        TMP_AUDIO.mkdir(parents=True, exist_ok=True)
+        player = AudioPlayer(pause_samples=PAUSE_SAMPLES, fallback_dir=TMP_AUDIO)
+    return player
+
+
+def synthesize(text: str):
+    """Start rendering text; returns an iterator of PcmChunk, or None when TTS is muted."""
     if os.getenv("TTS_MUTE") == "1":
         logging.info(f"(TTS muted) {text}")
-        return  
-    path = TMP_AUDIO / filename
-    synthesize_to_file(text, path)
+        return None
     logging.info(f"🔊 Speaking: {text}")
+    cache = ensure_tts_cache()
+    if cache is not None:
+        return cache.synthesize(text, render)
+    return render(text)
 
-    if shutil.which("paplay"):
-        cmd = ["paplay", str(path)]
-    else:
-        dev = os.getenv("APLAY_DEVICE", "default")
-        cmd = ["aplay", "-q", "-D", dev, str(path)]
 
-    subprocess.run(cmd, capture_output=True, text=True)
-    time.sleep(PAUSE)
+def render(text: str):
+    return synthesize_stream(text, split_clauses=TTS_SPLIT_CLAUSES)
+
+
+def play(chunk: PcmChunk):
+    ensure_player().play(chunk.pcm, chunk.sample_rate)
+
+
+def speak(text: str, trace: TurnTrace | None = None):
+    """Convert text to speech and play."""
+    chunks = synthesize(text)
+    if chunks is None:
+        return
+    for chunk in chunks:
+        if trace:
+            trace.stamp("first_audio")
+        play(chunk)
+    ensure_player().pause()
 
 
 def init_models():
     global vosk_model, llm
     if vosk_model is None:
         print_banner("🧠 Loading Vosk model...", Fore.YELLOW)
+        from vosk import Model
         vosk_model = Model(MODEL_PATH)
     if llm is None:
         print_banner("🤖 Initialising LLM handler...", Fore.MAGENTA)
@@ -87,119 +155,245 @@ def init_models():
         display.write("Ready, using ollama")
 
 
-def transcribe_recording(wav_path: Path) -> str:
-    rec = KaldiRecognizer(vosk_model, SAMPLE_RATE)
-    with wave.open(str(wav_path), "rb") as wf:
-        while True:
-            data = wf.readframes(4000)
-            if not data:
-                break
-            rec.AcceptWaveform(data)
-    result = json.loads(rec.FinalResult())
-    text = result.get("text", "").strip()
-    display.write(text)
-    logging.info(f"📝 Transcribed: {text}")
-    return text
-
-
-def record_audio_while_pressed(button: Button):
-    q = queue.Queue()
-    rec_file = TMP_AUDIO / "recording.wav"
-
-    def callback(indata, frames, time_info, status):
-        q.put(bytes(indata))
+def record_audio_while_pressed(button: "Button", on_block=None):
+    """
+    Record into the preallocated capture buffer while the button is held;
+    on_block(view) sees each new stretch of audio as a memoryview.
+    """
+    import sounddevice as sd
+    sd.default.latency = ('low', 'low')  # ask nicely for small buffers
+    capture.reset()
 
     with sd.RawInputStream(
         samplerate=SAMPLE_RATE,
         blocksize=BLOCK_SIZE,
         dtype="int16",
         channels=1,
-        callback=callback,
-    ), wave.open(str(rec_file), "wb") as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)
-        wf.setframerate(SAMPLE_RATE)
+        callback=capture.callback,
+    ):
         print(Fore.CYAN + "🎙️ Recording… hold button to talk." + Style.RESET_ALL)
         start = time.time()
         while button.is_pressed:
-            wf.writeframes(q.get())
+            chunk = capture.read(timeout=0.05)
+            if chunk is not None and on_block:
+                on_block(chunk)
+        released_ns = time.perf_counter_ns()
+
+    # Audio that landed between the last read and the stream closing
+    chunk = capture.read(timeout=0)
+    if chunk is not None and on_block:
+        on_block(chunk)
 
     duration = time.time() - start
+    capture.report(duration_s=round(duration, 3))
+    if SAVE_RECORDING:
+        TMP_AUDIO.mkdir(parents=True, exist_ok=True)
+        capture.save_wav(TMP_AUDIO / "recording.wav")
     print(Fore.CYAN + f"🛑 Recording stopped ({duration:.2f}s)" + Style.RESET_ALL)
-    return rec_file, duration
+    return capture, duration, released_ns
+
+
+def record_and_transcribe(button: "Button", trace: TurnTrace | None = None):
+    """Record while pressed, decoding on the fly; returns (text, duration)."""
+    d = ensure_display()
+    stt = StreamingTranscriber(
+        ensure_vosk_model(), SAMPLE_RATE,
+        on_partial=lambda part: d.async_write(part[-32:]),
+    )
+    _, duration, released_ns = record_audio_while_pressed(button, on_block=stt.accept)
+    if trace:
+        trace.stamp("release", released_ns)
+    if duration < 0.5:
+        return "", duration
+
+    text = stt.finish()
+    if trace:
+        trace.stamp("transcript")
+    bench.value("stt.release_to_transcript_s", (time.perf_counter_ns() - released_ns) / 1e9,
+                audio_s=round(duration, 3), blocks=stt.blocks, text_len=len(text))
+    d.write(text)
+    logging.info(f"📝 Transcribed: {text}")
+    return text, duration
+
 
+def listen_for_utterance(trace: TurnTrace | None = None):
+    """
+    Hands-free capture: wait for speech, decode it on the fly and close the
+    utterance once the VAD has heard VAD_TAIL_MS of silence. Returns the text.
+    With a trace, speech onset stands in for the press and the endpoint for
+    the release.
+    """
+    import sounddevice as sd
+    from modules.vad import VoiceActivityDetector, SPEECH_END
 
-def stream_and_speak(conversation, llm, tmp_audio_dir, prefix="response", temperature=0.7):
-    """Stream the LLM response and speak sentence by sentence."""
-    buffer = ""
-    sentence_id = 0
+    d = ensure_display()
+    vad = VoiceActivityDetector(SAMPLE_RATE, tail_ms=VAD_TAIL_MS)
+    preroll = int(SAMPLE_RATE * VAD_PREROLL_MS / 1000) * 2
+    while True:
+        # One session per buffer: reopen rather than rewind under the callback
+        capture.reset()
+        vad.reset()
+        stt = None
+        with sd.RawInputStream(
+            samplerate=SAMPLE_RATE,
+            blocksize=BLOCK_SIZE,
+            dtype="int16",
+            channels=1,
+            callback=capture.callback,
+        ):
+            while not capture.full:
+                chunk = capture.read(timeout=0.05)
+                if chunk is None:
+                    continue
+                event = vad.accept(chunk)
+                if stt is None:
+                    if not vad.in_speech:
+                        continue
+                    print(Fore.CYAN + "🎙️ Speech detected…" + Style.RESET_ALL)
+                    onset_ns = time.perf_counter_ns()
+                    stt = StreamingTranscriber(
+                        ensure_vosk_model(), SAMPLE_RATE,
+                        on_partial=lambda part: d.async_write(part[-32:]),
+                    )
+                    # Start a little before the onset so the first phoneme isn't clipped
+                    start = max(0, vad.speech_start_sample * 2 - preroll)
+                    chunk = capture.replay(start)
+                stt.accept(chunk)
+                if event == SPEECH_END:
+                    break
+        ended_ns = time.perf_counter_ns()
+        capture.report(mode="hands_free")
+        if stt is None:
+            continue  # buffer filled with silence; listen again
+
+        text = stt.finish()
+        bench.value("stt.endpoint_to_transcript_s", (time.perf_counter_ns() - ended_ns) / 1e9,
+                    audio_s=round(capture.duration, 3), blocks=stt.blocks, text_len=len(text))
+        if text:
+            if trace:
+                trace.stamp("press", onset_ns)
+                trace.stamp("release", ended_ns)
+                trace.stamp("transcript")
+            d.write(text)
+            logging.info(f"📝 Transcribed: {text}")
+            return text
+
+
+def stream_and_speak(conversation, llm, temperature=0.7, trace: TurnTrace | None = None):
+    """
+    Stream the LLM response and speak it chunk by chunk (see SentenceSegmenter).
+    Synthesis and playback run in SpeechPipeline workers, so reading tokens
+    never waits for audio and sentence N+1 renders while N plays. A trace gets
+    llm_request, first_token, first_sentence and (from the pipeline)
+    first_audio stamped, plus each sentence's synthesis and playback time.
+    """
     full_response_parts = []
-    pattern = re.compile(r"(.*?[\.!?])\s")
+    segmenter = SentenceSegmenter(min_clause_words=SEGMENT_CLAUSE_WORDS, max_chars=SEGMENT_MAX_CHARS)
+    pipeline = SpeechPipeline(synthesize, play, end_item=lambda: ensure_player().pause(), trace=trace)
 
     print(Fore.MAGENTA + "\n🤔 Thinking..." + Style.RESET_ALL)
     display.start_pulse(color=(0, 80, 255), speed=1.8)  # nice blue pulse
 
     display_buffer = ""
-    for chunk in llm.stream(conversation, temperature=temperature):
-        content = chunk.get("content", "")
-        if not content:
-            continue
-
-        # --- Terminal output ---
-        print(Fore.BLUE + content + Style.RESET_ALL, end="", flush=True)
-
-        # --- Update display in real time ---
-        display_buffer += content
-        # Keep only last 32 chars (2×16 LCD)
-        truncated = display_buffer[-32:]
-        display.async_write(truncated)
+    if trace:
+        trace.stamp("llm_request")
+    try:
+        for chunk in llm.stream(conversation, temperature=temperature):
+            content = chunk.content
+            if not content:
+                continue
+            if trace and not full_response_parts:
+                trace.stamp("first_token")
+
+            # --- Terminal output ---
+            print(Fore.BLUE + content + Style.RESET_ALL, end="", flush=True)
+
+            # --- Update display in real time ---
+            display_buffer += content
+            # Keep only last 32 chars (2×16 LCD)
+            truncated = display_buffer[-32:]
+            display.async_write(truncated)
+
+            full_response_parts.append(content)
+            for sentence in segmenter.feed(content):
+                if trace:
+                    trace.stamp("first_sentence")
+                pipeline.submit(sentence)
+
+        for rest in segmenter.flush():
+            if trace:
+                trace.stamp("first_sentence")
+            pipeline.submit(rest)
+    finally:
+        display.stop_pulse()  # stop pulsing when response done
+        print(Fore.GREEN + "\n✅ Response complete!\n" + Style.RESET_ALL)
+        pipeline.close()  # wait for the last sentence to finish playing
 
-        buffer += content
-        full_response_parts.append(content)
+    return "".join(full_response_parts).strip()
 
-        while match := pattern.match(buffer):
-            sentence = match.group(1).strip()
-            buffer = buffer[len(match.group(0)) :]
-            if sentence:
-                sentence_id += 1
-                speak(sentence, f"{prefix}_{sentence_id}.wav")
 
-    display.stop_pulse()  # stop pulsing when response done
-    print(Fore.GREEN + "\n✅ Response complete!\n" + Style.RESET_ALL)
+def handle_button_event():
+    pressed_ns = time.perf_counter_ns()
+    if not require("vosk", timeout=0):
+        # Can't transcribe yet; don't record audio nobody will hear
+        ensure_display().async_write("Still waking up…")
+        return
 
-    if buffer.strip():
-        sentence_id += 1
-        speak(buffer.strip(), f"{prefix}_{sentence_id}.wav")
+    trace = TurnTrace("button")
+    trace.stamp("press", pressed_ns)
+    try:
+        spoken_text, duration = record_and_transcribe(button, trace)
 
-    return "".join(full_response_parts).strip()
+        if duration < 0.5:
+            trace.outcome = "hello"
+            speak(HELLO, trace)
+            return
 
+        if not spoken_text:
+            trace.outcome = "no_input"
+            speak(NO_INPUT, trace)
+            return
 
-def handle_button_event():
-    init_models()
+        respond(spoken_text, trace)
+    finally:
+        trace.finish()
 
-    rec_file, duration = record_audio_while_pressed(button)
 
-    if duration < 0.5:
-        speak("Hello! I'm ready when you are.", "welcome.wav")
+def respond(spoken_text: str, trace: TurnTrace | None = None):
+    if not require("llm", timeout=LLM_READY_TIMEOUT):
+        if trace:
+            trace.outcome = "not_ready"
+        speak(NOT_READY, trace)
         return
 
-    spoken_text = transcribe_recording(rec_file)
-    if not spoken_text:
-        speak("I didn’t catch anything. Please try again.", "no_input.wav")
-        return
+    conversation.add("user", spoken_text)
+    response = stream_and_speak(conversation.window(), ensure_answerer(), trace=trace)
+    conversation.add("assistant", response)
+    # Playback is done; summarising old turns now costs the user nothing
+    conversation.compact_async(llm)
 
-    conversation.append({"role": "user", "content": spoken_text})
-    response = stream_and_speak(conversation, llm, TMP_AUDIO)
-    conversation.append({"role": "assistant", "content": response})
+
+def hands_free_loop():
+    """Listen, answer, repeat — no button. The mic is closed while we speak."""
+    require("vosk", timeout=None)
+    while True:
+        ensure_display().async_write("Listening…")
+        trace = TurnTrace("hands_free")
+        try:
+            respond(listen_for_utterance(trace), trace)
+        finally:
+            trace.finish()
 
 
 def shutdown_handler(sig, frame):
     print_banner("🧹 Shutting down gracefully…", Fore.YELLOW)
     display.off()
     try:
-        speak("Goodbye!", "goodbye.wav")
+        speak(GOODBYE)
+        ensure_player().drain()
     except Exception:
         pass
+    bench.stop()  # last flush + percentile summaries
     sys.exit(0)
 
 
@@ -209,6 +403,7 @@ signal.signal(signal.SIGINT, shutdown_handler)
 pin_factory = None
 button = None
 display = None
+player = None
 
 def ensure_display():
     global display
@@ -232,36 +427,144 @@ llm = None
 vosk_model = None
 MODEL_PATH = str(PROJECT_ROOT / "models" / "vosk-model-small-en-us-0.15")
 
+_vosk_lock = threading.Lock()
+_llm_lock = threading.Lock()
+_tts_cache_lock = threading.Lock()
+
+def ensure_tts_cache():
+    """The phrase cache, keyed by the voice in use; None when TTS_CACHE_MB=0."""
+    global tts_cache
+    if not TTS_CACHE_MB:
+        return None
+    with _tts_cache_lock:
+        if tts_cache is None:
+            voice_id, config_hash = voice_fingerprint()
+            tts_cache = TTSCache(TMP_AUDIO / "cache", voice_id, f"{config_hash}:clauses={int(TTS_SPLIT_CLAUSES)}",
+                                 max_bytes=TTS_CACHE_MB * 2**20)
+    return tts_cache
+
 def ensure_vosk_model():
     global vosk_model
-    if vosk_model is None:
-        print_banner("🧠 Loading Vosk model...", Fore.YELLOW)
-        vosk_model = Model(MODEL_PATH)
+    with _vosk_lock:
+        if vosk_model is None:
+            print_banner("🧠 Loading Vosk model...", Fore.YELLOW)
+            from vosk import Model
+            vosk_model = Model(MODEL_PATH)
     return vosk_model
 
 def ensure_llm():
     global llm
-    if llm is None:
-        d = ensure_display()
-        print_banner("🤖 Initialising LLM handler...", Fore.MAGENTA)
-        d.write("Init LLM (Ollama)")
-        llm = LLMHandler(provider="ollama", model="gemma3:1b")
-        d.write("Ready (Ollama)")
+    with _llm_lock:
+        if llm is None:
+            d = ensure_display()
+            print_banner("🤖 Initialising LLM handler...", Fore.MAGENTA)
+            d.async_write(f"Init LLM ({LLM_PROVIDER})")
+            llm = LLMHandler(provider=LLM_PROVIDER, model=LLM_MODEL, keep_alive=OLLAMA_KEEP_ALIVE)
+            if LLM_HEDGE:
+                # Slow first token on the primary -> race the hedge backend
+                from modules.hedged_llm import HedgedLLM
+                provider, _, model = LLM_HEDGE.partition(":")
+                llm = HedgedLLM([llm, LLMHandler(provider=provider, model=model)],
+                                deadline_s=HEDGE_DEADLINE_S)
+            d.async_write(f"Ready ({LLM_PROVIDER})")
     return llm
 
+answerer = None
+
+def ensure_answerer():
+    """The LLM, fronted by the semantic answer cache when SEMANTIC_CACHE=1."""
+    global answerer
+    if answerer is None:
+        handler = ensure_llm()
+        if SEMANTIC_CACHE:
+            from modules.semantic_cache import SemanticCache, SemanticCachedLLM
+            embedder = LLMHandler(provider="ollama", model=EMBED_MODEL)
+            cache = SemanticCache(embedder.embed, threshold=SEMANTIC_THRESHOLD)
+            answerer = SemanticCachedLLM(handler, cache)
+        else:
+            answerer = handler
+    return answerer
+
 def init_models():
     ensure_display()
     ensure_vosk_model()
     ensure_llm()
 
 
+# === Startup warm-up ===
+warmup = None
+
+def _warm_vosk(model):
+    # Half a second of silence pages in the acoustic model and graph
+    from vosk import KaldiRecognizer
+    rec = KaldiRecognizer(model, SAMPLE_RATE)
+    rec.AcceptWaveform(bytes(SAMPLE_RATE))
+    rec.FinalResult()
+
+def _warm_piper(voice):
+    for _ in voice.synthesize("Hi."):   # the voice warm-up just loaded, not a second get_voice()
+        pass
+    cache = ensure_tts_cache()
+    if cache is not None:
+        cache.warm(CANNED_PHRASES, render)
+
+def _show_warmup(name, state):
+    d = ensure_display()
+    if warmup.state == STARTING:
+        d.async_write(f"Warming up {warmup.summary()}")
+    elif warmup.state == ALL_READY:
+        d.async_write("Ready")
+    else:
+        d.async_write(f"Degraded: {', '.join(warmup.errors)} failed")
+
+def _warm_llm(handler):
+    handler.warm_up(SYSTEM_PROMPT)   # also pre-evaluates the prompt every turn starts with
+    if KEEP_WARM_S > 0:
+        handler.start_keep_warm(KEEP_WARM_S)
+
+def start_warmup():
+    """Load Vosk, Piper and the LLM in parallel, each with a throwaway inference."""
+    global warmup
+    warmup = Warmup(on_change=_show_warmup)
+    warmup.add("vosk", ensure_vosk_model, _warm_vosk)
+    warmup.add("piper", get_voice, _warm_piper)
+    warmup.add("llm", ensure_llm, _warm_llm)
+    return warmup.start()
+
+def require(name: str, timeout: float) -> bool:
+    """Wait for a warm-up component; without an orchestrator fall back to lazy loading."""
+    if warmup is None:
+        init_models()
+        return True
+    if warmup.is_ready(name):
+        return True
+    if warmup.component_state(name) == FAILED:
+        # Reload on the warm-up thread; a turn waits at most RETRY_WAIT_S for it
+        ensure_display().async_write(f"Warming up {name}…")
+        return warmup.retry(name, timeout if timeout is None else min(timeout, RETRY_WAIT_S))
+    ensure_display().async_write(f"Waiting for {name}…")
+    return warmup.wait(name, timeout)
+
+
+def parse_args():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--hands-free", action="store_true", default=os.getenv("HANDS_FREE") == "1",
+                    help="Use voice activity detection instead of push-to-talk")
+    return ap.parse_args()
+
+
 def main():
+    args = parse_args()
     d = ensure_display()
-    b = ensure_button()
     print_banner("🚀 Starting Buttontalk Assistant", Fore.GREEN)
+    start_warmup()
     d.fade_in(color=(0, 100, 255))
-    d.write("Hello")
-    speak("Hello! I'm online and ready to hang out.", "online.wav")
+    speak(ONLINE)
+    if args.hands_free:
+        print(Fore.CYAN + "📲 Hands-free: just start talking.\n" + Style.RESET_ALL)
+        hands_free_loop()
+        return
+    b = ensure_button()
     b.when_pressed = handle_button_event
     print(Fore.CYAN + "📲 Tap or hold the button to talk.\n" + Style.RESET_ALL)
     pause()
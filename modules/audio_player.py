@@ -0,0 +1,99 @@
+# modules/audio_player.py
+import logging
+import os
+import shutil
+import subprocess
+import time
+import wave
+from pathlib import Path
+
+from bench import bench
+
+
+class AudioPlayer:
+    """
+    One persistent sounddevice output stream for the lifetime of the assistant.
+
+    Sentences are written to it back to back as int16 PCM, with pauses inserted
+    as silence samples, so there is no process spawn, device open or sleep
+    between sentences. If no output stream can be opened the old
+    paplay/aplay-per-WAV path is used instead.
+    """
+
+    def __init__(self, sample_rate: int = 22050, pause_samples: int | None = None,
+                 fallback_dir=None, device=None):
+        self.sample_rate = sample_rate
+        self.device = device
+        self.pause_samples = pause_samples if pause_samples is not None else sample_rate // 4
+        self.fallback_dir = Path(fallback_dir or "/tmp")
+        self.stream = None
+        self.underflows = 0
+        self._silence = bytes(2 * self.pause_samples)
+        self._open(sample_rate)
+
+    # ---------- Stream management ----------
+    def _open(self, sample_rate: int):
+        self.close()
+        try:
+            import sounddevice as sd
+            self.stream = sd.RawOutputStream(
+                samplerate=sample_rate, channels=1, dtype="int16", device=self.device,
+            )
+            self.stream.start()
+            self.sample_rate = sample_rate
+            logging.info(f"🔈 Output stream open ({sample_rate} Hz, latency {self.stream.latency * 1000:.0f} ms)")
+        except Exception as e:
+            self.stream = None
+            self.sample_rate = sample_rate
+            logging.warning(f"⚠️ No output stream ({e}); falling back to paplay/aplay")
+
+    def close(self):
+        if self.stream is not None:
+            try:
+                self.stream.stop()
+                self.stream.close()
+            except Exception:
+                pass
+            self.stream = None
+
+    # ---------- Playback ----------
+    def play(self, pcm, sample_rate: int | None = None):
+        """Queue int16 mono PCM for playback right behind whatever is already queued."""
+        if sample_rate and sample_rate != self.sample_rate:
+            self._open(sample_rate)
+        if self.stream is None:
+            self._play_fallback(pcm)
+            return
+        if self.stream.write(pcm):
+            self.underflows += 1
+            bench.value("audio.out.underflows", self.underflows)
+
+    def pause(self):
+        """The inter-sentence pause, as pause_samples of silence."""
+        if not self.pause_samples:
+            return
+        if self.stream is None:
+            time.sleep(self.pause_samples / self.sample_rate)
+        else:
+            self.stream.write(self._silence)
+
+    def drain(self):
+        """Block until what has been written has reached the speaker."""
+        if self.stream is not None:
+            time.sleep(self.stream.latency)
+
+    def _play_fallback(self, pcm):
+        path = self.fallback_dir / "playback.wav"
+        with wave.open(str(path), "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(self.sample_rate)
+            wf.writeframes(pcm)
+
+        if shutil.which("paplay"):
+            cmd = ["paplay", str(path)]
+        else:
+            dev = os.getenv("APLAY_DEVICE", "default")
+            cmd = ["aplay", "-q", "-D", dev, str(path)]
+
+        subprocess.run(cmd, capture_output=True, text=True)
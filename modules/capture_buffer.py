@@ -0,0 +1,111 @@
+# modules/capture_buffer.py
+import logging
+import threading
+import wave
+from pathlib import Path
+
+from bench import bench
+
+
+class CaptureBuffer:
+    """
+    Preallocated PCM buffer filled straight from the sounddevice callback.
+
+    The audio thread only does a slice copy into memory that already exists —
+    no per-block bytes objects, no queue nodes, no disk I/O. The consumer gets
+    memoryview slices of the same memory; the WAV file is only written when
+    asked for with save_wav().
+
+    Single producer (the PortAudio callback) / single consumer.
+    """
+
+    def __init__(self, sample_rate: int = 16000, max_seconds: float = 30.0,
+                 sample_width: int = 2, channels: int = 1):
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.channels = channels
+        self.frame_bytes = sample_width * channels
+        self.capacity = int(sample_rate * max_seconds) * self.frame_bytes
+        self._buf = bytearray(self.capacity)
+        self._view = memoryview(self._buf)
+        self._ready = threading.Event()
+        self.reset()
+
+    def reset(self):
+        """Forget the previous recording (the memory is reused)."""
+        self._write = 0
+        self._read = 0
+        self._ready.clear()
+        self.blocks = 0
+        self.overflows = 0       # PortAudio reported input overflow
+        self.status_flags = 0    # any other non-empty callback status
+        self.dropped_frames = 0  # frames that did not fit into the buffer
+
+    # ---------- Producer (audio thread) ----------
+    def callback(self, indata, frames, time_info, status):
+        if status:
+            if status.input_overflow:
+                self.overflows += 1
+            else:
+                self.status_flags += 1
+        w = self._write
+        n = len(indata)
+        room = self.capacity - w
+        if n > room:
+            self.dropped_frames += (n - room) // self.frame_bytes
+            n = room
+        if n:
+            self._view[w:w + n] = memoryview(indata)[:n]
+            self._write = w + n
+        self.blocks += 1
+        self._ready.set()
+
+    # ---------- Consumer ----------
+    def read(self, timeout: float | None = None):
+        """Return a memoryview of everything captured since the last read, or None."""
+        if self._write == self._read:
+            self._ready.wait(timeout)
+        self._ready.clear()
+        w = self._write
+        if w == self._read:
+            return None
+        chunk = self._view[self._read:w]
+        self._read = w
+        return chunk
+
+    @property
+    def full(self) -> bool:
+        return self._write >= self.capacity
+
+    @property
+    def duration(self) -> float:
+        return self._write / self.frame_bytes / self.sample_rate
+
+    def pcm(self) -> memoryview:
+        """The whole recording so far (no copy)."""
+        return self._view[:self._write]
+
+    def replay(self, start: int) -> memoryview:
+        """Bytes from offset start up to the end of what read() has handed out."""
+        return self._view[start:self._read]
+
+    def save_wav(self, path) -> Path:
+        path = Path(path)
+        with wave.open(str(path), "wb") as wf:
+            wf.setnchannels(self.channels)
+            wf.setsampwidth(self.sample_width)
+            wf.setframerate(self.sample_rate)
+            wf.writeframes(self.pcm())
+        return path
+
+    def report(self, **extra):
+        """Emit per-recording health metrics."""
+        bench.value("capture.overflows", self.overflows, **extra)
+        bench.value("capture.status_flags", self.status_flags, **extra)
+        bench.value("capture.dropped_frames", self.dropped_frames, **extra)
+        bench.value("capture.fill_ratio", self._write / self.capacity, **extra)
+        if self.overflows or self.dropped_frames:
+            logging.warning(
+                f"⚠️ Capture lost audio: {self.overflows} overflow(s), "
+                f"{self.dropped_frames} frame(s) past the {self.capacity // self.frame_bytes / self.sample_rate:.0f}s limit"
+            )
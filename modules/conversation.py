@@ -0,0 +1,117 @@
+# modules/conversation.py
+import logging
+import threading
+import time
+
+from bench import bench
+
+SUMMARY_PROMPT = (
+    "Summarise the conversation below between a user and a voice assistant in at most "
+    "{sentences} short sentences. Keep names, preferences, facts and open questions the "
+    "user mentioned; drop small talk. Reply with the summary only."
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 chars per token for English, as BPE tokenisers average)."""
+    return len(text) // 4 + 1
+
+
+def message_tokens(message: dict) -> int:
+    return estimate_tokens(message.get("content") or "") + 4  # role + framing
+
+
+class ConversationManager:
+    """
+    Keeps the prompt sent to the LLM inside a token budget.
+
+    window() returns the system prompt, a running summary of older turns and
+    as many of the most recent turns as fit into budget_tokens. Turns that
+    have fallen out of the window are folded into the summary by
+    compact_async(), which is meant to run after playback so the extra LLM
+    call never sits between the user and an answer.
+    """
+
+    def __init__(self, system_prompt: str, budget_tokens: int = 1200, summary_sentences: int = 4,
+                 max_turns: int = 200):
+        self.system = {"role": "system", "content": system_prompt}
+        self.budget_tokens = budget_tokens
+        self.summary_sentences = summary_sentences
+        self.max_turns = max_turns
+        self.turns = []
+        self.summary = ""
+        self._lock = threading.Lock()
+        self._compacting = None
+        self._window_start = 0
+
+    def add(self, role: str, content: str):
+        with self._lock:
+            self.turns.append({"role": role, "content": content})
+            if len(self.turns) > self.max_turns:
+                # Summariser has been failing; don't grow without bound
+                drop = len(self.turns) - self.max_turns
+                del self.turns[:drop]
+                self._window_start = max(0, self._window_start - drop)
+
+    def _summary_message(self):
+        return {"role": "system", "content": f"Summary of the earlier conversation: {self.summary}"}
+
+    def window(self) -> list[dict]:
+        """
+        Messages for the next request, newest turns first to claim the budget.
+        A turn is a user message and the replies after it; turns go in or out
+        whole, so the window never opens on an orphaned assistant message.
+        """
+        with self._lock:
+            head = [self.system]
+            if self.summary:
+                head.append(self._summary_message())
+            used = sum(message_tokens(m) for m in head)
+            start = len(self.turns)
+            for i in reversed([i for i, m in enumerate(self.turns) if m["role"] == "user"]):
+                cost = sum(message_tokens(m) for m in self.turns[i:start])
+                if used + cost > self.budget_tokens and start < len(self.turns):
+                    break  # the newest turn always goes in, even if over budget
+                used += cost
+                start = i
+            self._window_start = start
+            messages = head + self.turns[start:]
+
+        bench.value("llm.prompt_tokens_est", used, messages=len(messages),
+                    dropped=start, summary_tokens=estimate_tokens(self.summary) if self.summary else 0)
+        return messages
+
+    # ---------- Background summarisation ----------
+    def compact_async(self, llm):
+        """Fold turns that no longer fit the window into the summary, in a worker thread."""
+        with self._lock:
+            if self._compacting is not None and self._compacting.is_alive():
+                return
+            pending = self.turns[:self._window_start]
+            if not pending:
+                return
+            self._compacting = threading.Thread(target=self._compact, args=(llm, pending), daemon=True)
+            self._compacting.start()
+
+    def _compact(self, llm, pending):
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in pending)
+        if self.summary:
+            transcript = f"Earlier summary: {self.summary}\n{transcript}"
+        t0 = time.perf_counter()
+        try:
+            summary = llm.call([
+                {"role": "system", "content": SUMMARY_PROMPT.format(sentences=self.summary_sentences)},
+                {"role": "user", "content": transcript},
+            ], temperature=0.2)
+        except Exception as e:
+            logging.warning(f"⚠️ Conversation summary failed: {e}")
+            return
+        bench.value("llm.summary_s", time.perf_counter() - t0, folded=len(pending),
+                    summary_tokens=estimate_tokens(summary or ""))
+        with self._lock:
+            # Only the folded turns go; anything added meanwhile stays
+            if self.turns[:len(pending)] == pending:
+                del self.turns[:len(pending)]
+                self._window_start = max(0, self._window_start - len(pending))
+            self.summary = (summary or "").strip()
+        logging.info(f"🗜️ Folded {len(pending)} old message(s) into the summary")
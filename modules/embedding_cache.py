@@ -0,0 +1,156 @@
+# modules/embedding_cache.py
+import hashlib
+import io
+import logging
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from bench import bench
+
+_DIGEST = 32  # sha256
+
+
+class EmbeddingCache:
+    """
+    Content-hashed embedding store for one provider/model.
+
+    <name>.npy holds a float32 (rows, dim) matrix and <name>.keys the sha256
+    of each row's text, 32 bytes per row in the same order. The matrix is
+    memory-mapped on load, so opening a large cache costs a page-table entry
+    rather than a read; new rows stay in memory until save(), which writes
+    only those rows to the end of both files.
+
+    The two files are written one after the other, so a crash can leave one
+    longer than the other; _load() uses the rows both have. When the matrix
+    has to be rewritten from scratch, the key file is removed first and
+    rewritten whole after it, so stale keys are never paired with new rows.
+    """
+
+    def __init__(self, directory, namespace: str):
+        self.dir = Path(directory).expanduser()
+        self.dir.mkdir(parents=True, exist_ok=True)
+        slug = hashlib.sha256(namespace.encode("utf-8")).hexdigest()[:16]
+        self.matrix_path = self.dir / f"{slug}.npy"
+        self.keys_path = self.dir / f"{slug}.keys"
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._index = {}       # digest -> row
+        self._matrix = None    # memory-mapped rows on disk
+        self._new_keys = []
+        self._new_rows = []
+        self._load()
+
+    def _load(self):
+        if not (self.matrix_path.exists() and self.keys_path.exists()):
+            return
+        try:
+            matrix = np.load(self.matrix_path, mmap_mode="r")
+            keys = self.keys_path.read_bytes()
+            if matrix.dtype != np.float32 or matrix.ndim != 2:
+                raise ValueError(f"unexpected matrix {matrix.dtype} {matrix.shape}")
+        except (OSError, ValueError) as e:
+            logging.warning(f"⚠️ Ignoring embedding cache {self.matrix_path.name}: {e}")
+            return
+        rows = min(matrix.shape[0], len(keys) // _DIGEST)
+        if rows != matrix.shape[0] or rows * _DIGEST != len(keys):
+            # An interrupted save(); the next one cuts both files back to rows
+            logging.warning(f"⚠️ Embedding cache {self.matrix_path.name}: {matrix.shape[0]} rows, "
+                            f"{len(keys) / _DIGEST:g} keys; using the first {rows}")
+        self._matrix = matrix[:rows]
+        self._index = {keys[i * _DIGEST:(i + 1) * _DIGEST]: i for i in range(rows)}
+
+    @staticmethod
+    def digest(text: str) -> bytes:
+        return hashlib.sha256(text.encode("utf-8")).digest()
+
+    def __len__(self):
+        return len(self._index)
+
+    def lookup(self, texts) -> tuple[dict, list]:
+        """Returns ({text: vector} for hits, [texts] missing)."""
+        hits, missing = {}, []
+        with self._lock:
+            disk_rows = self._matrix.shape[0] if self._matrix is not None else 0
+            for text in texts:
+                row = self._index.get(self.digest(text))
+                if row is None:
+                    missing.append(text)
+                elif row < disk_rows:
+                    hits[text] = self._matrix[row]
+                else:
+                    hits[text] = self._new_rows[row - disk_rows]
+        bench.value("embed.cache.hits", len(hits), missing=len(missing))
+        return hits, missing
+
+    def add(self, text: str, vector):
+        key = self.digest(text)
+        with self._lock:
+            if key in self._index:
+                return
+            disk_rows = self._matrix.shape[0] if self._matrix is not None else 0
+            self._index[key] = disk_rows + len(self._new_rows)
+            self._new_keys.append(key)
+            self._new_rows.append(np.asarray(vector, dtype=np.float32))
+
+    def save(self):
+        """Write new rows to the files and re-map them; see _append()."""
+        with self._lock:
+            if not self._new_rows:
+                return
+            new = np.stack(self._new_rows)
+            old = self._matrix
+            if old is not None and old.shape[1] != new.shape[1]:
+                raise ValueError(f"embedding size changed ({old.shape[1]} -> {new.shape[1]})")
+            self._matrix = None  # drop the old map before changing the file
+            rows = 0 if old is None else old.shape[0]
+            if old is not None and self._append(rows, new):
+                with open(self.keys_path, "r+b") as f:
+                    f.seek(rows * _DIGEST)     # past any keys an interrupted save() left behind
+                    f.write(b"".join(self._new_keys))
+                    f.truncate()
+            else:
+                keys = self.keys_path.read_bytes()[:rows * _DIGEST] if rows else b""
+                if old is not None:
+                    new = np.concatenate((old, new))
+                del old
+                # No key file while the matrix is replaced: a crash in between loads as empty
+                self.keys_path.unlink(missing_ok=True)
+                self._replace(self.matrix_path, lambda f: np.save(f, new))
+                self._replace(self.keys_path, lambda f: f.write(keys + b"".join(self._new_keys)))
+            self._new_keys.clear()
+            self._new_rows.clear()
+            self._matrix = np.load(self.matrix_path, mmap_mode="r")
+
+    @staticmethod
+    def _replace(path: Path, write):
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
+
+    def _append(self, rows: int, new: np.ndarray) -> bool:
+        """
+        Write only the new rows after the existing ones, then patch the shape
+        in the .npy header in place. np.save leaves room in the header for the
+        row count to grow; False (caller rewrites the file) if there isn't any.
+        """
+        fmt = np.lib.format
+        header = io.BytesIO()
+        fmt.write_array_header_1_0(header, {"descr": fmt.dtype_to_descr(new.dtype), "fortran_order": False,
+                                            "shape": (rows + new.shape[0], new.shape[1])})
+        header = header.getvalue()
+        with open(self.matrix_path, "r+b") as f:
+            if fmt.read_magic(f) != (1, 0):
+                return False
+            fmt.read_array_header_1_0(f)
+            if f.tell() != len(header):
+                return False
+            f.seek(len(header) + rows * new.shape[1] * new.itemsize)
+            f.write(new.tobytes())
+            f.truncate()
+            f.seek(0)
+            f.write(header)
+        return True
@@ -0,0 +1,256 @@
+# modules/hedged_llm.py
+import asyncio
+import contextlib
+import logging
+import math
+import queue
+import threading
+import time
+
+from bench import bench
+from modules.llm_stream import StreamChunk
+
+
+class TTFTHistogram:
+    """
+    Log-bucketed time-to-first-token histogram (~5% bucket width, 10 ms to
+    120 s). Counts are halved every `half_life` samples so old behaviour
+    fades out, e.g. after the model was loaded or the CPU stopped throttling.
+    """
+
+    LOW_S = 0.01
+    GROWTH = 1.05
+
+    def __init__(self, half_life: int = 50):
+        self.half_life = half_life
+        self._n_buckets = int(math.log(120.0 / self.LOW_S, self.GROWTH)) + 2
+        self.counts = [0.0] * self._n_buckets
+        self.samples = 0
+        self._since_decay = 0
+
+    def _bucket(self, seconds: float) -> int:
+        if seconds <= self.LOW_S:
+            return 0
+        return min(self._n_buckets - 1, int(math.log(seconds / self.LOW_S, self.GROWTH)) + 1)
+
+    def record(self, seconds: float):
+        self.counts[self._bucket(seconds)] += 1
+        self.samples += 1
+        self._since_decay += 1
+        if self._since_decay >= self.half_life:
+            self.counts = [c / 2 for c in self.counts]
+            self._since_decay = 0
+
+    def quantile(self, q: float) -> float | None:
+        total = sum(self.counts)
+        if not total:
+            return None
+        target = q * total
+        seen = 0.0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return self.LOW_S * self.GROWTH ** i   # bucket upper edge
+        return self.LOW_S * self.GROWTH ** (self._n_buckets - 1)
+
+
+class HedgedLLM:
+    """
+    Streams from several LLMHandlers as one, in order of preference.
+
+    The primary starts at once. If it has produced no token by its deadline
+    (or fails first), the next backend is started too; the first stream to
+    produce a token wins and the others are cancelled, which closes their
+    HTTP responses. Each backend's deadline is the `quantile` of its own
+    TTFT histogram, clamped to [min_deadline_s, max_deadline_s], and
+    `deadline_s` until min_samples have been seen. A backend cancelled before
+    its first token records the time it had been waiting as a (censored)
+    sample: its real TTFT was at least that long, so a slow primary's
+    deadline still moves up even though it never wins.
+
+    Uses the handlers' async API. The sync stream() runs it on a private
+    event loop thread, so use either stream() or astream() with a given set
+    of handlers, not both. warm_up() and keep-warm cover every backend, since
+    any of them may be raced; anything else (call, embed, ...) goes to the
+    primary.
+    """
+
+    def __init__(self, backends, deadline_s: float = 1.5, min_deadline_s: float = 0.25,
+                 max_deadline_s: float = 5.0, quantile: float = 0.9, min_samples: int = 5):
+        if not backends:
+            raise ValueError("HedgedLLM needs at least one backend")
+        self.backends = list(backends)
+        self.names = [f"{b.provider}:{b.model}" for b in self.backends]
+        self.deadline_s = deadline_s
+        self.min_deadline_s = min_deadline_s
+        self.max_deadline_s = max_deadline_s
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.ttft = [TTFTHistogram() for _ in self.backends]
+        self.hedges = 0
+        self.wins = [0] * len(self.backends)
+        self._loop = None
+        self._loop_lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if name == "backends":
+            raise AttributeError(name)
+        return getattr(self.backends[0], name)
+
+    def warm_up(self, system_prompt: str | None = None) -> None:
+        """Warm every backend in parallel. Only the primary's failure is raised; a hedge's is logged."""
+        errors = [None] * len(self.backends)
+
+        def warm(i):
+            try:
+                self.backends[i].warm_up(system_prompt)
+            except Exception as e:
+                errors[i] = e
+
+        threads = [threading.Thread(target=warm, args=(i,), name=f"llm-warm-{i}", daemon=True)
+                   for i in range(len(self.backends))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for name, e in zip(self.names[1:], errors[1:]):
+            if e is not None:
+                logging.warning(f"⚠️ Hedge backend {name} failed to warm up: {e}")
+        if errors[0] is not None:
+            raise errors[0]
+
+    def start_keep_warm(self, interval_s: float = 240.0) -> None:
+        for backend in self.backends:
+            backend.start_keep_warm(interval_s)
+
+    def stop_keep_warm(self) -> None:
+        for backend in self.backends:
+            backend.stop_keep_warm()
+
+    def deadline(self, index: int = 0) -> float:
+        hist = self.ttft[index]
+        if hist.samples < self.min_samples:
+            return self.deadline_s
+        return min(self.max_deadline_s, max(self.min_deadline_s, hist.quantile(self.quantile)))
+
+    async def astream(self, messages_or_prompt, temperature: float = 0.7):
+        messages = self.backends[0]._format_messages(messages_or_prompt)
+        loop = asyncio.get_running_loop()
+        out = asyncio.Queue()
+        tasks = []
+        t_start = time.perf_counter()
+
+        async def pump(i):
+            t0 = time.perf_counter()
+            first = True
+            try:
+                async with contextlib.aclosing(self.backends[i].astream(messages, temperature)) as chunks:
+                    async for chunk in chunks:
+                        if first and chunk.get("content"):
+                            first = False
+                            ttft = time.perf_counter() - t0
+                            self.ttft[i].record(ttft)
+                            bench.value("llm.hedge.ttft_s", ttft, backend=self.names[i])
+                        out.put_nowait((i, chunk))
+            except asyncio.CancelledError:
+                if first:
+                    waited = time.perf_counter() - t0
+                    self.ttft[i].record(waited)
+                    bench.value("llm.hedge.ttft_censored_s", waited, backend=self.names[i])
+                raise
+            finally:
+                out.put_nowait((i, None))
+
+        def launch(i):
+            tasks.append(loop.create_task(pump(i)))
+
+        launch(0)
+        winner = None
+        ended = 0
+        last_error = None
+        hedge_at = loop.time() + self.deadline(0)
+        try:
+            while True:
+                timeout = None
+                if winner is None and len(tasks) < len(self.backends):
+                    timeout = max(0.0, hedge_at - loop.time())
+                try:
+                    i, chunk = await asyncio.wait_for(out.get(), timeout)
+                except asyncio.TimeoutError:
+                    self.hedges += 1
+                    bench.value("llm.hedge.fired", 1, backend=self.names[len(tasks)],
+                                after_s=time.perf_counter() - t_start)
+                    logging.info(f"⏱️ No token yet, hedging on {self.names[len(tasks)]}")
+                    launch(len(tasks))
+                    hedge_at = loop.time() + self.deadline(len(tasks) - 1)
+                    continue
+
+                if winner is not None and i != winner:
+                    continue
+                if chunk is None:
+                    ended += 1
+                    if i == winner:
+                        break
+                    if winner is None and ended == len(tasks):
+                        if len(tasks) < len(self.backends):
+                            launch(len(tasks))   # everything so far failed: fail over now
+                            hedge_at = loop.time() + self.deadline(len(tasks) - 1)
+                            continue
+                        yield last_error or StreamChunk.failure("All LLM backends ended without a reply")
+                        break
+                    continue
+                if winner is None:
+                    if "error" in chunk:
+                        last_error = chunk
+                        logging.warning(f"⚠️ {self.names[i]}: {chunk['error']}")
+                        continue
+                    if not chunk.get("content"):
+                        continue
+                    winner = i
+                    self.wins[i] += 1
+                    for j, task in enumerate(tasks):
+                        if j != i:
+                            task.cancel()
+                    bench.value("llm.hedge.first_token_s", time.perf_counter() - t_start,
+                                winner=self.names[i], started=len(tasks))
+                yield chunk
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _ensure_loop(self):
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="llm-hedge", daemon=True).start()
+        return self._loop
+
+    def stream(self, messages_or_prompt, temperature: float = 0.7):
+        """Sync twin of astream() for the existing thread-based callers."""
+        chunks = queue.Queue()
+
+        async def run():
+            try:
+                async for chunk in self.astream(messages_or_prompt, temperature):
+                    chunks.put(chunk)
+            finally:
+                chunks.put(None)
+
+        future = asyncio.run_coroutine_threadsafe(run(), self._ensure_loop())
+        try:
+            while (chunk := chunks.get()) is not None:
+                yield chunk
+        finally:
+            future.cancel()
+
+    async def aclose(self):
+        for backend in self.backends:
+            await backend.aclose()
+
+    def close(self):
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self.aclose(), self._loop).result(timeout=5)
+            asyncio.run_coroutine_threadsafe(self._loop.shutdown_asyncgens(), self._loop).result(timeout=5)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = None
@@ -0,0 +1,120 @@
+# modules/llm_cache.py
+import functools
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from bench import bench
+
+
+def cache_key(provider: str, model: str, kind: str, messages, temperature: float, schema: str = "") -> str:
+    """Stable key for a request; whitespace-only differences in messages don't matter."""
+    norm = [(m.get("role", ""), " ".join(str(m.get("content", "")).split())) for m in messages]
+    blob = json.dumps([provider, model, kind, norm, round(float(temperature), 4), schema],
+                      separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+@functools.lru_cache(maxsize=64)
+def schema_hash(schema) -> str:
+    if schema is None:
+        return ""
+    if isinstance(schema, str):
+        return schema
+    return hashlib.sha256(json.dumps(schema.model_json_schema(), sort_keys=True).encode()).hexdigest()[:16]
+
+
+class LLMCache:
+    """
+    Persistent response cache for LLMHandler, in a single SQLite file.
+
+    Entries expire after ttl_s and the least recently used ones are evicted
+    once there are more than max_entries. Safe to share between threads.
+
+    put() keeps a running upper bound on the row count instead of counting
+    on every insert; when it passes max_entries, _prune() drops expired rows
+    and then the least recently used down to low_water of max_entries, so
+    the cost is paid once per (1 - low_water) * max_entries inserts.
+    """
+
+    def __init__(self, path="~/.cache/buttontalk/llm_cache.sqlite", ttl_s: float = 7 * 24 * 3600,
+                 max_entries: int = 5000, low_water: float = 0.9):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.low_water = low_water
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")   # SD-card friendly; a lost entry is harmless
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses(created)")
+        with self._lock:
+            self._prune(time.time(), self.max_entries)   # expired rows from earlier runs
+
+    def get(self, key: str, kind: str = "call") -> str | None:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[1] > self.ttl_s:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._count -= 1
+                row = None
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        bench.value("llm.cache.hit" if row is not None else "llm.cache.miss", 1, kind=kind,
+                    hit_rate=round(self.hit_rate, 3))
+        return row[0] if row is not None else None
+
+    def put(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            self._count += 1   # over-counts a replaced key; _prune() recounts
+            if self._count > self.max_entries:
+                self._prune(now, int(self.max_entries * self.low_water))
+
+    def _prune(self, now: float, keep: int):
+        """Delete expired rows; if still over max_entries, the least recently used beyond keep. Holds the lock."""
+        expired = self._db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_s,)).rowcount
+        (count,) = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()
+        evicted = 0
+        if count > self.max_entries:
+            evicted = self._db.execute(
+                "DELETE FROM responses WHERE key IN"
+                " (SELECT key FROM responses ORDER BY accessed ASC LIMIT ?)",
+                (count - keep,),
+            ).rowcount
+        self._count = count - evicted
+        if expired or evicted:
+            bench.value("llm.cache.pruned", expired + evicted, expired=expired, evicted=evicted)
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._count = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def close(self):
+        with self._lock:
+            self._db.close()
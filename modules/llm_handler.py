@@ -1,32 +1,156 @@
 # llm_handler.py
 
-from typing import List, Union
-from pydantic import BaseModel
+from __future__ import annotations
+
+from typing import List, Union, TYPE_CHECKING
 import os
-import instructor
-from openai import OpenAI
-from groq import Groq
-from ollama import chat as ollama_chat, embeddings as ollama_embeddings
+import re
+import json
+import functools
+import logging
+import threading
+import time
 from dotenv import load_dotenv
 
+from bench import bench
+from modules.llm_stream import StreamChunk, StreamStats, delta_parser, prompt_chars
+from modules.rate_limit import limiter_for
+
+# Provider SDKs are imported in LLMHandler.__init__, only for the provider in use:
+# together they cost seconds of import time on a Pi.
+if TYPE_CHECKING:
+    import numpy as np
+    from pydantic import BaseModel
+
 load_dotenv()
 
+DEFAULT_BASE_URLS = {
+    "openai": "https://api.openai.com/v1",
+    "groq": "https://api.groq.com/openai/v1",
+    "ollama": os.getenv("OLLAMA_HOST", "http://localhost:11434"),
+}
+
+
+def with_scheme(url: str) -> str:
+    """OLLAMA_HOST is often just host:port (Ollama's own CLI accepts that); httpx needs a scheme."""
+    url = url.strip()
+    return url if "://" in url else f"http://{url}"
+
+
+@functools.lru_cache(maxsize=64)
+def json_schema(schema) -> dict:
+    """schema.model_json_schema(), built once per class (it walks the whole model). Don't mutate."""
+    return schema.model_json_schema()
+
+
 class LLMHandler:
-    def __init__(self, provider: str, model: str):
+    def __init__(self, provider: str, model: str, base_url: str | None = None,
+                 connect_timeout: float = 5.0, read_timeout: float = 120.0, max_connections: int = 8,
+                 cache=None, cache_all: bool = False, requests_per_minute: float | None = None,
+                 keep_alive: str | float | None = None):
         self.provider = provider.lower()
         self.model = model
+        # Opt-in LLMCache; by default only deterministic requests (temperature 0
+        # or schema/JSON-constrained) are cached, cache_all=True caches everything
+        self.cache = cache
+        self.cache_all = cache_all
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         self.groq_api_key = os.getenv("GROQ_API_KEY")
+        if self.provider not in DEFAULT_BASE_URLS:
+            raise ValueError(f"Unsupported provider: {self.provider}")
+        # OpenAI-compatible API root for openai/groq, server root for ollama
+        self.base_url = with_scheme(base_url or DEFAULT_BASE_URLS[self.provider]).rstrip("/")
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_connections = max_connections
+        self._client = None
+        self._aclient = None
+        # Shared per provider; defaults in modules/rate_limit.py. stream() is
+        # charged but never held back (a turn is waiting on it); the async
+        # methods are not throttled.
+        self.limiter = limiter_for(self.provider, requests_per_minute)
+        # Ollama only: how long the model stays loaded after a request
+        # ("10m", seconds, -1 = until the server stops); None = server default
+        self.keep_alive = keep_alive
+        self._warm_prefix = []       # system prompt pre-evaluated by warm_up()
+        self._requests = 0
+        self._last_request = 0.0     # monotonic
+        self._keep_warm = None
 
         if self.provider == "openai":
-            self.client = OpenAI(api_key=self.openai_api_key)
+            from openai import OpenAI
+            self.client = OpenAI(api_key=self.openai_api_key, base_url=self.base_url, timeout=self._timeout())
         elif self.provider == "groq":
-            self.client = Groq(api_key=self.groq_api_key)
-            self.schemed_client = instructor.from_groq(Groq(api_key=self.groq_api_key))
+            import instructor
+            from groq import Groq
+            # The Groq SDK appends /openai/v1 itself
+            groq_base = self.base_url.removesuffix("/openai/v1")
+            self.client = Groq(api_key=self.groq_api_key, base_url=groq_base, timeout=self._timeout())
+            self.schemed_client = instructor.from_groq(Groq(api_key=self.groq_api_key, base_url=groq_base,
+                                                            timeout=self._timeout()))
         elif self.provider == "ollama":
+            import ollama
             self.client = None  # native methods
-        else:
-            raise ValueError(f"Unsupported provider: {self.provider}")
+            # One client per handler: keep-alive connection and real timeouts,
+            # instead of the module-level helpers
+            self._ollama = ollama.Client(host=self.base_url, timeout=self._timeout())
+
+    def _timeout(self):
+        import httpx
+        return httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+
+    def warm_up(self, system_prompt: str | None = None) -> None:
+        """
+        One-token request so the first real turn doesn't pay for cold start:
+        Ollama pulls the model into RAM, the hosted APIs get a live connection.
+        With system_prompt (remembered for keep-warm pings), Ollama also
+        evaluates that prefix now, so turns that start with it reuse the
+        server's prompt cache instead of re-processing it.
+        """
+        if system_prompt is not None:
+            self._warm_prefix = [{"role": "system", "content": system_prompt}]
+        messages = self._warm_prefix + [{"role": "user", "content": "Hi"}]
+        self._last_request = time.monotonic()
+        t0 = time.perf_counter()
+        if self.provider in ("openai", "groq"):
+            self.client.chat.completions.create(model=self.model, messages=messages, max_tokens=1)
+            bench.value("llm.warm_up_s", time.perf_counter() - t0, provider=self.provider, model=self.model)
+        elif self.provider == "ollama":
+            r = self._ollama.chat(model=self.model, messages=messages, options={"num_predict": 1},
+                                  keep_alive=self.keep_alive)
+            bench.value("llm.warm_up_s", time.perf_counter() - t0, provider=self.provider, model=self.model,
+                        load_s=(r.load_duration or 0) / 1e9, prompt_eval_count=r.prompt_eval_count)
+
+    def start_keep_warm(self, interval_s: float = 240.0) -> None:
+        """
+        Ollama: after interval_s without a request, repeat warm_up() (one token,
+        same system prompt) so the model and its prefix cache stay loaded. Pick
+        interval_s below keep_alive (Ollama's default is 5 minutes).
+        """
+        if self.provider != "ollama" or self._keep_warm is not None:
+            return
+        stop = threading.Event()
+
+        def run():
+            while not stop.is_set():
+                idle = time.monotonic() - self._last_request
+                if idle < interval_s:
+                    stop.wait(interval_s - idle)
+                    continue
+                try:
+                    self.warm_up()
+                    bench.value("llm.keep_warm", 1, model=self.model, idle_s=round(idle, 1))
+                except Exception as e:
+                    logging.warning(f"⚠️ Keep-warm request failed: {e}")
+                    stop.wait(interval_s)
+
+        self._keep_warm = stop
+        threading.Thread(target=run, name="llm-keep-warm", daemon=True).start()
+
+    def stop_keep_warm(self) -> None:
+        if self._keep_warm is not None:
+            self._keep_warm.set()
+            self._keep_warm = None
 
     def _validate(self, response: str, schema: BaseModel) -> Union[BaseModel, str]:
         try:
@@ -46,86 +170,139 @@ class LLMHandler:
         else:
             raise ValueError("Input must be a prompt string or a list of message dictionaries.")
 
-    def stream(self, messages_or_prompt: Union[str, List[dict]], temperature: float = 0.7):
-        messages = self._format_messages(messages_or_prompt)
+    # ---------- Response cache ----------
+    def _cache_key(self, kind: str, messages: List[dict], temperature: float, bypass: bool,
+                   schema=None) -> str | None:
+        if self.cache is None or bypass:
+            return None
+        if not (self.cache_all or temperature == 0 or kind != "call"):
+            return None
+        from modules.llm_cache import cache_key, schema_hash
+        return cache_key(self.provider, self.model, kind, messages, temperature, schema_hash(schema))
 
-        if self.provider == "openai":
-            try:
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    temperature=temperature,
-                    stream=True
-                )
-                for chunk in response:
-                    # Extract the content delta if available
-                    delta = chunk.choices[0].delta.content
-                    if delta:
-                        yield {"content": delta}  # Stream the delta as a dictionary
-                    else:
-                        yield {"content": ""}  # Send an empty string if no delta
-            except Exception as e:
-                yield {"error": f"Streaming error (OpenAI): {e}"}
+    def _cache_put(self, key: str | None, response: str) -> str:
+        if key is not None and response is not None:
+            self.cache.put(key, response)
+        return response
 
-        elif self.provider == "ollama":
-            try:
-                response = ollama_chat(
-                    model=self.model,
-                    messages=messages,
-                    stream=True,
-                    options={"temperature": temperature}
-                )
-                for chunk in response:
-                    yield {"content": chunk.message.content or ""}
-            except Exception as e:
-                yield {"error": f"Streaming error (Ollama): {e}"}
+    def _throttle(self, wait: bool = True) -> None:
+        """Before every sync request: rate limit, and note the time for keep-warm."""
+        if self.limiter is not None:
+            if wait:
+                self.limiter.acquire()
+            else:
+                self.limiter.charge()
+        self._last_request = time.monotonic()
 
-        elif self.provider == "groq":
-            try:
-                with self.client.chat.completions.with_streaming_response.create(
-                    model=self.model,
-                    messages=messages,
-                    temperature=temperature
-                ) as response:
-                    for line in response.iter_lines():
-                        if line:
-                            yield {"content": line}  # No .decode() needed
-            except Exception as e:
-                yield {"error": f"Streaming error (Groq): {e}"}
+    def _record_call(self, kind: str, start_ns: int, messages: List[dict], response) -> None:
+        """Non-streaming request: first and last token arrive together."""
+        end_ns = time.perf_counter_ns()
+        bench.value("llm.call.total_s", (end_ns - start_ns) / 1e9, kind=kind, provider=self.provider,
+                    model=self.model, prompt_chars=prompt_chars(messages),
+                    output_chars=len(response or ""), start_ns=start_ns, last_ns=end_ns)
 
-        else:
-            yield {"error": f"Streaming not supported for provider: {self.provider}"}
+    @staticmethod
+    def _replay(text: str):
+        """Cached text as word-sized chunks, so stream() callers see no difference."""
+        pieces = re.findall(r"\S+\s*|\s+", text)
+        last = len(pieces) - 1
+        for i, piece in enumerate(pieces):
+            yield StreamChunk(piece, "stop" if i == last else None, i, time.perf_counter_ns())
+
+    def stream(self, messages_or_prompt: Union[str, List[dict]], temperature: float = 0.7,
+               bypass_cache: bool = False):
+        messages = self._format_messages(messages_or_prompt)
+        key = self._cache_key("call", messages, temperature, bypass_cache)
+        if key is not None:
+            cached = self.cache.get(key, kind="stream")
+            if cached is not None:
+                yield from self._replay(cached)
+                return
 
+        parts = []
+        failed = False
+        stats = StreamStats(self.provider, self.model, messages, self._requests == 0) if bench.enabled else None
+        self._requests += 1
+        try:
+            for chunk in self._stream(messages, temperature):
+                if chunk.error is not None:
+                    failed = True
+                elif key is not None:
+                    parts.append(chunk.content)
+                if stats is not None:
+                    stats.add(chunk)
+                yield chunk
+        finally:
+            if stats is not None:
+                stats.report(failed)
+        if key is not None and not failed:
+            self.cache.put(key, "".join(parts))
 
-    def call(self, messages_or_prompt: Union[str, List[dict]], temperature: float = 0.7) -> str:
+    def _stream(self, messages: List[dict], temperature: float):
+        # Straight HTTP for every provider: one small parser per line instead
+        # of an SDK model object per token
+        path, body = self._chat_request(messages, temperature, stream=True)
+        parser = delta_parser(self.provider)
+        self._throttle(wait=False)   # interactive: spend quota, don't queue behind batches
+        try:
+            with self._http_client().stream("POST", path, json=body) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    chunk = parser.feed(line)
+                    if chunk is not None:
+                        yield chunk
+                    if parser.done:
+                        break
+        except Exception as e:
+            yield StreamChunk.failure(f"Streaming error ({self.provider}): {e}")
+
+    def call(self, messages_or_prompt: Union[str, List[dict]], temperature: float = 0.7,
+             bypass_cache: bool = False) -> str:
         messages = self._format_messages(messages_or_prompt)
+        key = self._cache_key("call", messages, temperature, bypass_cache)
+        if key is not None and (cached := self.cache.get(key, kind="call")) is not None:
+            return cached
 
+        self._throttle()
+        t0 = time.perf_counter_ns() if bench.enabled else 0
         if self.provider == "openai":
-            return self.client.chat.completions.create(
+            response = self.client.chat.completions.create(
                 model=self.model,
                 messages=messages,
                 temperature=temperature
             ).choices[0].message.content
 
         elif self.provider == "groq":
-            return self.client.chat.completions.create(
+            response = self.client.chat.completions.create(
                 model=self.model,
                 messages=messages,
                 temperature=temperature
             ).choices[0].message.content
 
         elif self.provider == "ollama":
-            return ollama_chat(
+            response = self._ollama.chat(
                 model=self.model,
                 messages=messages,
-                options={"temperature": temperature}
+                options={"temperature": temperature},
+                keep_alive=self.keep_alive
             ).message.content
 
         else:
             raise ValueError("Unsupported provider")
 
+        if t0:
+            self._record_call("call", t0, messages, response)
+        return self._cache_put(key, response)
 
-    def call_schema(self, messages: List, schema: BaseModel, temperature: float = 0.7) -> Union[BaseModel, str]:
+
+    def call_schema(self, messages: List, schema: BaseModel, temperature: float = 0.7,
+                    bypass_cache: bool = False) -> Union[BaseModel, str]:
+        key = self._cache_key("schema", messages, temperature, bypass_cache, schema=schema)
+        if key is not None and (cached := self.cache.get(key, kind="schema")) is not None:
+            return self._validate(cached, schema)
+
+        self._throttle()
+        t0 = time.perf_counter_ns() if bench.enabled else 0
         if self.provider == "openai":
             response = self.client.beta.chat.completions.parse(
                 model=self.model,
@@ -140,65 +317,95 @@ class LLMHandler:
                 response_model=schema
             ).model_dump_json()
         elif self.provider == "ollama":
-            response = ollama_chat(
+            response = self._ollama.chat(
                 model=self.model,
                 messages=messages,
-                format=schema.model_json_schema(),
-                options={"temperature": temperature}
+                format=json_schema(schema),
+                options={"temperature": temperature},
+                keep_alive=self.keep_alive
             ).message.content
         else:
             raise ValueError("Unsupported provider")
 
-        return self._validate(response, schema)
+        if t0:
+            self._record_call("schema", t0, messages, response)
+        return self._validate(self._cache_put(key, response), schema)
     
-    def call_schema_prompt(self, prompt: str, schema: BaseModel, temperature: float = 0.7) -> Union[BaseModel, str]:
+    def call_schema_prompt(self, prompt: str, schema: BaseModel, temperature: float = 0.7,
+                           bypass_cache: bool = False) -> Union[BaseModel, str]:
         messages = [{"role": "user", "content": prompt}]
-        if self.provider == "openai":
-            response = self.client.beta.chat.completions.parse(
-                model=self.model,
-                messages=messages,
-                temperature=temperature,
-                response_format=schema
-            ).choices[0].message.content
-        elif self.provider == "groq":
-            response = self.schemed_client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                response_model=schema
-            ).model_dump_json()
-        elif self.provider == "ollama":
-            response = ollama_chat(
-                model=self.model,
-                messages=messages,
-                format=schema.model_json_schema(),
-                options={"temperature": temperature}
-            ).message.content
-        else:
-            raise ValueError("Unsupported provider")
-
-        return self._validate(response, schema)
+        return self.call_schema(messages, schema, temperature, bypass_cache=bypass_cache)
 
-    def call_json(self, messages_or_prompt: Union[str, List[dict]], temperature: float = 0.7) -> Union[str, dict]:
+    def call_json(self, messages_or_prompt: Union[str, List[dict]], temperature: float = 0.7,
+                  bypass_cache: bool = False) -> Union[str, dict]:
         messages = self._format_messages(messages_or_prompt)
+        key = self._cache_key("json", messages, temperature, bypass_cache, schema="json")
+        if key is not None and (cached := self.cache.get(key, kind="json")) is not None:
+            return cached
 
+        self._throttle()
+        t0 = time.perf_counter_ns() if bench.enabled else 0
         if self.provider == "openai":
             response = self.client.chat.completions.create(
                 model=self.model,
                 messages=messages,
                 temperature=temperature,
                 response_format={"type": "json_object"}
-            )
-            return response.choices[0].message.content
+            ).choices[0].message.content
         elif self.provider == "ollama":
-            return ollama_chat(
+            response = self._ollama.chat(
                 model=self.model,
                 messages=messages,
                 format="json",
-                options={"temperature": temperature}
+                options={"temperature": temperature},
+                keep_alive=self.keep_alive
             ).message.content
         else:
             raise ValueError("JSON format not supported for this provider")
 
+        if t0:
+            self._record_call("json", t0, messages, response)
+        return self._cache_put(key, response)
+
+
+    # ---------- Batches ----------
+    # Thread pool over the single-request methods, like embed_many(). Results
+    # come back in input order; a failed item holds its exception instead of
+    # aborting the batch. Requests still pass the handler's rate limiter.
+
+    def call_many(self, prompts: List[Union[str, List[dict]]], temperature: float = 0.7,
+                  concurrency: int = 4, bypass_cache: bool = False) -> List[Union[str, Exception]]:
+        return self._run_many("call", lambda p: self.call(p, temperature, bypass_cache=bypass_cache),
+                              prompts, concurrency)
+
+    def call_schema_many(self, messages_list: List[List[dict]], schema: BaseModel, temperature: float = 0.7,
+                         concurrency: int = 4, bypass_cache: bool = False) -> List[Union[BaseModel, str, Exception]]:
+        return self._run_many("schema", lambda m: self.call_schema(m, schema, temperature, bypass_cache=bypass_cache),
+                              messages_list, concurrency)
+
+    def call_json_many(self, prompts: List[Union[str, List[dict]]], temperature: float = 0.7,
+                       concurrency: int = 4, bypass_cache: bool = False) -> List[Union[str, Exception]]:
+        return self._run_many("json", lambda p: self.call_json(p, temperature, bypass_cache=bypass_cache),
+                              prompts, concurrency)
+
+    def _run_many(self, kind: str, fn, items: list, concurrency: int) -> list:
+        from concurrent.futures import ThreadPoolExecutor
+
+        def one(item):
+            try:
+                return fn(item)
+            except Exception as e:
+                return e
+
+        if not items:
+            return []
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(items)))) as pool:
+            results = list(pool.map(one, items))
+        errors = sum(isinstance(r, Exception) for r in results)
+        bench.value("llm.batch.total_s", time.perf_counter() - t0, kind=kind, provider=self.provider,
+                    model=self.model, items=len(items), errors=errors, concurrency=concurrency)
+        return results
 
     def embed(self, text: str) -> List[float]:
         if self.provider == "openai":
@@ -207,9 +414,191 @@ class LLMHandler:
                 input=text
             ).data[0].embedding
         elif self.provider == "ollama":
-            return ollama_embeddings(
+            return self._ollama.embeddings(
                 model=self.model,
                 prompt=text
             ).embedding
         else:
-            raise ValueError("Embeddings not supported for this provider")
\ No newline at end of file
+            raise ValueError("Embeddings not supported for this provider")
+
+
+    def embed_many(self, texts: List[str], batch_size: int = 32, concurrency: int = 4,
+                   cache=None) -> "np.ndarray":
+        """
+        Embed many texts; returns a C-contiguous float32 array (len(texts), dim).
+
+        Repeated texts are embedded once, and cache (an EmbeddingCache) skips
+        texts seen before. Misses go out in batches of batch_size where the
+        provider takes list input (OpenAI, Ollama /api/embed), with up to
+        concurrency requests in flight.
+        """
+        import numpy as np
+        from concurrent.futures import ThreadPoolExecutor
+
+        if self.provider not in ("openai", "ollama"):
+            raise ValueError("Embeddings not supported for this provider")
+        unique = list(dict.fromkeys(texts))
+        vectors, missing = cache.lookup(unique) if cache is not None else ({}, unique)
+
+        batches = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+        if batches:
+            with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(batches)))) as pool:
+                for batch, embedded in zip(batches, pool.map(self._embed_batch, batches)):
+                    for text, vec in zip(batch, embedded):
+                        vectors[text] = vec
+                        if cache is not None:
+                            cache.add(text, vec)
+            if cache is not None:
+                cache.save()
+
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        dim = len(vectors[unique[0]])
+        out = np.empty((len(texts), dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            out[i] = vectors[text]
+        return out
+
+    def _embed_batch(self, batch: List[str]) -> List[List[float]]:
+        if self.provider == "openai":
+            data = self.client.embeddings.create(model=self.model, input=batch).data
+            return [d.embedding for d in sorted(data, key=lambda d: d.index)]
+        if hasattr(self._ollama, "embed"):
+            return self._ollama.embed(model=self.model, input=batch).embeddings
+        # Older ollama clients only have the one-prompt endpoint
+        return [self._ollama.embeddings(model=self.model, prompt=t).embedding for t in batch]
+
+
+    # ---------- HTTP streaming and asyncio API ----------
+    # Pooled httpx clients per handler (keep-alive, connect/read timeouts),
+    # speaking the providers' HTTP APIs directly: a sync one for stream(),
+    # an async one for the a* methods. Groq is OpenAI-compatible. The async
+    # client belongs to the event loop that first used it; call aclose()
+    # before that loop ends.
+
+    def _client_options(self) -> dict:
+        import httpx
+        headers = {}
+        key = self.openai_api_key if self.provider == "openai" else self.groq_api_key
+        if self.provider in ("openai", "groq") and key:
+            headers["Authorization"] = f"Bearer {key}"
+        return dict(
+            base_url=self.base_url,
+            headers=headers,
+            timeout=self._timeout(),
+            limits=httpx.Limits(max_connections=self.max_connections,
+                                max_keepalive_connections=self.max_connections,
+                                keepalive_expiry=60.0),
+        )
+
+    def _http_client(self):
+        """Sync twin of _async_client(), used by stream()."""
+        if self._client is None:
+            import httpx
+            self._client = httpx.Client(**self._client_options())
+        return self._client
+
+    def _async_client(self):
+        if self._aclient is None:
+            import httpx
+            self._aclient = httpx.AsyncClient(**self._client_options())
+        return self._aclient
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def aclose(self):
+        if self._aclient is not None:
+            await self._aclient.aclose()
+            self._aclient = None
+
+    def _chat_request(self, messages: List[dict], temperature: float, stream: bool, **extra) -> tuple[str, dict]:
+        self._last_request = time.monotonic()
+        if self.provider == "ollama":
+            body = {"model": self.model, "messages": messages, "stream": stream,
+                    "options": {"temperature": temperature}}
+            if self.keep_alive is not None:
+                body["keep_alive"] = self.keep_alive
+            if "format" in extra:
+                body["format"] = extra["format"]
+            return "/api/chat", body
+        body = {"model": self.model, "messages": messages, "temperature": temperature, "stream": stream}
+        if "response_format" in extra:
+            body["response_format"] = extra["response_format"]
+        return "/chat/completions", body
+
+    async def astream(self, messages_or_prompt: Union[str, List[dict]], temperature: float = 0.7):
+        """
+        Async twin of stream(). Closing the generator (break, aclose() or task
+        cancellation) closes the upstream HTTP response at once, so the
+        provider stops generating.
+        """
+        messages = self._format_messages(messages_or_prompt)
+        path, body = self._chat_request(messages, temperature, stream=True)
+        parser = delta_parser(self.provider)
+        client = self._async_client()
+        stats = (StreamStats(self.provider, self.model, messages, self._requests == 0, api="async")
+                 if bench.enabled else None)
+        self._requests += 1
+        failed = False
+        try:
+            async with client.stream("POST", path, json=body) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    chunk = parser.feed(line)
+                    if chunk is not None:
+                        if stats is not None:
+                            stats.add(chunk)
+                            failed = failed or chunk.error is not None
+                        yield chunk
+                    if parser.done:
+                        break
+        except Exception as e:
+            failed = True
+            yield StreamChunk.failure(f"Streaming error ({self.provider}): {e}")
+        finally:
+            if stats is not None:
+                stats.report(failed)
+
+    async def _achat(self, messages: List[dict], temperature: float, **extra) -> str:
+        path, body = self._chat_request(messages, temperature, stream=False, **extra)
+        response = await self._async_client().post(path, json=body)
+        response.raise_for_status()
+        data = response.json()
+        if self.provider == "ollama":
+            return data["message"]["content"]
+        return data["choices"][0]["message"]["content"]
+
+    async def acall(self, messages_or_prompt: Union[str, List[dict]], temperature: float = 0.7) -> str:
+        return await self._achat(self._format_messages(messages_or_prompt), temperature)
+
+    async def acall_schema(self, messages: List, schema: BaseModel, temperature: float = 0.7) -> Union[BaseModel, str]:
+        schema_dict = json_schema(schema)
+        if self.provider == "ollama":
+            response = await self._achat(messages, temperature, format=schema_dict)
+        elif self.provider == "openai":
+            response = await self._achat(messages, temperature, response_format={
+                "type": "json_schema",
+                "json_schema": {"name": schema.__name__, "schema": schema_dict},
+            })
+        else:
+            # Groq: JSON mode plus the schema in the prompt
+            hint = {"role": "system", "content": f"Reply with JSON matching this schema: {json.dumps(schema_dict)}"}
+            response = await self._achat([hint] + list(messages), temperature,
+                                         response_format={"type": "json_object"})
+        return self._validate(response, schema)
+
+    async def aembed(self, text: str) -> List[float]:
+        client = self._async_client()
+        if self.provider == "openai":
+            response = await client.post("/embeddings", json={"model": self.model, "input": text})
+            response.raise_for_status()
+            return response.json()["data"][0]["embedding"]
+        elif self.provider == "ollama":
+            response = await client.post("/api/embeddings", json={"model": self.model, "prompt": text})
+            response.raise_for_status()
+            return response.json()["embedding"]
+        else:
+            raise ValueError("Embeddings not supported for this provider")
@@ -0,0 +1,217 @@
+# modules/llm_stream.py
+import json
+import time
+from bisect import bisect_left
+
+from bench import bench
+
+
+class StreamChunk:
+    """
+    One streamed LLM delta.
+
+    content is never empty except on the closing chunk, which carries only
+    finish_reason ("stop", "length", ...) and, when the server reports them,
+    usage counters (Ollama: load_duration, prompt_eval_count, ...). index
+    counts content chunks from 0, t_ns is time.perf_counter_ns() when the
+    delta was received, and error is set (with content None) when the stream
+    failed. Supports the dict idioms older callers use: chunk.get("content",
+    ""), "error" in chunk, chunk["content"].
+    """
+
+    __slots__ = ("content", "finish_reason", "index", "t_ns", "error", "usage")
+
+    def __init__(self, content: str | None = "", finish_reason: str | None = None, index: int = 0,
+                 t_ns: int = 0, error: str | None = None, usage: dict | None = None):
+        self.content = content
+        self.finish_reason = finish_reason
+        self.index = index
+        self.t_ns = t_ns
+        self.error = error
+        self.usage = usage
+
+    @classmethod
+    def failure(cls, message: str) -> "StreamChunk":
+        return cls(None, "error", t_ns=time.perf_counter_ns(), error=message)
+
+    def get(self, key: str, default=None):
+        value = getattr(self, key, None) if key in self.__slots__ else None
+        return default if value is None else value
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__slots__ and getattr(self, key) is not None
+
+    def __getitem__(self, key: str):
+        if key not in self:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __repr__(self):
+        if self.error is not None:
+            return f"StreamChunk(error={self.error!r})"
+        return f"StreamChunk({self.content!r}, index={self.index}, finish_reason={self.finish_reason!r})"
+
+
+class SSEDeltaParser:
+    """
+    OpenAI-style server-sent events (OpenAI, Groq), fed one line at a time.
+    feed() returns a StreamChunk for content or a finish reason, None for
+    keep-alives, empty deltas and other event fields; done turns True at
+    "data: [DONE]".
+
+    The one exception to "no empty chunks": when the finish reason (and,
+    for Ollama, usage) arrives on its own, it comes as a final chunk with
+    content "". Holding every token back until the next one arrives, just
+    to attach the finish reason to it, would add a token gap to first
+    audio. Consumers that only want text test `if chunk.content`, which
+    also skips failures (content None).
+    """
+
+    def __init__(self):
+        self.index = 0
+        self.done = False
+        self.finish_reason = None
+
+    def feed(self, line) -> StreamChunk | None:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        if not line.startswith("data:"):
+            return None
+        payload = line[5:].strip()
+        if payload == "[DONE]":
+            self.done = True
+            return None
+        data = json.loads(payload)
+        if data.get("error"):
+            self.done = True
+            return StreamChunk.failure(str(data["error"]))
+        choices = data.get("choices")
+        if not choices:
+            return None
+        choice = choices[0]
+        content = (choice.get("delta") or {}).get("content")
+        finish = choice.get("finish_reason")
+        if not content and not finish:
+            return None
+        if finish:
+            self.finish_reason = finish
+        chunk = StreamChunk(content or "", finish, self.index, time.perf_counter_ns())
+        if content:
+            self.index += 1
+        return chunk
+
+
+OLLAMA_USAGE = ("load_duration", "prompt_eval_count", "prompt_eval_duration", "eval_count", "eval_duration")
+
+
+class NDJSONDeltaParser:
+    """Ollama /api/chat newline-delimited JSON, same contract as SSEDeltaParser (closing chunk included)."""
+
+    def __init__(self):
+        self.index = 0
+        self.done = False
+        self.finish_reason = None
+
+    def feed(self, line) -> StreamChunk | None:
+        if not line:
+            return None
+        data = json.loads(line)
+        if data.get("error"):
+            self.done = True
+            return StreamChunk.failure(str(data["error"]))
+        content = (data.get("message") or {}).get("content")
+        finish = data.get("done_reason") or ("stop" if data.get("done") else None)
+        usage = None
+        if data.get("done"):
+            self.done = True
+            usage = {k: data[k] for k in OLLAMA_USAGE if k in data} or None
+        if not content and not finish:
+            return None
+        if finish:
+            self.finish_reason = finish
+        chunk = StreamChunk(content or "", finish, self.index, time.perf_counter_ns(), usage=usage)
+        if content:
+            self.index += 1
+        return chunk
+
+
+def delta_parser(provider: str):
+    return NDJSONDeltaParser() if provider == "ollama" else SSEDeltaParser()
+
+
+GAP_EDGES_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+COLD_LOAD_S = 0.25   # Ollama load_duration above this means the model was (re)loaded
+
+
+def prompt_chars(messages) -> int:
+    return sum(len(str(m.get("content", ""))) for m in messages)
+
+
+class StreamStats:
+    """
+    Timing for one stream from its chunks' t_ns: request start, first and
+    last token, tokens/s and a histogram of inter-token gaps (GAP_EDGES_MS,
+    upper bucket edges). Only created when bench is enabled.
+
+    TTFT is also reported as llm.stream.ttft_cold_s or ttft_warm_s. Cold
+    means the server had to load the model (from usage), or, without usage,
+    that this was the handler's first request (new connection).
+    """
+
+    __slots__ = ("tags", "start_ns", "first_ns", "last_ns", "tokens", "chars", "gaps", "usage", "first_request")
+
+    def __init__(self, provider: str, model: str, messages, first_request: bool = False, **tags):
+        self.tags = dict(provider=provider, model=model, prompt_chars=prompt_chars(messages), **tags)
+        self.first_request = first_request
+        self.usage = None
+        self.start_ns = time.perf_counter_ns()
+        self.first_ns = 0
+        self.last_ns = 0
+        self.tokens = 0
+        self.chars = 0
+        self.gaps = [0] * (len(GAP_EDGES_MS) + 1)
+
+    def add(self, chunk: StreamChunk):
+        if chunk.usage:
+            self.usage = chunk.usage
+        if not chunk.content:
+            return
+        t = chunk.t_ns
+        if self.tokens:
+            self.gaps[bisect_left(GAP_EDGES_MS, (t - self.last_ns) / 1e6)] += 1
+        else:
+            self.first_ns = t
+        self.last_ns = t
+        self.tokens += 1
+        self.chars += len(chunk.content)
+
+    def _gap_quantile(self, q: float) -> float:
+        target = q * (self.tokens - 1)
+        seen = 0
+        for i, n in enumerate(self.gaps):
+            seen += n
+            if n and seen >= target:
+                return GAP_EDGES_MS[min(i, len(GAP_EDGES_MS) - 1)]   # ">1000" reports 1000
+        return 0.0
+
+    def report(self, failed: bool = False):
+        tags = dict(self.tags, output_chars=self.chars, output_tokens=self.tokens, failed=failed)
+        end_ns = self.last_ns or time.perf_counter_ns()
+        bench.value("llm.stream.total_s", (end_ns - self.start_ns) / 1e9, start_ns=self.start_ns,
+                    first_ns=self.first_ns, last_ns=self.last_ns, **tags)
+        if not self.tokens:
+            return
+        ttft = (self.first_ns - self.start_ns) / 1e9
+        bench.value("llm.stream.ttft_s", ttft, **tags)
+        if self.usage and "load_duration" in self.usage:
+            load_s = self.usage["load_duration"] / 1e9
+            bench.value("llm.stream.ttft_cold_s" if load_s > COLD_LOAD_S else "llm.stream.ttft_warm_s", ttft,
+                        load_s=load_s, prompt_eval_count=self.usage.get("prompt_eval_count"), **tags)
+        else:
+            bench.value("llm.stream.ttft_cold_s" if self.first_request else "llm.stream.ttft_warm_s", ttft, **tags)
+        if self.tokens > 1 and self.last_ns > self.first_ns:
+            bench.value("llm.stream.tokens_per_s", (self.tokens - 1) / ((self.last_ns - self.first_ns) / 1e9), **tags)
+            hist = {(f"<={e}" if i < len(GAP_EDGES_MS) else f">{GAP_EDGES_MS[-1]}"): n
+                    for i, (e, n) in enumerate(zip(GAP_EDGES_MS + (None,), self.gaps)) if n}
+            bench.value("llm.stream.gap_p90_ms", self._gap_quantile(0.9), p50_ms=self._gap_quantile(0.5),
+                        hist_ms=hist, **tags)
@@ -0,0 +1,85 @@
+# modules/rate_limit.py
+import os
+import threading
+import time
+
+from bench import bench
+
+# Requests per minute per provider when the caller doesn't say; 0 = unlimited.
+# Groq's free tier allows 30 rpm per model; local Ollama just queues.
+DEFAULT_RPM = {
+    "openai": float(os.getenv("LLM_RPM_OPENAI", "0")),
+    "groq": float(os.getenv("LLM_RPM_GROQ", "30")),
+    "ollama": float(os.getenv("LLM_RPM_OLLAMA", "0")),
+}
+
+
+class RateLimiter:
+    """
+    Token bucket shared by threads: `rpm` requests per minute, bursts of up
+    to `burst`. charge() spends a token without waiting (the balance may go
+    negative), so interactive requests are never held but still push
+    background ones back.
+    """
+
+    def __init__(self, rpm: float, burst: int = 1):
+        self.rate = rpm / 60.0
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def configure(self, rpm: float, burst: int = 1):
+        """Change the quota in place; everyone holding this limiter sees it."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rpm / 60.0
+            self.burst = max(1, burst)
+            self._tokens = min(self._tokens, float(self.burst))
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def charge(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1
+
+    def acquire(self) -> float:
+        """Blocks until a request may go out; returns the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    break
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+        if waited:
+            bench.value("llm.rate_limit.wait_s", waited)
+        return waited
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter_for(provider: str, rpm: float | None = None, burst: int = 1) -> RateLimiter | None:
+    """
+    One shared limiter per provider, so separate handlers share the quota. A
+    different rpm/burst reconfigures that limiter in place (last one wins)
+    rather than splitting the quota between old and new handlers.
+    """
+    rpm = DEFAULT_RPM.get(provider) if rpm is None else rpm
+    if not rpm:
+        return None
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limiter = _limiters[provider] = RateLimiter(rpm, burst)
+        elif limiter.rate != rpm / 60.0 or limiter.burst != max(1, burst):
+            limiter.configure(rpm, burst)
+        return limiter
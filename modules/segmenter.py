@@ -0,0 +1,147 @@
+# modules/segmenter.py
+
+TERMINATORS = frozenset(".!?…")
+CLAUSE_MARKS = frozenset(",;:—")
+CLOSERS = frozenset("\"'”’)]")
+OPENERS = "\"'“‘(["
+
+# Lower-case, without the final period
+ABBREVIATIONS = frozenset({
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "approx", "dept", "est", "fig",
+    "vol", "mt", "ft", "inc", "ltd", "co", "jan", "feb", "mar", "apr", "jun", "jul", "aug",
+    "sep", "sept", "oct", "nov", "dec", "e.g", "i.e", "cf", "a.m", "p.m", "u.s", "u.k",
+})
+
+_NEED_MORE = -1
+
+
+class SentenceSegmenter:
+    """
+    Splits streamed LLM text into speakable chunks as it arrives.
+
+    Each character is scanned once; a possible boundary at the end of the
+    input is left pending until the next feed(). Boundaries are ., ! or ?
+    (runs like "?!" or "..." count as one, closing quotes and brackets stay
+    with the sentence) followed by whitespace, except after abbreviations,
+    initials and list numbers; "3.5" or "example.com" never split.
+
+    Time to first audio vs prosody:
+    - min_clause_words: also cut after , ; : or a dash once the chunk has
+      this many words (0 disables). With clause_first_only only the first
+      chunk of a response is cut this way, so audio starts early and the rest
+      is spoken in whole sentences.
+    - max_chars: no chunk is longer than this, from feed() or flush(); cut
+      at the last whitespace within the limit, or mid-run when there is none
+      (e.g. a long run of punctuation).
+    """
+
+    def __init__(self, min_clause_words: int = 6, max_chars: int = 200, clause_first_only: bool = True,
+                 abbreviations=ABBREVIATIONS):
+        self.min_clause_words = min_clause_words
+        self.max_chars = max_chars
+        self.clause_first_only = clause_first_only
+        self.abbreviations = abbreviations
+        self.emitted = 0
+        self._buf = ""
+        self._pos = 0
+        self._reset_segment()
+
+    def _reset_segment(self):
+        self._words = 0          # finished words in the current chunk
+        self._in_word = False
+        self._word_start = 0
+        self._last_space = -1
+
+    def feed(self, text: str) -> list[str]:
+        """Adds streamed text; returns the chunks it completed (maybe none)."""
+        out = []
+        buf = self._buf + text
+        n = len(buf)
+        i = self._pos
+        while i < n:
+            c = buf[i]
+            if c.isspace():
+                if self._in_word:
+                    self._words += 1
+                    self._in_word = False
+                self._last_space = i
+            else:
+                if not self._in_word:
+                    self._in_word = True
+                    self._word_start = i
+                if c in TERMINATORS or c in CLAUSE_MARKS:
+                    end, resume = self._boundary(buf, i, n)
+                    if end == _NEED_MORE:
+                        break
+                    if end is not None:
+                        self._emit(out, buf[:end])
+                        buf = buf[end:]
+                        n = len(buf)
+                        i = 0
+                        continue
+                    i = resume
+            i += 1
+            if self.max_chars and i >= self.max_chars:
+                cut = self._last_space if self._last_space > 0 else i
+                self._emit(out, buf[:cut])
+                buf = buf[cut:]
+                n = len(buf)
+                i = 0
+        self._buf = buf
+        self._pos = i
+        return out
+
+    def flush(self) -> list[str]:
+        """End of stream: whatever is left, as chunks (maybe none)."""
+        out = []
+        self._emit(out, self._buf)
+        self._buf = ""
+        self._pos = 0
+        self.emitted = 0
+        return out
+
+    def _emit(self, out: list, segment: str):
+        self._reset_segment()
+        segment = segment.strip()
+        limit = self.max_chars
+        # A boundary found past the limit (closers, "?!!" runs) or a pending tail can overshoot
+        while limit and len(segment) > limit:
+            cut = next((k for k in range(limit, 0, -1) if segment[k].isspace()), limit)
+            out.append(segment[:cut].rstrip())
+            self.emitted += 1
+            segment = segment[cut:].lstrip()
+        if segment:
+            out.append(segment)
+            self.emitted += 1
+
+    def _boundary(self, buf: str, i: int, n: int):
+        """(end, resume): end of the chunk, None if i is no boundary, or _NEED_MORE."""
+        j = i + 1
+        if buf[i] in TERMINATORS:
+            while j < n and buf[j] in TERMINATORS:
+                j += 1
+        elif not self._clause_ready():
+            return None, i
+        while j < n and buf[j] in CLOSERS:
+            j += 1
+        if j >= n:
+            return _NEED_MORE, i
+        if not buf[j].isspace():
+            return None, j - 1
+        if buf[i] == "." and j == i + 1 and self._keeps_period(buf[self._word_start:i]):
+            return None, i
+        return j, i
+
+    def _clause_ready(self) -> bool:
+        if not self.min_clause_words or (self.clause_first_only and self.emitted):
+            return False
+        return self._words + 1 >= self.min_clause_words
+
+    def _keeps_period(self, word: str) -> bool:
+        """True when the period ends an abbreviation, initial or list number, not a sentence."""
+        word = word.lstrip(OPENERS)
+        if word.lower() in self.abbreviations:
+            return True
+        if len(word) == 1 and word.isupper():
+            return True                          # "J. R. R. Tolkien"
+        return word.isdigit() and self._words == 0   # "1. Preheat the oven"
@@ -0,0 +1,134 @@
+# modules/semantic_cache.py
+import logging
+import threading
+import time
+
+import numpy as np
+
+from bench import bench
+from modules.llm_handler import LLMHandler
+
+
+class SemanticCache:
+    """
+    Answers keyed by meaning rather than exact text.
+
+    Questions are embedded and kept as unit-length rows of one preallocated
+    float32 matrix, so a lookup is a single matrix-vector product (cosine
+    similarity) over all entries. A hit needs similarity >= threshold and an
+    entry younger than ttl_s; when full, expired entries go first, then the
+    least recently used.
+    """
+
+    def __init__(self, embed, threshold: float = 0.92, max_entries: int = 256, ttl_s: float = 3600.0):
+        self.embed = embed
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._matrix = None                      # (max_entries, dim), allocated on first store
+        self._created = np.zeros(max_entries)
+        self._last_used = np.zeros(max_entries)
+        self._answers = [None] * max_entries
+        self._questions = [None] * max_entries
+        self._llm_s = np.zeros(max_entries)      # what generating the answer cost
+        self._used = np.zeros(max_entries, dtype=bool)
+        self.hits = 0
+        self.misses = 0
+        self.saved_s = 0.0
+
+    def _vector(self, text: str) -> np.ndarray:
+        v = np.asarray(self.embed(text), dtype=np.float32)
+        n = np.linalg.norm(v)
+        return v / n if n else v
+
+    def lookup(self, question: str, vector: np.ndarray | None = None):
+        """Returns (answer, similarity, vector); answer is None on a miss."""
+        v = self._vector(question) if vector is None else vector
+        now = time.time()
+        with self._lock:
+            if self._matrix is None or not self._used.any():
+                self.misses += 1
+                return None, 0.0, v
+            sims = self._matrix @ v
+            live = self._used & (now - self._created <= self.ttl_s)
+            sims = np.where(live, sims, -1.0)
+            best = int(np.argmax(sims))
+            sim = float(sims[best])
+            if sim < self.threshold:
+                self.misses += 1
+                bench.value("llm.semantic_cache.miss", 1, best_sim=round(sim, 3))
+                return None, sim, v
+            self._last_used[best] = now
+            self.hits += 1
+            self.saved_s += self._llm_s[best]
+            answer = self._answers[best]
+        bench.value("llm.semantic_cache.hit", 1, sim=round(sim, 3), hits=self.hits)
+        bench.value("llm.semantic_cache.saved_s", self._llm_s[best], total_saved_s=round(self.saved_s, 3))
+        logging.info(f"♻️ Semantic cache hit ({sim:.3f}) for: {question}")
+        return answer, sim, v
+
+    def store(self, question: str, answer: str, llm_s: float, vector: np.ndarray | None = None):
+        v = self._vector(question) if vector is None else vector
+        now = time.time()
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = np.zeros((self.max_entries, v.shape[0]), dtype=np.float32)
+            slot = self._free_slot(now)
+            self._matrix[slot] = v
+            self._created[slot] = now
+            self._last_used[slot] = now
+            self._answers[slot] = answer
+            self._questions[slot] = question
+            self._llm_s[slot] = llm_s
+            self._used[slot] = True
+
+    def _free_slot(self, now: float) -> int:
+        free = np.flatnonzero(~self._used)
+        if free.size:
+            return int(free[0])
+        expired = np.flatnonzero(now - self._created > self.ttl_s)
+        if expired.size:
+            return int(expired[0])
+        bench.value("llm.semantic_cache.evicted", 1)
+        return int(np.argmin(self._last_used))
+
+
+class SemanticCachedLLM:
+    """
+    Drop-in for LLMHandler.stream(): answers near-duplicates of earlier
+    questions from the cache, otherwise streams from llm and remembers the
+    answer. Only the latest user message is matched.
+    """
+
+    def __init__(self, llm, cache: SemanticCache):
+        self.llm = llm
+        self.cache = cache
+
+    def stream(self, messages, temperature: float = 0.7):
+        question = next((m["content"] for m in reversed(messages) if m.get("role") == "user"), None)
+        if not question:
+            yield from self.llm.stream(messages, temperature=temperature)
+            return
+        try:
+            answer, _, vector = self.cache.lookup(question)
+        except Exception as e:
+            logging.warning(f"⚠️ Semantic cache lookup failed: {e}")
+            yield from self.llm.stream(messages, temperature=temperature)
+            return
+        if answer is not None:
+            yield from LLMHandler._replay(answer)
+            return
+
+        t0 = time.perf_counter()
+        parts = []
+        failed = False
+        for chunk in self.llm.stream(messages, temperature=temperature):
+            if "error" in chunk:
+                failed = True
+            else:
+                parts.append(chunk.get("content", ""))
+            yield chunk
+        answer = "".join(parts).strip()
+        if answer and not failed:
+            self.cache.store(question, answer, time.perf_counter() - t0, vector=vector)
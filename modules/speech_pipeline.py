@@ -0,0 +1,138 @@
+# modules/speech_pipeline.py
+import logging
+import queue
+import threading
+import time
+
+from bench import bench
+
+_DONE = object()
+_END_ITEM = object()
+
+
+class SpeechPipeline:
+    """
+    Three concurrent stages joined by bounded queues:
+
+        reader (caller) --text_q--> synthesis worker --audio_q--> playback worker
+
+    The caller keeps consuming LLM tokens and only submit()s finished
+    sentences; sentence N+1 is synthesised while sentence N is playing.
+    text_q is deliberately roomy so the reader never waits on audio, audio_q
+    is small because rendered audio is what costs memory.
+
+    synthesize(item) -> iterable of audio pieces (None = nothing to play).
+    Pieces are handed to play(piece) as soon as each one is rendered, so a
+    streaming synthesiser gets its first chunk out while the rest of the
+    sentence is still being computed. end_item() runs after the last piece
+    of each item (e.g. to insert the inter-sentence pause).
+
+    With a TurnTrace, each item's synthesis and playback time is recorded
+    against the turn (turn.synth_s / turn.play_s, tagged with the item's
+    index) and the first piece played stamps the turn's first_audio.
+    """
+
+    def __init__(self, synthesize, play, end_item=None, text_queue: int = 32, audio_queue: int = 2,
+                 name: str = "tts", trace=None):
+        self.synthesize = synthesize
+        self.play = play
+        self.end_item = end_item
+        self.name = name
+        self.trace = trace
+        self._text_q = queue.Queue(maxsize=text_queue)
+        self._audio_q = queue.Queue(maxsize=audio_queue)
+        self._t0 = time.perf_counter()
+        self.reader_blocked_s = 0.0
+        self.synth_idle_s = 0.0
+        self.play_idle_s = 0.0
+        self.first_audio_s = None
+        self.submitted = 0
+        self._synth_thread = threading.Thread(target=self._synth_loop, daemon=True)
+        self._play_thread = threading.Thread(target=self._play_loop, daemon=True)
+        self._synth_thread.start()
+        self._play_thread.start()
+
+    # ---------- Reader side ----------
+    def submit(self, item):
+        """Hand a sentence to the synthesis stage (normally returns immediately)."""
+        self.submitted += 1
+        try:
+            self._text_q.put_nowait(item)
+        except queue.Full:
+            t0 = time.perf_counter()
+            self._text_q.put(item)
+            blocked = time.perf_counter() - t0
+            self.reader_blocked_s += blocked
+            logging.warning(f"⚠️ Speech pipeline backed up; reader waited {blocked:.2f}s")
+        bench.value(f"{self.name}.pipeline.text_q.depth", self._text_q.qsize())
+
+    def close(self, timeout: float | None = None):
+        """Signal end of text and wait until everything submitted has been played."""
+        self._text_q.put(_DONE)
+        self._synth_thread.join(timeout)
+        self._play_thread.join(timeout)
+        total = time.perf_counter() - self._t0
+        bench.value(f"{self.name}.pipeline.reader_blocked_s", self.reader_blocked_s, sentences=self.submitted)
+        bench.value(f"{self.name}.pipeline.synth_idle_s", self.synth_idle_s, total_s=round(total, 3))
+        bench.value(f"{self.name}.pipeline.play_idle_s", self.play_idle_s, total_s=round(total, 3))
+
+    # ---------- Workers ----------
+    def _synth_loop(self):
+        index = -1
+        while True:
+            t0 = time.perf_counter()
+            item = self._text_q.get()
+            self.synth_idle_s += time.perf_counter() - t0
+            if item is _DONE:
+                self._audio_q.put(_DONE)
+                return
+            index += 1
+            try:
+                pieces = self.synthesize(item)
+                if pieces is None:
+                    continue
+                t0 = time.perf_counter()
+                n = 0
+                for piece in pieces:
+                    if n == 0:
+                        bench.value(f"{self.name}.pipeline.synth_first_chunk_s", time.perf_counter() - t0)
+                    n += 1
+                    self._audio_q.put(piece)
+                    bench.value(f"{self.name}.pipeline.audio_q.depth", self._audio_q.qsize())
+                synth_s = time.perf_counter() - t0
+                bench.value(f"{self.name}.pipeline.synth_s", synth_s, chunks=n)
+                if self.trace:
+                    self.trace.value("synth", synth_s, sentence=index, chunks=n)
+            except Exception as e:
+                logging.error(f"❌ Synthesis failed: {e}")
+            self._audio_q.put(_END_ITEM)
+
+    def _play_loop(self):
+        index = 0
+        item_play_s = 0.0
+        while True:
+            t0 = time.perf_counter()
+            audio = self._audio_q.get()
+            self.play_idle_s += time.perf_counter() - t0
+            if audio is _DONE:
+                return
+            if audio is _END_ITEM:
+                if self.end_item:
+                    self.end_item()
+                if self.trace and item_play_s:
+                    self.trace.value("play", item_play_s, sentence=index)
+                index += 1
+                item_play_s = 0.0
+                continue
+            if self.first_audio_s is None:
+                self.first_audio_s = time.perf_counter() - self._t0
+                bench.value(f"{self.name}.pipeline.first_audio_s", self.first_audio_s)
+                if self.trace:
+                    self.trace.stamp("first_audio")
+            t0 = time.perf_counter()
+            try:
+                with bench.span(f"{self.name}.pipeline.play"):
+                    self.play(audio)
+            except Exception as e:
+                logging.error(f"❌ Playback failed: {e}")
+            item_play_s += time.perf_counter() - t0
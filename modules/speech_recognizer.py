@@ -2,18 +2,27 @@
 
 import json
 import queue
-import sounddevice as sd
-from vosk import Model, KaldiRecognizer
 
 MODEL_PATH = "./models/vosk-model-small-en-us-0.15"  # Adjust if needed
 SAMPLE_RATE = 16000
 BLOCK_SIZE = 8000
 
-# Load model once
-model = Model(MODEL_PATH)
+model = None
+
+
+def get_model():
+    """Load the model once, on first use rather than at import."""
+    global model
+    if model is None:
+        from vosk import Model
+        model = Model(MODEL_PATH)
+    return model
 
 def listen_and_transcribe(duration: int = 5) -> str:
     """Record and transcribe speech for a given duration in seconds."""
+    import sounddevice as sd
+    from vosk import KaldiRecognizer
+
     q = queue.Queue()
 
     def callback(indata, frames, time, status):
@@ -22,7 +31,7 @@ def listen_and_transcribe(duration: int = 5) -> str:
         q.put(bytes(indata))
 
     print("🎧 Listening... Speak now!")
-    rec = KaldiRecognizer(model, SAMPLE_RATE)
+    rec = KaldiRecognizer(get_model(), SAMPLE_RATE)
     result_text = []
 
     with sd.RawInputStream(samplerate=SAMPLE_RATE, blocksize=BLOCK_SIZE, dtype='int16',
@@ -0,0 +1,57 @@
+# modules/streaming_stt.py
+import json
+import time
+import logging
+
+from bench import bench
+
+
+class StreamingTranscriber:
+    """
+    Feeds audio blocks into Vosk as they arrive so that, once the speaker is
+    done, only FinalResult() is left to compute.
+
+    on_partial(text) is called (throttled) with the current partial hypothesis,
+    e.g. to echo it on the LCD while the button is still held.
+    """
+
+    def __init__(self, model, sample_rate: int, on_partial=None, partial_interval: float = 0.1):
+        from vosk import KaldiRecognizer
+        try:
+            # Lets AcceptWaveform read a memoryview in place instead of via bytes()
+            from vosk import _ffi
+        except ImportError:
+            _ffi = None
+        self._ffi = _ffi
+        self.rec = KaldiRecognizer(model, sample_rate)
+        self.on_partial = on_partial
+        self.partial_interval = partial_interval
+        self._parts = []
+        self._last_partial = 0.0
+        self.blocks = 0
+
+    def accept(self, data) -> None:
+        """Push one block of 16-bit mono PCM (bytes or memoryview) into the recognizer."""
+        self.blocks += 1
+        if isinstance(data, memoryview):
+            data = self._ffi.from_buffer(data) if self._ffi else bytes(data)
+        if self.rec.AcceptWaveform(data):
+            res = json.loads(self.rec.Result())
+            if (txt := res.get("text", "")):
+                self._parts.append(txt)
+        elif self.on_partial:
+            # Throttle partial writes so I2C doesn’t trip us up
+            now = time.time()
+            if now - self._last_partial > self.partial_interval:
+                part = json.loads(self.rec.PartialResult()).get("partial", "")
+                if part:
+                    self.on_partial(part)
+                self._last_partial = now
+
+    def finish(self) -> str:
+        """Flush the recognizer and return the full transcript."""
+        with bench.span("stt.final_result", blocks=self.blocks):
+            final = json.loads(self.rec.FinalResult()).get("text", "")
+        text = (" ".join(self._parts) + " " + final).strip()
+        logging.debug(f"📝 Final transcript after {self.blocks} blocks: {text}")
+        return text
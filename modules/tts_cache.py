@@ -0,0 +1,184 @@
+# modules/tts_cache.py
+import hashlib
+import logging
+import os
+import struct
+import tempfile
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+from bench import bench
+from piper_tts import PcmChunk
+
+# <magic><sample_rate u32><sample_width u8><channels u8><pad u16> then raw int16 PCM
+_HEADER = struct.Struct("<4sIBBH")
+_MAGIC = b"TTS1"
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class TTSCache:
+    """
+    Content-addressed cache of synthesised speech.
+
+    Key = sha256(normalised text, voice id, config hash), so changing the
+    voice, its config or synthesis options never serves stale audio. Audio
+    is kept as raw PCM behind a 12-byte header (no WAV chunks), evicted LRU
+    once the directory passes max_bytes. The most recent entries also stay
+    in memory up to hot_bytes so repeated phrases skip the SD card too.
+    """
+
+    def __init__(self, directory, voice_id: str, config_hash: str,
+                 max_bytes: int = 64 * 2**20, hot_bytes: int = 4 * 2**20):
+        self.dir = Path(directory)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.voice_id = voice_id
+        self.config_hash = config_hash
+        self.max_bytes = max_bytes
+        self.hot_bytes = hot_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._hot = OrderedDict()   # key -> PcmChunk, most recent last
+        self._hot_size = 0
+        self._disk = OrderedDict()  # key -> file size, least recently used first
+        self._disk_size = 0
+        self._scan()
+
+    def _scan(self):
+        files = sorted(self.dir.glob("*.pcm"), key=lambda p: p.stat().st_mtime)
+        for p in files:
+            size = p.stat().st_size
+            self._disk[p.stem] = size
+            self._disk_size += size
+
+    def key(self, text: str) -> str:
+        h = hashlib.sha256()
+        for part in (normalize_text(text), self.voice_id, self.config_hash):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.dir / f"{key}.pcm"
+
+    # ---------- Lookup ----------
+    def get(self, text: str) -> PcmChunk | None:
+        key = self.key(text)
+        with self._lock:
+            chunk = self._hot.get(key)
+            if chunk is not None:
+                self._hot.move_to_end(key)
+                self._hit("hot")
+                return chunk
+            on_disk = key in self._disk
+            if on_disk:
+                self._disk.move_to_end(key)
+        if on_disk:
+            try:
+                chunk = self._read(key)
+            except (OSError, ValueError) as e:
+                logging.warning(f"⚠️ Dropping unreadable TTS cache entry {key[:12]}: {e}")
+                self._forget(key)
+            else:
+                with self._lock:
+                    self._remember_hot(key, chunk)
+                    self._hit("disk")
+                return chunk
+        with self._lock:
+            self.misses += 1
+            bench.value("tts.cache.miss", 1, misses=self.misses)
+        return None
+
+    def _hit(self, tier: str):
+        self.hits += 1
+        bench.value("tts.cache.hit", 1, tier=tier, hits=self.hits)
+
+    def _read(self, key: str) -> PcmChunk:
+        path = self._path(key)
+        data = path.read_bytes()
+        magic, rate, width, channels, _ = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError("bad magic")
+        os.utime(path)  # LRU order survives restarts
+        return PcmChunk(data[_HEADER.size:], rate, width, channels)
+
+    # ---------- Store ----------
+    def put(self, text: str, chunk: PcmChunk):
+        key = self.key(text)
+        path = self._path(key)
+        # Own temp file per writer: warm-up and a live turn can store the same phrase at once
+        fd, tmp = tempfile.mkstemp(dir=self.dir, prefix=f"{key[:16]}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, chunk.sample_rate, chunk.sample_width, chunk.channels, 0))
+                f.write(chunk.pcm)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        size = _HEADER.size + len(chunk.pcm)
+        with self._lock:
+            self._disk_size += size - self._disk.pop(key, 0)
+            self._disk[key] = size
+            self._remember_hot(key, chunk)
+            evict = []
+            while self._disk_size > self.max_bytes and len(self._disk) > 1:
+                old, old_size = self._disk.popitem(last=False)
+                self._disk_size -= old_size
+                evict.append(old)
+            disk_bytes = self._disk_size
+        for old in evict:
+            self._path(old).unlink(missing_ok=True)
+        if evict:
+            bench.value("tts.cache.evicted", len(evict), disk_bytes=disk_bytes)
+
+    def _remember_hot(self, key: str, chunk: PcmChunk):
+        if key in self._hot:
+            return
+        size = len(chunk.pcm)
+        if size > self.hot_bytes:
+            return
+        self._hot[key] = chunk
+        self._hot_size += size
+        while self._hot_size > self.hot_bytes:
+            _, old = self._hot.popitem(last=False)
+            self._hot_size -= len(old.pcm)
+
+    def _forget(self, key: str):
+        with self._lock:
+            self._disk_size -= self._disk.pop(key, 0)
+        self._path(key).unlink(missing_ok=True)
+
+    # ---------- High level ----------
+    def synthesize(self, text: str, synthesize_stream):
+        """
+        Yield PcmChunks for text: straight from the cache on a hit, otherwise
+        streamed from synthesize_stream(text) and stored once complete.
+        """
+        chunk = self.get(text)
+        if chunk is not None:
+            yield chunk
+            return
+        parts = []
+        fmt = None
+        for chunk in synthesize_stream(text):
+            parts.append(chunk.pcm)
+            fmt = chunk
+            yield chunk
+        if fmt is not None:
+            self.put(text, PcmChunk(b"".join(parts), fmt.sample_rate, fmt.sample_width, fmt.channels))
+
+    def warm(self, texts, synthesize_stream):
+        """Make sure every text is cached (e.g. canned phrases at startup)."""
+        with bench.span("tts.cache.warm", phrases=len(texts)):
+            for text in texts:
+                with self._lock:
+                    cached = self.key(text) in self._disk
+                if not cached:
+                    for _ in self.synthesize(text, synthesize_stream):
+                        pass
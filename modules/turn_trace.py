@@ -0,0 +1,80 @@
+# modules/turn_trace.py
+import logging
+import threading
+import time
+import uuid
+
+from bench import bench
+
+# Derived stage durations: (metric, from point, to point). press_to_done is the turn's total.
+STAGES = (
+    ("record", "press", "release"),
+    ("transcribe", "release", "transcript"),
+    ("llm_first_token", "llm_request", "first_token"),
+    ("llm_first_sentence", "llm_request", "first_sentence"),
+    ("release_to_first_audio", "release", "first_audio"),
+    ("press_to_done", "press", "done"),
+)
+# Only answered turns feed these: a canned reply reaches first audio far sooner than an answer
+HEADLINE = ("release_to_first_audio", "press_to_done")
+
+
+class TurnTrace:
+    """
+    Timeline of one interaction, from button press (or speech onset when
+    hands-free, or the start of the WAV in the harness) until the last audio
+    has played.
+
+    stamp(point) records the first time a named point is reached, from any
+    thread: press, release, transcript, llm_request, first_token,
+    first_sentence, first_audio, done. Repeated stages (each synthesis, each
+    playback) are recorded with value() as turn.<stage>_s. finish() derives
+    turn.<name>_s for every pair in STAGES that was reached, tagged with the
+    turn's outcome: "answer" (the default), or e.g. "hello", "no_input",
+    "not_ready" for turns that ended in a canned phrase. The HEADLINE stages
+    are only emitted for answers. Every metric carries trace=<id>, so one turn
+    can be pulled out of the metrics file.
+    """
+
+    def __init__(self, source: str = "button"):
+        self.id = uuid.uuid4().hex[:12]
+        self.source = source
+        self.points = {}
+        self.outcome = "answer"
+        self._finished = False
+        self._lock = threading.Lock()
+        bench.mark("turn.start", trace=self.id, source=source)
+
+    def stamp(self, point: str, t_ns: int | None = None):
+        self.points.setdefault(point, t_ns or time.perf_counter_ns())
+
+    def value(self, stage: str, seconds: float, **tags):
+        bench.value(f"turn.{stage}_s", seconds, trace=self.id, **tags)
+
+    def elapsed(self, start: str, end: str) -> float | None:
+        if start in self.points and end in self.points:
+            return (self.points[end] - self.points[start]) / 1e9
+        return None
+
+    def finish(self, outcome: str | None = None) -> dict[str, float]:
+        """Stamp done and emit the derived stage durations (once); returns them."""
+        with self._lock:
+            if self._finished:
+                return {}
+            self._finished = True
+        self.outcome = outcome or self.outcome
+        self.stamp("done")
+        derived = {}
+        for name, start, end in STAGES:
+            s = self.elapsed(start, end)
+            if s is not None and (self.outcome == "answer" or name not in HEADLINE):
+                derived[name] = s
+                self.value(name, s, source=self.source, outcome=self.outcome)
+        if self.outcome != "answer":
+            logging.info(f"⏱️ Turn {self.id}: {self.outcome}, not counted in the headline timings")
+            return derived
+        headline = [f"{label} {derived[name]:.2f}s" for name, label in
+                    (("release_to_first_audio", "release→first audio"), ("press_to_done", "press→done"))
+                    if name in derived]
+        logging.info(f"⏱️ Turn {self.id}: {', '.join(headline) or 'no timings'}")
+        return derived
@@ -0,0 +1,97 @@
+# modules/vad.py
+import numpy as np
+
+SPEECH_START = "speech_start"
+SPEECH_END = "speech_end"
+
+
+class VoiceActivityDetector:
+    """
+    Frame-based energy + zero-crossing VAD with hangover, for endpointing.
+
+    Each capture block is cut into frames and the features of all frames are
+    computed in one vectorised pass; only the (tiny) per-frame state machine
+    runs in Python. A frame counts as speech when its energy is margin_db over
+    the tracked noise floor, or — for unvoiced sounds like "s"/"f" that are
+    quiet but noisy — half that margin with a high zero-crossing rate.
+
+    onset_ms of consecutive speech opens an utterance, tail_ms without speech
+    closes it (the hangover), which is what triggers transcription.
+    """
+
+    def __init__(self, sample_rate: int = 16000, frame_ms: int = 20, tail_ms: int = 300,
+                 onset_ms: int = 60, margin_db: float = 12.0, min_energy_db: float = -55.0,
+                 zcr_unvoiced: float = 0.25, floor_adapt: float = 0.05):
+        self.sample_rate = sample_rate
+        self.frame = sample_rate * frame_ms // 1000
+        self.tail_frames = max(1, tail_ms // frame_ms)
+        self.onset_frames = max(1, onset_ms // frame_ms)
+        self.margin_db = margin_db
+        self.min_energy_db = min_energy_db
+        self.zcr_unvoiced = zcr_unvoiced
+        self.floor_adapt = floor_adapt
+        self.reset()
+
+    def reset(self):
+        self._rest = np.zeros(0, dtype=np.int16)
+        self.noise_db = None   # set from the first frame
+        self.in_speech = False
+        self._run = 0          # consecutive speech frames (before onset)
+        self._silence = 0      # consecutive non-speech frames (inside speech)
+        self.samples = 0       # samples consumed so far
+        self.speech_start_sample = None
+        self.speech_end_sample = None
+
+    def features(self, frames: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """(energy dBFS, zero-crossing rate) for an (n, frame) int16 array."""
+        x = frames.astype(np.float32) * (1.0 / 32768.0)
+        energy_db = 10.0 * np.log10(np.einsum("ij,ij->i", x, x) / self.frame + 1e-10)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame - 1)
+        return energy_db, zcr
+
+    def accept(self, data) -> str | None:
+        """Feed int16 mono PCM (bytes/memoryview); returns SPEECH_START, SPEECH_END or None."""
+        pcm = np.frombuffer(data, dtype=np.int16)
+        if self._rest.size:
+            pcm = np.concatenate((self._rest, pcm))
+        n = pcm.size // self.frame
+        self._rest = pcm[n * self.frame:].copy()
+        if not n:
+            return None
+        frames = pcm[:n * self.frame].reshape(n, self.frame)
+        energy_db, zcr = self.features(frames)
+
+        event = None
+        base = self.samples
+        if self.noise_db is None:
+            self.noise_db = float(energy_db[0])
+        for i in range(n):
+            threshold = max(self.noise_db, self.min_energy_db) + self.margin_db
+            e = energy_db[i]
+            speech = e > threshold or (e > threshold - self.margin_db / 2 and zcr[i] > self.zcr_unvoiced)
+            # Noise floor: drop at once to quieter frames, rise slowly on
+            # background, and only creep during speech so steady noise that
+            # started loud is eventually not "speech" any more.
+            if e < self.noise_db:
+                self.noise_db = e
+            else:
+                rate = self.floor_adapt if not speech else self.floor_adapt * 0.02
+                self.noise_db += rate * (e - self.noise_db)
+            if not self.in_speech:
+                self._run = self._run + 1 if speech else 0
+                if self._run >= self.onset_frames:
+                    self.in_speech = True
+                    self._silence = 0
+                    self.speech_start_sample = base + (i + 1 - self._run) * self.frame
+                    self.speech_end_sample = None
+                    event = SPEECH_START
+            else:
+                self._silence = 0 if speech else self._silence + 1
+                if self._silence >= self.tail_frames:
+                    self.in_speech = False
+                    self._run = 0
+                    self.speech_end_sample = base + (i + 1) * self.frame
+                    event = SPEECH_END
+        self.samples = base + n * self.frame
+        return event
@@ -0,0 +1,138 @@
+# modules/warmup.py
+import logging
+import threading
+import time
+
+from bench import bench
+
+# Component states
+PENDING = "pending"
+LOADING = "loading"
+WARMING = "warming"
+READY = "ready"
+FAILED = "failed"
+
+# Overall states
+STARTING = "starting"   # something still loading
+DEGRADED = "degraded"   # everything settled, at least one component failed
+ALL_READY = "ready"
+
+
+class Warmup:
+    """
+    Loads the heavy components concurrently at service start.
+
+    Each component has a load() returning the object and an optional warm(obj)
+    that runs one throwaway inference, so the first real request does not pay
+    for page faults, graph optimisation or a cold Ollama model. Components move
+    pending -> loading -> warming -> ready (or failed); on_change(name, state)
+    is called on every transition, e.g. to keep the LCD current.
+    """
+
+    def __init__(self, on_change=None):
+        self.on_change = on_change
+        self.components = {}
+        self.timings = {}
+        self.errors = {}
+        self._events = {}
+        self._lock = threading.Lock()
+        self._t0 = None
+        self._settled = False  # warmup.total_s emitted; retries don't repeat it
+
+    def add(self, name: str, load, warm=None):
+        self.components[name] = (load, warm, PENDING)
+        self._events[name] = threading.Event()
+        return self
+
+    def start(self):
+        self._t0 = time.perf_counter()
+        bench.mark("warmup.start", components=list(self.components))
+        for name in self.components:
+            self._spawn(name)
+        return self
+
+    def _spawn(self, name: str):
+        threading.Thread(target=self._run, args=(name,), name=f"warmup-{name}", daemon=True).start()
+
+    def _set(self, name: str, state: str):
+        with self._lock:
+            load, warm, _ = self.components[name]
+            self.components[name] = (load, warm, state)
+        if self.on_change:
+            try:
+                self.on_change(name, state)
+            except Exception as e:
+                logging.debug(f"warm-up on_change failed: {e}")
+
+    def _run(self, name: str):
+        load, warm, _ = self.components[name]
+        try:
+            self._set(name, LOADING)
+            t0 = time.perf_counter()
+            with bench.span(f"warmup.{name}.load"):
+                obj = load()
+            self.timings[f"{name}.load"] = time.perf_counter() - t0
+            if warm is not None:
+                self._set(name, WARMING)
+                t0 = time.perf_counter()
+                with bench.span(f"warmup.{name}.warm"):
+                    warm(obj)
+                self.timings[f"{name}.warm"] = time.perf_counter() - t0
+            self.errors.pop(name, None)
+            self._set(name, READY)
+            logging.info(f"✅ {name} ready in {time.perf_counter() - self._t0:.2f}s")
+        except Exception as e:
+            self.errors[name] = e
+            self._set(name, FAILED)
+            logging.error(f"❌ Warm-up of {name} failed: {e}")
+        finally:
+            self._events[name].set()
+            with self._lock:
+                first = not self._settled and all(ev.is_set() for ev in self._events.values())
+                self._settled = self._settled or first
+            if first:
+                bench.value("warmup.total_s", time.perf_counter() - self._t0, state=self.state)
+
+    # ---------- Readiness ----------
+    def component_state(self, name: str) -> str:
+        return self.components[name][2]
+
+    def is_ready(self, name: str | None = None) -> bool:
+        if name is not None:
+            return self.component_state(name) == READY
+        return self.state == ALL_READY
+
+    @property
+    def state(self) -> str:
+        states = [c[2] for c in self.components.values()]
+        if all(s == READY for s in states):
+            return ALL_READY
+        if all(s in (READY, FAILED) for s in states):
+            return DEGRADED
+        return STARTING
+
+    def wait(self, name: str, timeout: float | None = None) -> bool:
+        """Block until name has settled; True if it is ready."""
+        self._events[name].wait(timeout)
+        return self.is_ready(name)
+
+    def retry(self, name: str, timeout: float | None = None) -> bool:
+        """
+        Run a failed component again on a fresh warm-up thread, then wait() for
+        it. Callers racing to retry the same component start only one run.
+        """
+        with self._lock:
+            load, warm, state = self.components[name]
+            if state == FAILED:
+                self.components[name] = (load, warm, PENDING)
+                self._events[name].clear()
+                bench.mark("warmup.retry", component=name)
+            else:
+                state = None
+        if state is not None:
+            self._spawn(name)
+        return self.wait(name, timeout)
+
+    def summary(self) -> str:
+        done = sum(1 for c in self.components.values() if c[2] == READY)
+        return f"{done}/{len(self.components)} ready"
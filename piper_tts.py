@@ -1,17 +1,70 @@
 # piper_tts.py
+from __future__ import annotations
 from pathlib import Path
+from typing import Iterator, NamedTuple, TYPE_CHECKING
+import hashlib
+import re
+import threading
 import wave
-from piper.voice import PiperVoice
+
+if TYPE_CHECKING:
+    from piper.voice import PiperVoice   # onnxruntime + espeak: imported in get_voice()
 
 PROJECT = Path(__file__).resolve().parent
 MODEL_PATH = (PROJECT / "voices" / "en_US-lessac-medium.onnx").resolve()
 CONFIG_PATH = MODEL_PATH.with_suffix(".onnx.json")
 
-voice = PiperVoice.load(str(MODEL_PATH), config_path=str(CONFIG_PATH))
+_voice = None
+_voice_lock = threading.Lock()
+
+
+def get_voice() -> PiperVoice:
+    """Load the ONNX voice on first use (thread-safe) instead of at import time."""
+    global _voice
+    if _voice is None:
+        with _voice_lock:
+            if _voice is None:
+                from piper.voice import PiperVoice
+                _voice = PiperVoice.load(str(MODEL_PATH), config_path=str(CONFIG_PATH))
+    return _voice
+
+
+class PcmChunk(NamedTuple):
+    """A piece of int16 PCM plus the format needed to play it."""
+    pcm: bytes
+    sample_rate: int
+    sample_width: int = 2
+    channels: int = 1
+
+
+_CLAUSE_RE = re.compile(r"(?<=[,;:])\s+")
+
+
+def voice_fingerprint() -> tuple[str, str]:
+    """(voice id, config hash) — changes whenever the voice or its config does."""
+    return MODEL_PATH.name, hashlib.sha256(CONFIG_PATH.read_bytes()).hexdigest()[:16]
+
 
 def synthesize_to_file(text: str, output_path: Path) -> Path:
     output_path = Path(output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
     with wave.open(str(output_path), "wb") as wav:   # wave object, not plain file
-        voice.synthesize_wav(text, wav)              # Piper sets header + writes PCM
+        get_voice().synthesize_wav(text, wav)              # Piper sets header + writes PCM
     return output_path
+
+
+def synthesize_stream(text: str, split_clauses: bool = False) -> Iterator[PcmChunk]:
+    """
+    Yield audio as Piper produces it (one chunk per sentence Piper finds), so
+    playback can start after the first chunk instead of after the whole text.
+
+    split_clauses=True also cuts at , ; : — earlier first audio for long
+    sentences at the cost of a slightly flatter intonation across the cut.
+    """
+    voice = get_voice()
+    pieces = _CLAUSE_RE.split(text) if split_clauses else [text]
+    for piece in pieces:
+        for chunk in voice.synthesize(piece):
+            yield PcmChunk(chunk.audio_int16_bytes, chunk.sample_rate,
+                           chunk.sample_width, chunk.sample_channels)
+
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_overhead.py — Per-call cost of bench.py's hot-path API, in nanoseconds.
+- mark / value / value(+tags) / span / reused span, with the ring enabled and disabled.
+- "queue" rows replay the previous design (dataclass Point per call, SimpleQueue,
+  classes built inside span()) for comparison.
+- Also times one bulk flush of a full ring.
+
+Run from the project root:  python -m tests.bench_overhead --calls 200000
+"""
+
+from __future__ import annotations
+import os, time, queue, argparse, tempfile
+from dataclasses import dataclass
+
+from bench import Bench
+
+
+@dataclass
+class _Point:
+    t_ns: int
+    name: str
+    kind: str
+    value: float | None
+    extra: dict
+
+
+class QueueBench:
+    """The pre-ring implementation's hot path, kept here as the baseline."""
+    def __init__(self):
+        self.enabled = True
+        self.q = queue.SimpleQueue()
+        self._now = time.perf_counter_ns
+
+    def mark(self, name, **extra):
+        if not self.enabled: return
+        self.q.put(_Point(self._now(), name, "mark", None, extra))
+
+    def value(self, name, v, **extra):
+        if not self.enabled: return
+        self.q.put(_Point(self._now(), name, "value", float(v), extra))
+
+    def span(self, name, **extra):
+        start_ns = self._now()
+        def _exit(*a):
+            self.q.put(_Point(self._now(), name, "span", (self._now() - start_ns) / 1e9, extra))
+            return False
+        class _Ctx:
+            def __enter__(self): return None
+            def __exit__(self, *a): return _exit(*a)
+        return _Ctx()
+
+
+def per_call_ns(fn, calls: int) -> float:
+    t0 = time.perf_counter_ns()
+    fn(calls)
+    return (time.perf_counter_ns() - t0) / calls
+
+
+def cases(b):
+    def mark(n):
+        for _ in range(n): b.mark("x.mark")
+    def value(n):
+        for _ in range(n): b.value("x.value", 1.5)
+    def tagged(n):
+        for _ in range(n): b.value("x.value", 1.5, kind="call")
+    def span(n):
+        for _ in range(n):
+            with b.span("x.span"): pass
+    def reused(n):
+        s = b.span("x.span")
+        for _ in range(n):
+            with s: pass
+    def loop(n):
+        for _ in range(n): pass
+    return {"(empty loop)": loop, "mark": mark, "value": value, "value+tag": tagged, "span": span, "span reused": reused}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=200_000)
+    args = ap.parse_args()
+    path = os.path.join(tempfile.mkdtemp(), "metrics.jsonl")
+
+    variants = {
+        "ring": lambda: Bench(flush_path=path, max_queue=args.calls + 1, enabled=True),
+        "disabled": lambda: Bench(flush_path=path, enabled=False),
+        "queue": QueueBench,
+    }
+    names = list(cases(None))
+    print(f"{'ns/call':<14}" + "".join(f"{v:>10}" for v in variants))
+    for case in names:
+        row = []
+        for make in variants.values():
+            b = make()
+            if case == "span reused" and isinstance(b, QueueBench):
+                row.append(float("nan"))
+                continue
+            row.append(per_call_ns(cases(b)[case], args.calls))
+        print(f"{case:<14}" + "".join(f"{ns:10.0f}" for ns in row))
+
+    b = Bench(flush_path=path, max_queue=args.calls, enabled=True)
+    for i in range(args.calls):
+        b.value("x.value", i, kind="call" if i % 10 == 0 else None) if i % 10 == 0 else b.value("x.value", i)
+    t0 = time.perf_counter()
+    b.flush()
+    dt = time.perf_counter() - t0
+    print(f"flush of {args.calls} records: {dt * 1000:.0f} ms ({dt / args.calls * 1e9:.0f} ns/record), "
+          f"{os.path.getsize(path) / args.calls:.0f} bytes/record")
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
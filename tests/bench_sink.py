@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_sink.py — JSONL vs binary (bench_binlog) sink: bytes per event and write/read CPU.
+- Fills a Bench ring with --events records (mostly bare values, every --tag-every-th
+  with tags like the LLM metrics carry), then times the flush with each sink.
+- write CPU is process time per event for the drain + encode + write.
+- read times: JSONL json.loads per line, binlog iter_records() and read_columns().
+
+Run from the project root:  python -m tests.bench_sink --events 200000
+"""
+
+from __future__ import annotations
+import os, json, time, shutil, argparse, tempfile
+
+from bench import Bench
+from bench_binlog import iter_records, read_columns, segment_paths
+
+
+def fill(b: Bench, events: int, tag_every: int):
+    for i in range(events):
+        if i % tag_every == 0:
+            b.value("llm.stream.ttft_s", i * 1e-6, provider="ollama", model="llama3.2:3b", tokens=i)
+        elif i % 7 == 0:
+            b.mark("stt.partial")
+        else:
+            b.value("audio.capture.fill_ratio", (i % 100) / 100)
+
+
+def write(sink: str, path: str, events: int, tag_every: int) -> tuple[float, float]:
+    b = Bench(flush_path=path, max_queue=events, enabled=True, sink=sink)
+    fill(b, events, tag_every)
+    c0, w0 = time.process_time(), time.perf_counter()
+    b.flush()
+    b.sink.close()
+    return time.process_time() - c0, time.perf_counter() - w0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--events", type=int, default=200_000)
+    ap.add_argument("--tag-every", type=int, default=10, help="Every Nth event carries extra tags")
+    args = ap.parse_args()
+    d = tempfile.mkdtemp()
+    n = args.events
+
+    jsonl = os.path.join(d, "jsonl", "metrics.jsonl")
+    binary = os.path.join(d, "bin", "metrics.jsonl")
+    os.makedirs(os.path.dirname(jsonl))
+    os.makedirs(os.path.dirname(binary))
+
+    print(f"{n} events, 1 in {args.tag_every} tagged")
+    print(f"{'sink':<8} {'bytes/event':>12} {'write cpu ns/event':>19} {'wall ms':>8}")
+    for sink, path in (("jsonl", jsonl), ("binary", binary)):
+        cpu, wall = write(sink, path, n, args.tag_every)
+        size = sum(os.path.getsize(p) for p in ([path] if sink == "jsonl" else segment_paths(path)))
+        print(f"{sink:<8} {size / n:12.1f} {cpu / n * 1e9:19.0f} {wall * 1000:8.0f}")
+
+    t0 = time.perf_counter()
+    with open(jsonl, encoding="utf-8") as f:
+        count = sum(1 for line in f if json.loads(line))
+    print(f"\nread jsonl (json.loads)     {(time.perf_counter() - t0) / count * 1e9:6.0f} ns/event")
+    t0 = time.perf_counter()
+    count = sum(1 for _ in iter_records(binary))
+    print(f"read binary (iter_records)  {(time.perf_counter() - t0) / count * 1e9:6.0f} ns/event")
+    try:
+        t0 = time.perf_counter()
+        count = len(read_columns(binary)["t_ns"])
+        print(f"read binary (read_columns)  {(time.perf_counter() - t0) / count * 1e9:6.0f} ns/event")
+    except ImportError as e:
+        print(f"read binary (read_columns)  skipped ({e})")
+    shutil.rmtree(d)
+
+
+if __name__ == "__main__":
+    main()
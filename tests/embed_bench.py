@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+embed_bench.py — Per-item embed() loop vs batched embed_many() against the mock server.
+- loop:        [llm.embed(t) for t in texts]  (N round trips, N lists)
+- many cold:   embed_many() with an empty cache (batched + concurrent)
+- many warm:   embed_many() again, served from the memory-mapped cache
+- Reports texts/sec; emits JSONL metrics if bench.py is enabled.
+
+Run from the project root:  python -m tests.embed_bench --texts 500 --provider ollama
+"""
+
+from __future__ import annotations
+import os, time, argparse, tempfile
+
+import numpy as np
+
+from bench import bench
+from tests.mock_llm_server import start_mock_server
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--provider", choices=["ollama", "openai"], default="ollama")
+    ap.add_argument("--texts", type=int, default=300)
+    ap.add_argument("--repeat-ratio", type=float, default=0.3, help="Fraction of texts that are duplicates")
+    ap.add_argument("--batch-size", type=int, default=32)
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--embed-ms", type=float, default=5, help="Mock server latency per request")
+    args = ap.parse_args()
+
+    from modules.llm_handler import LLMHandler
+    from modules.embedding_cache import EmbeddingCache
+
+    bench.start()
+    server, url = start_mock_server(embed_ms=args.embed_ms)
+    os.environ.setdefault("OPENAI_API_KEY", "mock")
+    llm = LLMHandler(args.provider, "mock-embed", base_url=url if args.provider == "ollama" else url + "/v1")
+
+    n_unique = max(1, int(args.texts * (1 - args.repeat_ratio)))
+    texts = [f"utterance number {i % n_unique} about the weather" for i in range(args.texts)]
+
+    def timed(mode, fn):
+        t0 = time.perf_counter()
+        out = fn()
+        dt = time.perf_counter() - t0
+        bench.value("embed.bench.texts_per_s", len(texts) / dt, mode=mode, texts=len(texts))
+        print(f"{mode:<10} {len(texts) / dt:10.1f} texts/s   ({dt:6.3f} s)")
+        return out
+
+    loop = timed("loop", lambda: np.array([llm.embed(t) for t in texts], dtype=np.float32))
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = EmbeddingCache(tmp, f"{args.provider}:mock-embed")
+        kw = dict(batch_size=args.batch_size, concurrency=args.concurrency, cache=cache)
+        cold = timed("many cold", lambda: llm.embed_many(texts, **kw))
+        reopened = EmbeddingCache(tmp, f"{args.provider}:mock-embed")
+        warm = timed("many warm", lambda: llm.embed_many(texts, **{**kw, "cache": reopened}))
+    assert np.allclose(loop, cold) and np.allclose(cold, warm)
+    print(f"result {cold.shape} {cold.dtype}, C-contiguous={cold.flags['C_CONTIGUOUS']}, requests served {server.requests}")
+
+    server.shutdown()
+    bench.stop()
+
+
+if __name__ == "__main__":
+    main()
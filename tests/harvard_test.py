@@ -5,7 +5,9 @@ harvard_test.py — File-based harness for your Buttontalk assistant.
 - Streams harvard.wav into Vosk in chunks (realtime or fast).
 - Can use a deterministic Mock LLM or your real LLM.
 - Can mute TTS for “pure” timing.
-- Emits JSONL metrics if bench.py is enabled.
+- Emits JSONL metrics if bench.py is enabled, including the same turn.* trace
+  as the live assistant: the start of the WAV stands in for the press and its
+  end for the release, so release_to_first_audio / press_to_done compare directly.
 """
 
 from __future__ import annotations
@@ -18,8 +20,10 @@ from pathlib import Path
 # so importing it won't auto-run main().
 from buttontalk import (
     init_models, stream_and_speak, ensure_display, ensure_llm, ensure_vosk_model, display, llm, vosk_model,
-    SAMPLE_RATE, BLOCK_SIZE, conversation, TMP_AUDIO
+    SAMPLE_RATE, BLOCK_SIZE, conversation
 )
+from modules.llm_stream import StreamChunk
+from modules.turn_trace import TurnTrace
 
 try:
     from bench import bench
@@ -40,33 +44,35 @@ class MockStreamer:
     def __init__(self, text="Thanks. Your audio pipeline is working. This is only a test."):
         self.text = text
     def stream(self, conversation, temperature=0.0):
-        for token in self.text.split(" "):
-            yield {"content": token + " "}
+        for i, token in enumerate(self.text.split(" ")):
+            yield StreamChunk(token + " ", index=i, t_ns=time.perf_counter_ns())
 
-def stt_from_wav_streaming(wav_path: Path, pace: str = "realtime") -> str:
+def stt_from_wav_streaming(wav_path: Path, pace: str = "realtime", trace: TurnTrace | None = None) -> str:
     """
     Feed a WAV file into Vosk as if it were the mic.
     pace='realtime' sleeps to mimic mic timing; 'fast' pushes ASAP.
     """
-    from vosk import KaldiRecognizer
+    from modules.streaming_stt import StreamingTranscriber
     model = ensure_vosk_model()
     if model is None:
         raise RuntimeError("Vosk model not initialised. Did you call app.init_models()?")
 
-    rec = KaldiRecognizer(model, SAMPLE_RATE)
+    stt = StreamingTranscriber(
+        model, SAMPLE_RATE,
+        on_partial=lambda part: ensure_display().async_write(part[-32:]),
+    )
 
     bytes_per_sec = SAMPLE_RATE * 2  # 16-bit mono
     chunk_bytes = BLOCK_SIZE * 2
 
-    text_parts = []
-    last_display = 0
-
     with wave.open(str(wav_path), "rb") as wf:
         assert wf.getframerate() == SAMPLE_RATE, f"Expected {SAMPLE_RATE} Hz"
         assert wf.getnchannels() == 1, "Expected mono WAV"
 
         bench.mark("stt.wav.stream.start", frames=wf.getnframes())
         t0 = time.perf_counter_ns()
+        if trace:
+            trace.stamp("press", t0)
 
         with bench.span("stt.wav.stream.total"):
             while True:
@@ -74,24 +80,19 @@ def stt_from_wav_streaming(wav_path: Path, pace: str = "realtime") -> str:
                 if not data:
                     break
 
-                if rec.AcceptWaveform(data):
-                    res = json.loads(rec.Result())
-                    if (txt := res.get("text", "")):
-                        text_parts.append(txt)
-                else:
-                    # Throttle LCD writes so I2C doesn’t trip you up
-                    now = time.time()
-                    if now - last_display > 0.1:
-                        part = json.loads(rec.PartialResult()).get("partial","")
-                        if part:
-                            ensure_display().async_write(part[-32:])
-                        last_display = now
+                stt.accept(data)
 
                 if pace == "realtime":
                     time.sleep(chunk_bytes / bytes_per_sec)
 
-        final = json.loads(rec.FinalResult()).get("text", "")
-        text = (" ".join(text_parts) + " " + final).strip()
+        # Same measurement as the live path: end of audio -> transcript
+        t_end = time.perf_counter_ns()
+        text = stt.finish()
+        if trace:
+            trace.stamp("release", t_end)
+            trace.stamp("transcript")
+        bench.value("stt.release_to_transcript_s", (time.perf_counter_ns() - t_end) / 1e9,
+                    blocks=stt.blocks, text_len=len(text))
 
     bench.value("stt.wav.time_to_final_s", (time.perf_counter_ns()-t0)/1e9, text_len=len(text))
     ensure_display().write(text[-32:])
@@ -114,18 +115,24 @@ def run_harvard_test(wav: Path, use_mock_llm: bool, pace: str, mute_tts: bool):
     d.fade_in(color=(0, 100, 255))
     d.write("WAV test")
 
+    trace = TurnTrace("harvard")
     with bench.span("test.stt_total"):
-        spoken_text = stt_from_wav_streaming(wav, pace=pace)
+        spoken_text = stt_from_wav_streaming(wav, pace=pace, trace=trace)
     if not spoken_text:
         print("No text produced from WAV. Check sample rate/channels.")
+        trace.finish("no_input")
         return
 
-    conversation.append({"role":"user","content":spoken_text})
+    conversation.add("user", spoken_text)
     with bench.span("test.llm_total"):
-        response = stream_and_speak(conversation, test_llm, TMP_AUDIO, temperature=0.3)
-    conversation.append({"role":"assistant","content":response})
-
-    bench.mark("test.done", resp_len=len(response))
+        response = stream_and_speak(conversation.window(), test_llm, temperature=0.3, trace=trace)
+    conversation.add("assistant", response)
+
+    timings = trace.finish()
+    bench.mark("test.done", resp_len=len(response), trace=trace.id)
+    for name in ("release_to_first_audio", "press_to_done"):
+        if name in timings:
+            print(f"⏱️ {name}: {timings[name]:.3f}s")
     print("✅ Harvard test complete.")
 
 def parse_args():
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+import_time.py — Measured import cost of the assistant's entry modules.
+- Runs `python -X importtime -c "import <module>"` in a fresh interpreter.
+- Reports the module's cumulative import time and the heaviest imports under it.
+
+Run from the project root:  python -m tests.import_time buttontalk modules.llm_handler piper_tts
+"""
+
+from __future__ import annotations
+import os, re, sys, subprocess, argparse
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+MODULES = ["modules.llm_handler", "piper_tts", "buttontalk"]
+
+# import time:       123 |        456 |   package.module
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+class ImportFailed(RuntimeError):
+    pass
+
+
+def measure(module: str, env: dict | None = None) -> tuple[float, list[tuple[str, float, float]]]:
+    """
+    Import module in a clean interpreter; returns (cumulative_ms, rows) where
+    rows are (name, self_ms, cumulative_ms) for every import it triggered.
+    """
+    run_env = dict(os.environ, BENCH="0", **(env or {}))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, env=run_env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        last = proc.stderr.strip().splitlines()[-1:] or ["?"]
+        raise ImportFailed(f"import {module} failed: {last[0]}")
+
+    rows = []
+    total = None
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if not m:
+            continue
+        self_us, cum_us, indent, name = int(m[1]), int(m[2]), m[3], m[4]
+        rows.append((name, self_us / 1000, cum_us / 1000))
+        if name == module and len(indent) <= 1:
+            total = cum_us / 1000
+    if total is None:
+        raise ImportFailed(f"no importtime record for {module}")
+    return total, rows
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("modules", nargs="*", default=MODULES)
+    ap.add_argument("--top", type=int, default=10, help="Heaviest imports to list per module")
+    args = ap.parse_args()
+
+    for module in args.modules:
+        try:
+            total, rows = measure(module)
+        except ImportFailed as e:
+            print(f"{module:<24} ✗ {e}")
+            continue
+        print(f"{module:<24} {total:8.1f} ms")
+        heavy = sorted((r for r in rows if r[0] != module), key=lambda r: r[1], reverse=True)
+        for name, self_ms, cum_ms in heavy[:args.top]:
+            print(f"    {name:<36} self {self_ms:7.1f} ms   cumulative {cum_ms:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
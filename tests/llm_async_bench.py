@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+llm_async_bench.py — Sync vs async LLMHandler against the local mock server.
+- sync:        LLMHandler.stream() through the provider SDK, one request after another
+- async:       LLMHandler.astream() on the handler's pooled keep-alive client
+- async xN:    N astream() calls interleaved on one event loop
+- Reports time to first token and wall time; emits JSONL metrics if bench.py is enabled.
+
+Run from the project root:  python -m tests.llm_async_bench --provider ollama --requests 20
+"""
+
+from __future__ import annotations
+import os, time, asyncio, argparse, statistics
+
+from bench import bench
+from tests.mock_llm_server import start_mock_server
+
+
+def make_handler(provider: str, url: str):
+    from modules.llm_handler import LLMHandler
+    os.environ.setdefault("OPENAI_API_KEY", "mock")
+    base = url if provider == "ollama" else url + "/v1"
+    return LLMHandler(provider=provider, model="mock", base_url=base)
+
+
+def run_sync(llm, n: int) -> tuple[list[float], float]:
+    ttfts = []
+    t_all = time.perf_counter()
+    for _ in range(n):
+        t0 = time.perf_counter()
+        first = None
+        for chunk in llm.stream("Say something.", temperature=0.0):
+            if first is None and chunk.get("content"):
+                first = time.perf_counter() - t0
+        ttfts.append(first)
+    return ttfts, time.perf_counter() - t_all
+
+
+async def _one(llm) -> float:
+    t0 = time.perf_counter()
+    first = None
+    async for chunk in llm.astream("Say something.", temperature=0.0):
+        if first is None and chunk.get("content"):
+            first = time.perf_counter() - t0
+    return first
+
+
+async def run_async(llm, n: int, concurrency: int) -> tuple[list[float], float]:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def guarded():
+        async with sem:
+            return await _one(llm)
+
+    t_all = time.perf_counter()
+    ttfts = await asyncio.gather(*(guarded() for _ in range(n)))
+    wall = time.perf_counter() - t_all
+    await llm.aclose()
+    return list(ttfts), wall
+
+
+def report(mode: str, ttfts: list[float], wall: float, n: int):
+    p50 = statistics.median(ttfts) * 1000
+    worst = max(ttfts) * 1000
+    bench.value("llm.bench.ttft_p50_ms", p50, mode=mode, requests=n)
+    bench.value("llm.bench.wall_s", wall, mode=mode, requests=n)
+    print(f"{mode:<14} ttft p50 {p50:7.1f} ms  max {worst:7.1f} ms  wall {wall:6.2f} s  ({n / wall:5.1f} req/s)")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--provider", choices=["ollama", "openai"], default="ollama")
+    ap.add_argument("--requests", type=int, default=20)
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--ttft-ms", type=float, default=50)
+    ap.add_argument("--token-ms", type=float, default=5)
+    args = ap.parse_args()
+
+    bench.start()
+    server, url = start_mock_server(ttft_ms=args.ttft_ms, token_ms=args.token_ms)
+    print(f"mock server {url}, ttft {args.ttft_ms} ms, {args.token_ms} ms/token, {args.requests} requests")
+
+    try:
+        ttfts, wall = run_sync(make_handler(args.provider, url), args.requests)
+        report("sync", ttfts, wall, args.requests)
+    except ImportError as e:
+        print(f"sync           skipped ({e})")
+
+    ttfts, wall = asyncio.run(run_async(make_handler(args.provider, url), args.requests, 1))
+    report("async", ttfts, wall, args.requests)
+    ttfts, wall = asyncio.run(run_async(make_handler(args.provider, url), args.requests, args.concurrency))
+    report(f"async x{args.concurrency}", ttfts, wall, args.requests)
+
+    server.shutdown()
+    bench.stop()
+
+
+if __name__ == "__main__":
+    main()
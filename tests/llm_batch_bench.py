@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+llm_batch_bench.py — Throughput of LLMHandler's batch APIs against the local mock server.
+- serial:     call() in a loop, the way offline jobs ran before
+- call_many:  the same prompts with --concurrency requests in flight
+- call_json_many / call_schema_many at the highest concurrency
+- Optional --rpm to watch the per-provider rate limiter cap throughput.
+- Emits JSONL metrics if bench.py is enabled.
+
+Run from the project root:  python -m tests.llm_batch_bench --provider ollama --requests 40
+"""
+
+from __future__ import annotations
+import os, time, argparse
+
+from bench import bench
+from tests.mock_llm_server import start_mock_server
+
+
+def make_handler(provider: str, url: str, rpm: float | None):
+    from modules.llm_handler import LLMHandler
+    os.environ.setdefault("OPENAI_API_KEY", "mock")
+    base = url if provider == "ollama" else url + "/v1"
+    return LLMHandler(provider=provider, model="mock", base_url=base, requests_per_minute=rpm)
+
+
+def report(mode: str, results: list, wall: float):
+    errors = sum(isinstance(r, Exception) for r in results)
+    bench.value("llm.bench.batch_req_per_s", len(results) / wall, mode=mode, requests=len(results), errors=errors)
+    print(f"{mode:<22} {len(results) / wall:7.1f} req/s  wall {wall:6.2f} s  errors {errors}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--provider", choices=["ollama", "openai"], default="ollama")
+    ap.add_argument("--requests", type=int, default=40)
+    ap.add_argument("--concurrency", type=str, default="1,4,8", help="Comma-separated levels")
+    ap.add_argument("--ttft-ms", type=float, default=50)
+    ap.add_argument("--token-ms", type=float, default=5)
+    ap.add_argument("--rpm", type=float, default=None, help="Requests per minute limit (default: provider's)")
+    args = ap.parse_args()
+    levels = [int(c) for c in args.concurrency.split(",")]
+
+    bench.start()
+    server, url = start_mock_server(ttft_ms=args.ttft_ms, token_ms=args.token_ms)
+    print(f"mock server {url}, ttft {args.ttft_ms} ms, {args.token_ms} ms/token, {args.requests} requests")
+    llm = make_handler(args.provider, url, args.rpm)
+    prompts = [f"Summarise transcript {i}." for i in range(args.requests)]
+
+    t0 = time.perf_counter()
+    results = []
+    for p in prompts:
+        try:
+            results.append(llm.call(p, temperature=0.0))
+        except Exception as e:
+            results.append(e)
+    report("serial", results, time.perf_counter() - t0)
+
+    for c in levels:
+        t0 = time.perf_counter()
+        results = llm.call_many(prompts, temperature=0.0, concurrency=c)
+        report(f"call_many x{c}", results, time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    results = llm.call_json_many(prompts, temperature=0.0, concurrency=levels[-1])
+    report(f"call_json_many x{levels[-1]}", results, time.perf_counter() - t0)
+
+    try:
+        from pydantic import BaseModel
+
+        class Answer(BaseModel):
+            answer: str
+
+        t0 = time.perf_counter()
+        results = llm.call_schema_many([[{"role": "user", "content": p}] for p in prompts], Answer,
+                                       temperature=0.0, concurrency=levels[-1])
+        report(f"call_schema_many x{levels[-1]}", results, time.perf_counter() - t0)
+    except ImportError as e:
+        print(f"call_schema_many       skipped ({e})")
+
+    server.shutdown()
+    bench.stop()
+
+
+if __name__ == "__main__":
+    main()
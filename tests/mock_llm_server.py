@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+mock_llm_server.py — Local stand-in for OpenAI-compatible and Ollama endpoints.
+- OpenAI/Groq:  POST /v1/chat/completions (SSE when stream=true), POST /v1/embeddings
+- Ollama:       POST /api/chat (NDJSON when stream=true), POST /api/embeddings, POST /api/embed
+- Configurable time to first token and inter-token delay, HTTP/1.1 keep-alive.
+- Optional model load delay (cold_ms) on the first Ollama chat, reported like Ollama's load_duration.
+- Optional gate (a threading.Event): chats hold their first token until it is set, so tests can
+  order events without depending on how fast the box is.
+- Deterministic, so LLM latency work can be benchmarked offline.
+
+Standalone:  python -m tests.mock_llm_server --port 8808 --ttft-ms 200 --token-ms 20
+In code:     server, url = start_mock_server(ttft_ms=50); ...; server.shutdown()
+"""
+
+from __future__ import annotations
+import json, time, socket, hashlib, argparse, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_REPLY = "Thanks. Your audio pipeline is working. This is only a test."
+
+
+def fake_embedding(text: str, dim: int = 32) -> list[float]:
+    """Stable pseudo-embedding: same text, same vector."""
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    return [((digest[i % len(digest)] + i) % 251) / 125.0 - 1.0 for i in range(dim)]
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, like the real servers
+
+    # Set on the server instance by start_mock_server()
+    @property
+    def cfg(self) -> dict:
+        return self.server.cfg
+
+    def setup(self):
+        super().setup()
+        # Small writes (headers, one token per chunk) must not wait on Nagle
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, *args):
+        pass
+
+    def _body(self) -> dict:
+        n = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(n) or b"{}")
+
+    def _send_json(self, obj: dict, status: int = 200):
+        data = json.dumps(obj).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _start_chunked(self, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def _chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _tokens(self, body: dict) -> list[str]:
+        reply = self.cfg["reply"]
+        if body.get("format") or body.get("response_format"):
+            reply = self.cfg["json_reply"]
+        words = reply.split(" ")
+        return [w + (" " if i < len(words) - 1 else "") for i, w in enumerate(words)]
+
+    def do_POST(self):
+        self.server.requests += 1
+        body = self._body()
+        path = self.path.rstrip("/")
+        if path.endswith("/chat/completions"):
+            self._openai_chat(body)
+        elif path.endswith("/embeddings") and path.startswith("/v1"):
+            inputs = body.get("input")
+            inputs = inputs if isinstance(inputs, list) else [inputs]
+            time.sleep(self.cfg["embed_ms"] / 1000)
+            self._send_json({"data": [{"index": i, "embedding": fake_embedding(t)} for i, t in enumerate(inputs)]})
+        elif path == "/api/chat":
+            self._ollama_chat(body)
+        elif path == "/api/embeddings":
+            time.sleep(self.cfg["embed_ms"] / 1000)
+            self._send_json({"embedding": fake_embedding(body.get("prompt", ""))})
+        elif path == "/api/embed":
+            inputs = body.get("input")
+            inputs = inputs if isinstance(inputs, list) else [inputs]
+            time.sleep(self.cfg["embed_ms"] / 1000)
+            self._send_json({"embeddings": [fake_embedding(t) for t in inputs]})
+        else:
+            self._send_json({"error": f"unknown path {self.path}"}, status=404)
+
+    def _openai_chat(self, body: dict):
+        tokens = self._tokens(body)
+        self._first_token_delay()
+        if not body.get("stream"):
+            time.sleep(self.cfg["token_ms"] * len(tokens) / 1000)
+            self._send_json({"choices": [{"index": 0, "finish_reason": "stop",
+                                          "message": {"role": "assistant", "content": "".join(tokens)}}]})
+            return
+        self._start_chunked("text/event-stream")
+        try:
+            for i, tok in enumerate(tokens):
+                if i:
+                    time.sleep(self.cfg["token_ms"] / 1000)
+                evt = {"choices": [{"index": 0, "delta": {"content": tok}, "finish_reason": None}]}
+                self._chunk(f"data: {json.dumps(evt)}\n\n".encode())
+            end = {"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+            self._chunk(f"data: {json.dumps(end)}\n\ndata: [DONE]\n\n".encode())
+            self._chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            self.server.cancelled += 1
+            self.close_connection = True
+
+    def _first_token_delay(self):
+        time.sleep(self.cfg["ttft_ms"] / 1000)
+        if self.cfg["gate"] is not None:
+            self.cfg["gate"].wait()
+
+    def _ollama_load(self) -> int:
+        """Nanoseconds spent 'loading the model': cold_ms the first time, then ~nothing."""
+        with self.server.lock:
+            cold = not self.server.loaded
+            self.server.loaded = True
+        if cold and self.cfg["cold_ms"]:
+            time.sleep(self.cfg["cold_ms"] / 1000)
+            return int(self.cfg["cold_ms"] * 1e6)
+        return 1_000_000
+
+    def _ollama_chat(self, body: dict):
+        tokens = self._tokens(body)
+        load_ns = self._ollama_load()
+        usage = {"load_duration": load_ns, "eval_count": len(tokens),
+                 "prompt_eval_count": sum(len(m.get("content", "")) for m in body.get("messages", [])) // 4}
+        self._first_token_delay()
+        if body.get("stream") is False:
+            time.sleep(self.cfg["token_ms"] * len(tokens) / 1000)
+            self._send_json({"model": body.get("model"), "done": True, **usage,
+                             "message": {"role": "assistant", "content": "".join(tokens)}})
+            return
+        self._start_chunked("application/x-ndjson")
+        try:
+            for i, tok in enumerate(tokens):
+                if i:
+                    time.sleep(self.cfg["token_ms"] / 1000)
+                msg = {"model": body.get("model"), "done": False, "message": {"role": "assistant", "content": tok}}
+                self._chunk((json.dumps(msg) + "\n").encode())
+            done = {"model": body.get("model"), "done": True, "done_reason": "stop", **usage,
+                    "message": {"role": "assistant", "content": ""}}
+            self._chunk((json.dumps(done) + "\n").encode())
+            self._chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            self.server.cancelled += 1
+            self.close_connection = True
+
+
+def start_mock_server(host: str = "127.0.0.1", port: int = 0, ttft_ms: float = 50, token_ms: float = 10,
+                      embed_ms: float = 5, reply: str = DEFAULT_REPLY, json_reply: str = '{"answer": "ok"}',
+                      cold_ms: float = 0, gate: threading.Event | None = None):
+    """Start the server in a daemon thread; returns (server, "http://host:port")."""
+    server = ThreadingHTTPServer((host, port), MockLLMHandler)
+    server.daemon_threads = True
+    server.cfg = dict(ttft_ms=ttft_ms, token_ms=token_ms, embed_ms=embed_ms, reply=reply, json_reply=json_reply,
+                      cold_ms=cold_ms, gate=gate)
+    server.requests = 0
+    server.cancelled = 0
+    server.loaded = False
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=8808)
+    ap.add_argument("--ttft-ms", type=float, default=200)
+    ap.add_argument("--token-ms", type=float, default=20)
+    ap.add_argument("--cold-ms", type=float, default=0)
+    args = ap.parse_args()
+    server, url = start_mock_server(port=args.port, ttft_ms=args.ttft_ms, token_ms=args.token_ms,
+                                    cold_ms=args.cold_ms)
+    print(f"Mock LLM server on {url}  (OpenAI base: {url}/v1, Ollama host: {url})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
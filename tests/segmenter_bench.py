@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+segmenter_bench.py — SentenceSegmenter vs the old regex split in stream_and_speak.
+- Replays token streams: recorded ones (--tokens FILE.jsonl, one JSON list of tokens per line)
+  or built-in replies cut into LLM-sized tokens.
+- Reports CPU microseconds per token and how many tokens/characters in the first
+  speakable chunk is ready (the part of time-to-first-audio the segmenter controls).
+- --record PROVIDER:MODEL streams the built-in prompts from a real LLM into --tokens first.
+- Emits JSONL metrics if bench.py is enabled.
+
+Run from the project root:  python -m tests.segmenter_bench --clause-words 6
+"""
+
+from __future__ import annotations
+import re, json, time, argparse, statistics
+from pathlib import Path
+
+from bench import bench
+from modules.segmenter import SentenceSegmenter
+
+REPLIES = [
+    "Well, the weather in Stockholm today is mild, around 12 degrees, with light winds from the west "
+    "and a chance of rain after 3 p.m. so you might want to bring an umbrella. Tomorrow looks brighter.",
+    "Sure! Here is one: why did the scarecrow win an award? Because he was outstanding in his field.",
+    "Dr. Smith's clinic opens at 8.30 on weekdays. It is on Main St. near the station, and parking "
+    "costs about $2.50 an hour. Call ahead if you can; they are often busy in the mornings.",
+    "1. Preheat the oven to 180 degrees. 2. Mix the flour, sugar and butter until the dough is smooth, "
+    "then add two eggs. 3. Bake for 25 minutes... and enjoy!",
+]
+PROMPTS = ["What's the weather like?", "Tell me a joke.", "When does the clinic open?", "How do I bake a cake?"]
+
+
+def tokenize(text: str) -> list[str]:
+    """Rough BPE stand-in: words with their leading space, long words cut into 4-char pieces."""
+    tokens = []
+    for word in re.findall(r"\s*\S+", text):
+        tokens.extend(word[i:i + 4] for i in range(0, len(word), 4))
+    return tokens
+
+
+def regex_split(tokens):
+    """The pre-segmenter loop from stream_and_speak, yielding (token index, sentence)."""
+    pattern = re.compile(r"(.*?[\.!?])\s")
+    buffer = ""
+    for i, token in enumerate(tokens):
+        buffer += token
+        while match := pattern.match(buffer):
+            buffer = buffer[len(match.group(0)):]
+            yield i, match.group(1).strip()
+    if buffer.strip():
+        yield len(tokens) - 1, buffer.strip()
+
+
+def segmenter_split(tokens, **kwargs):
+    seg = SentenceSegmenter(**kwargs)
+    for i, token in enumerate(tokens):
+        for chunk in seg.feed(token):
+            yield i, chunk
+    for rest in seg.flush():
+        yield len(tokens) - 1, rest
+
+
+def measure(name: str, split, streams: list[list[str]], repeat: int):
+    n_tokens = sum(len(s) for s in streams) * repeat
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for tokens in streams:
+            for _ in split(tokens):
+                pass
+    us_per_token = (time.perf_counter() - t0) / n_tokens * 1e6
+
+    first_tokens, first_chars, counts = [], [], []
+    for tokens in streams:
+        chunks = list(split(tokens))
+        first_tokens.append(chunks[0][0] + 1)
+        first_chars.append(len(chunks[0][1]))
+        counts.append(len(chunks))
+    bench.value("segmenter.bench.us_per_token", us_per_token, splitter=name)
+    bench.value("segmenter.bench.first_chunk_tokens", statistics.mean(first_tokens), splitter=name)
+    print(f"{name:<18} {us_per_token:6.2f} us/token   first chunk after {statistics.mean(first_tokens):5.1f} tokens "
+          f"({statistics.mean(first_chars):5.1f} chars)   {sum(counts) / len(counts):4.1f} chunks/reply")
+
+
+def record(spec: str, path: Path):
+    from modules.llm_handler import LLMHandler
+    provider, _, model = spec.partition(":")
+    llm = LLMHandler(provider=provider, model=model)
+    with open(path, "w", encoding="utf-8") as f:
+        for prompt in PROMPTS:
+            tokens = [c.content for c in llm.stream(prompt, temperature=0.0) if c.content]
+            f.write(json.dumps(tokens, ensure_ascii=False) + "\n")
+    print(f"recorded {len(PROMPTS)} streams from {spec} into {path}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tokens", type=str, default=None, help="JSONL of recorded token lists")
+    ap.add_argument("--record", type=str, default=None, help="provider:model to record --tokens from")
+    ap.add_argument("--clause-words", type=int, default=6)
+    ap.add_argument("--max-chars", type=int, default=200)
+    ap.add_argument("--repeat", type=int, default=500)
+    args = ap.parse_args()
+
+    bench.start()
+    if args.record:
+        record(args.record, Path(args.tokens or "recorded_tokens.jsonl"))
+    if args.tokens:
+        with open(args.tokens, encoding="utf-8") as f:
+            streams = [json.loads(line) for line in f if line.strip()]
+    else:
+        streams = [tokenize(text) for text in REPLIES]
+    print(f"{len(streams)} streams, {sum(len(s) for s in streams)} tokens, x{args.repeat}")
+
+    measure("regex", regex_split, streams, args.repeat)
+    measure("segmenter", lambda t: segmenter_split(t, min_clause_words=0, max_chars=args.max_chars),
+            streams, args.repeat)
+    measure(f"segmenter clause={args.clause_words}",
+            lambda t: segmenter_split(t, min_clause_words=args.clause_words, max_chars=args.max_chars),
+            streams, args.repeat)
+    bench.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""bench_binlog: binary sink round trip, segment rotation, torn tails and column reads."""
+
+import math
+
+from bench import Bench
+from bench_binlog import BinarySink, iter_records, read_columns, segment_paths
+from bench_report import read_series, iter_records as report_records
+
+
+def _fill(b: Bench):
+    b.mark("turn.start", trace="abc")
+    for i in range(200):
+        b.value("llm.ttft_s", (i + 1) / 100, provider="ollama", n=i, ok=i % 2 == 0, hist=[1, 2], none=None)
+        b.value("tts.synth_s", 0.5)
+        if i % 40 == 0:
+            b.flush()
+    b.flush()
+
+
+def test_round_trip_matches_jsonl(tmp_path):
+    jsonl = Bench(flush_path=str(tmp_path / "a.jsonl"), enabled=True)
+    binary = Bench(flush_path=str(tmp_path / "b.jsonl"), enabled=True, sink="binary")
+    _fill(jsonl)
+    _fill(binary)
+    a = list(report_records(str(tmp_path / "a.jsonl")))
+    b = list(report_records(str(tmp_path / "b.jsonl")))
+    assert len(a) == len(b) == 401
+    for ra, rb in zip(a, b):
+        assert (ra["name"], ra["kind"], ra["value"], ra["extra"]) == (rb["name"], rb["kind"], rb["value"], rb["extra"])
+    assert b[0]["value"] is None and b[1]["extra"] == {"provider": "ollama", "n": 0, "ok": True, "hist": [1, 2],
+                                                      "none": None}
+    assert read_series(str(tmp_path / "b.jsonl"))["llm.ttft_s"].hist.n == 200
+
+
+def test_rotation_torn_tail_and_columns(tmp_path):
+    path = str(tmp_path / "metrics.jsonl")
+    b = Bench(flush_path=path, enabled=True, sink=BinarySink(path, segment_bytes=2048))
+    _fill(b)
+    b.stop()
+    segments = segment_paths(path)
+    assert len(segments) > 1
+    with open(segments[-1], "ab") as f:
+        f.write(b"\x40\x00\x01partial")           # a frame cut off mid-write
+
+    records = list(iter_records(path))
+    assert len(records) == 403                      # 401 raw + 2 summaries
+    assert records[-1]["kind"] == "summary"
+    assert [r["name"] for r in iter_records(segments[-1])]   # each segment stands alone
+
+    cols = read_columns(path)
+    assert len(cols["t_ns"]) == 403
+    assert sorted(cols["names"]) == ["llm.ttft_s", "tts.synth_s", "turn.start"]
+    names = [cols["names"][i] for i in cols["name_id"]]
+    assert names == [r["name"] for r in records]
+    assert math.isnan(cols["value"][0]) and cols["value"][1] == 0.01
+    assert list(cols["t_ns"]) == [r["t_ns"] for r in records]
+
+
+def test_two_processes_share_a_flush_path(tmp_path):
+    path = str(tmp_path / "metrics.jsonl")
+    a = BinarySink(path, max_segments=1)
+    b = BinarySink(path, max_segments=1)      # constructed before a wrote anything: same starting index
+    names = ["a.x", "b.y"]
+    for i in range(7):
+        a.write([(i, 0, 2, float(i), None)], names)
+        b.write([(i, 1, 2, float(i), None)], names)
+    assert a.path != b.path
+    a.segment_bytes = 0                       # rotate: a prunes only its own old segment
+    a.write([(7, 0, 2, 7.0, None)], names)
+    a.close()
+    b.close()
+    assert b.path in segment_paths(path)
+    records = list(iter_records(path))
+    assert sum(r["name"] == "b.y" for r in records) == 7
+    assert sum(r["name"] == "a.x" for r in records) == 1
@@ -0,0 +1,63 @@
+"""bench.Histogram accuracy and merging, and Bench summaries/snapshots."""
+
+import json
+import random
+
+from bench import Bench, Histogram
+
+
+def test_percentiles_within_bucket_resolution():
+    rng = random.Random(1)
+    values = sorted(rng.lognormvariate(-3, 1) for _ in range(20000))
+    hist = Histogram()
+    for v in values:
+        hist.record(v)
+    for q in (50, 90, 99):
+        exact = values[int(q / 100 * len(values)) - 1]
+        assert abs(hist.percentile(q) - exact) / exact < 0.04
+    assert hist.max == values[-1] and hist.percentile(100) == values[-1]
+    assert len(hist.counts) < 400
+
+
+def test_merge_matches_single_histogram():
+    a, b, both = Histogram(), Histogram(), Histogram()
+    for i in range(1, 1001):
+        (a if i % 2 else b).record(i / 1000)
+        both.record(i / 1000)
+    merged = a.copy().merge(b)
+    assert merged.counts == both.counts and merged.n == 1000
+    assert merged.percentile(90) == both.percentile(90)
+    assert a.n == 500   # copy() left a alone
+
+
+def test_summary_records_and_snapshot(tmp_path):
+    path = tmp_path / "metrics.jsonl"
+    b = Bench(flush_path=str(path), enabled=True, raw=False)
+    for i in range(100):
+        b.value("x.latency_s", (i + 1) / 100)
+    b.mark("x.event")
+    b.summarize()
+    b.value("x.latency_s", 5.0)
+    snap = b.snapshot()
+    assert set(snap) == {"x.latency_s"} and snap["x.latency_s"].n == 101
+    assert snap["x.latency_s"].max == 5.0
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r["kind"] for r in records] == ["summary"]
+    extra = records[0]["extra"]
+    assert extra["n"] == 100 and extra["max"] == 1.0
+    assert 0.48 <= extra["p50"] <= 0.52 and 0.97 <= extra["p99"] <= 1.0
+
+
+def test_non_finite_values_do_not_stall_the_flusher(tmp_path):
+    path = tmp_path / "metrics.jsonl"
+    b = Bench(flush_path=str(path), enabled=True)
+    b.value("x.v", float("inf"))
+    b.value("x.v", float("-inf"))
+    b.flush()
+    b.value("x.v", 1.0)
+    b.flush()
+    assert len(path.read_text().splitlines()) == 3
+    hist = b.snapshot()["x.v"]
+    assert hist.n == 3 and hist.max == float("inf")
+    assert 1.0 <= hist.percentile(50) <= 1.04
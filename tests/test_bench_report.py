@@ -0,0 +1,102 @@
+"""python -m bench report: tables, --run-mark and the regression gate."""
+
+import json
+import random
+
+import pytest
+
+import bench_report
+from bench import Bench
+
+
+def _write(path, spans, mark_first=None, kind="span"):
+    rng = random.Random(len(spans))
+    with open(path, "w") as f:
+        if mark_first:
+            f.write(json.dumps({"t_ns": 0, "name": "test.llm_total", "kind": "span", "value": 99.0, "extra": {}}) + "\n")
+            f.write(json.dumps({"t_ns": 1, "name": mark_first, "kind": "mark", "value": None, "extra": {}}) + "\n")
+        for name, mean in spans.items():
+            for _ in range(200):
+                v = max(0.001, rng.gauss(mean, mean * 0.05))
+                f.write(json.dumps({"t_ns": 2, "name": name, "kind": kind, "value": v, "extra": {}}) + "\n")
+        f.write('{"t_ns": 3, "name": "torn')   # a live file's half-written last line
+
+
+def test_report_table(tmp_path, capsys):
+    path = tmp_path / "m.jsonl"
+    _write(path, {"test.llm_total": 1.2, "test.stt_total": 0.4, "stt.wav.stream.total": 0.35}, mark_first="test.start")
+    assert bench_report.main([str(path), "--run-mark", "test.start"]) == 0
+    out = capsys.readouterr().out
+    assert "[test]" in out and "[stt]" in out
+    series = bench_report.read_series(str(path), run_mark="test.start")
+    assert series["test.llm_total"].hist.n == 200            # the record before the mark is skipped
+    assert 1.1 < series["test.llm_total"].hist.percentile(50) < 1.3
+
+
+def test_compare_flags_only_real_regressions(tmp_path, capsys):
+    base, same, slower = tmp_path / "base.jsonl", tmp_path / "same.jsonl", tmp_path / "slow.jsonl"
+    _write(base, {"test.llm_total": 1.0, "test.stt_total": 0.4})
+    _write(same, {"test.llm_total": 1.01, "test.stt_total": 0.4})
+    _write(slower, {"test.llm_total": 1.3, "test.stt_total": 0.4})
+    assert bench_report.main([str(base), "--compare", str(same)]) == 0
+    assert bench_report.main([str(base), "--compare", str(slower)]) == 1
+    assert "REGRESSION" in capsys.readouterr().out
+
+
+def test_rates_regress_downwards(tmp_path, capsys):
+    base, faster, slower = tmp_path / "base.jsonl", tmp_path / "fast.jsonl", tmp_path / "slow.jsonl"
+    _write(base, {"llm.stream.tokens_per_s": 10.0, "tts.pipeline.text_q.depth": 2.0}, kind="value")
+    _write(faster, {"llm.stream.tokens_per_s": 20.0, "tts.pipeline.text_q.depth": 4.0}, kind="value")
+    _write(slower, {"llm.stream.tokens_per_s": 5.0, "tts.pipeline.text_q.depth": 1.0}, kind="value")
+    assert bench_report.main([str(base), "--compare", str(faster)]) == 0   # depth isn't gated either way
+    assert bench_report.main([str(base), "--compare", str(slower)]) == 1
+    out = capsys.readouterr().out
+    assert "tokens_per_s" in out.split("regression(s):")[-1]
+    assert "10.25s" not in out and "ms" not in out.split("tokens_per_s")[1].splitlines()[0]
+
+
+def _summaries_only(path, mean, windows=8):
+    rng = random.Random(int(mean * 100))
+    b = Bench(flush_path=str(path), enabled=True, raw=False)
+    for _ in range(windows):
+        for _ in range(50):
+            with b.span("test.turn"):
+                pass
+            b.value("llm.stream.ttft_s", max(0.001, rng.gauss(mean, mean * 0.05)))
+        b.summarize()
+
+
+def test_summary_only_files(tmp_path, capsys):
+    base, slower, other = tmp_path / "base.jsonl", tmp_path / "slow.jsonl", tmp_path / "other.jsonl"
+    _summaries_only(base, 0.5)
+    _summaries_only(slower, 0.8)
+    series = bench_report.read_series(str(base))
+    ttft = series["llm.stream.ttft_s"]
+    assert ttft.summarized and ttft.n == 400 and 0.47 < ttft.percentile(50) < 0.53
+    assert series["test.turn"].kind == "span"
+    assert bench_report.main([str(base)]) == 0
+    assert "summ" in capsys.readouterr().out
+    assert bench_report.main([str(base), "--compare", str(slower)]) == 1
+
+    _write(other, {"unrelated.metric_s": 1.0})
+    assert bench_report.main([str(base), "--compare", str(other)]) == 2
+    with pytest.raises(SystemExit) as e:
+        bench_report.main([str(base), "--run-mark", "never.marked"])
+    assert e.value.code == 2
+
+
+def test_unreadable_input_is_a_usage_error(tmp_path, capsys):
+    base = tmp_path / "base.jsonl"
+    _write(base, {"x_s": 1.0})
+    for argv in ([str(tmp_path / "missing.jsonl")], [str(base), "--compare", str(tmp_path / "missing.jsonl")],
+                 [str(tmp_path)]):
+        with pytest.raises(SystemExit) as e:
+            bench_report.main(argv)
+        assert e.value.code == 2
+        assert "can't read" in capsys.readouterr().err
+
+
+def test_mann_whitney_direction():
+    low, high = [1, 2, 3, 4, 5] * 10, [6, 7, 8, 9, 10] * 10
+    assert bench_report.mann_whitney_greater(low, high) < 1e-6
+    assert bench_report.mann_whitney_greater(high, low) > 0.99
@@ -0,0 +1,68 @@
+"""Bench ring: wraparound across flushes, drops when full, and records lost to a racing writer."""
+
+from bench import Bench, VALUE
+
+
+class _ListSink:
+    def __init__(self):
+        self.rows = []
+
+    def write(self, records, names):
+        self.rows += [(names[nid], kind, v) for _, nid, kind, v, _ in records]
+
+    def close(self):
+        pass
+
+
+def _bench(capacity):
+    sink = _ListSink()
+    return Bench(max_queue=capacity, enabled=True, sink=sink), sink
+
+
+def _values(sink, name="x"):
+    return [v for n, _, v in sink.rows if n == name]
+
+
+def test_wraparound_keeps_order_across_flushes():
+    b, sink = _bench(8)
+    n = 0
+    for batch in (5, 8, 3, 7, 8, 1):           # slots are reused many times over
+        for _ in range(batch):
+            b.value("x", n)
+            n += 1
+        b.flush()
+    assert _values(sink) == list(range(n))
+    assert b.dropped == 0 and "bench.dropped" not in {name for name, _, _ in sink.rows}
+
+
+def test_full_ring_drops_new_records_and_reports_them_once():
+    b, sink = _bench(8)
+    for i in range(12):
+        b.value("x", i)
+    assert b.dropped == 4
+    b.flush()
+    assert _values(sink) == list(range(8))     # the oldest are kept, the newest dropped
+    assert _values(sink, "bench.dropped") == [4.0]
+
+    for i in range(3):
+        b.value("x", 100 + i)
+    b.flush()
+    assert _values(sink)[8:] == [100, 101, 102]
+    assert _values(sink, "bench.dropped") == [4.0]   # not repeated
+    assert all(kind == VALUE for _, kind, _ in sink.rows)
+
+
+def test_slots_overwritten_by_a_racing_writer_count_as_lost():
+    b, sink = _bench(8)
+    for i in range(8):
+        b.value("x", i)
+    for i in (8, 9):
+        b._write = b._read                     # writers that saw a stale fill level overwrite
+        b.value("x", i)                        # slots 0 and 1 before they are drained
+    b.flush()
+    assert _values(sink) == [2, 3, 4, 5, 6, 7, 8, 9]
+    assert b.dropped == 2 and _values(sink, "bench.dropped") == [2.0]
+
+    b.value("x", 10)                           # the ring carries on from the right slot
+    b.flush()
+    assert _values(sink)[-1] == 10
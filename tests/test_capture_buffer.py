@@ -0,0 +1,93 @@
+"""CaptureBuffer driven through callback() with fake PortAudio blocks and status flags."""
+
+import threading
+import wave
+
+import numpy as np
+
+from modules.capture_buffer import CaptureBuffer
+
+
+class _Status:
+    """Stands in for sounddevice.CallbackFlags: falsy when no flag is set."""
+
+    def __init__(self, input_overflow=False, other=False):
+        self.input_overflow = input_overflow
+        self._set = input_overflow or other
+
+    def __bool__(self):
+        return self._set
+
+
+def _block(start, frames):
+    """int16 mono PCM counting up from start, as the raw stream hands it over."""
+    return np.arange(start, start + frames, dtype=np.int16).tobytes()
+
+
+def _samples(view):
+    return np.frombuffer(view, dtype=np.int16).tolist()
+
+
+def test_blocks_are_read_in_order_without_copies():
+    buf = CaptureBuffer(sample_rate=100, max_seconds=1.0)      # 100 frames
+    buf.callback(_block(0, 10), 10, None, _Status())
+    buf.callback(_block(10, 10), 10, None, _Status())
+    chunk = buf.read(timeout=0)
+    assert _samples(chunk) == list(range(20))
+    assert buf.read(timeout=0) is None                          # nothing new
+    buf.callback(_block(20, 5), 5, None, _Status())
+    assert _samples(buf.read(timeout=0)) == list(range(20, 25))
+    assert _samples(buf.pcm()) == list(range(25))
+    assert _samples(buf.replay(10 * 2)) == list(range(10, 25))  # re-read from an offset already handed out
+    assert buf.blocks == 3 and buf.duration == 0.25
+    assert (buf.overflows, buf.status_flags, buf.dropped_frames) == (0, 0, 0)
+
+
+def test_status_flags_are_counted_by_kind():
+    buf = CaptureBuffer(sample_rate=100, max_seconds=1.0)
+    buf.callback(_block(0, 4), 4, None, _Status(input_overflow=True))
+    buf.callback(_block(4, 4), 4, None, _Status(other=True))
+    buf.callback(_block(8, 4), 4, None, _Status(input_overflow=True))
+    buf.callback(_block(12, 4), 4, None, _Status())
+    assert (buf.overflows, buf.status_flags) == (2, 1)
+    assert _samples(buf.read(timeout=0)) == list(range(16))  # flagged blocks are still kept
+
+
+def test_overflow_past_capacity_drops_frames():
+    buf = CaptureBuffer(sample_rate=100, max_seconds=0.1)       # 10 frames
+    buf.callback(_block(0, 6), 6, None, _Status())
+    buf.callback(_block(6, 6), 6, None, _Status())              # 4 fit, 2 dropped
+    buf.callback(_block(12, 3), 3, None, _Status())             # all dropped
+    assert buf.full and buf.dropped_frames == 5 and buf.blocks == 3
+    assert _samples(buf.read(timeout=0)) == list(range(10))
+    assert buf.read(timeout=0) is None
+
+
+def test_reset_reuses_the_memory_from_the_start():
+    buf = CaptureBuffer(sample_rate=100, max_seconds=0.1)
+    buf.callback(_block(0, 12), 12, None, _Status(input_overflow=True))
+    assert buf.read(timeout=0) is not None
+    memory = buf._buf
+    buf.reset()
+    assert (buf.overflows, buf.dropped_frames, buf.blocks) == (0, 0, 0)
+    assert buf.read(timeout=0) is None
+    buf.callback(_block(100, 8), 8, None, _Status())
+    assert _samples(buf.read(timeout=0)) == list(range(100, 108))
+    assert buf._buf is memory and not buf.full
+
+
+def test_read_waits_for_the_callback():
+    buf = CaptureBuffer(sample_rate=100, max_seconds=1.0)
+    timer = threading.Timer(0.05, buf.callback, args=(_block(0, 4), 4, None, _Status()))
+    timer.start()
+    assert _samples(buf.read(timeout=5)) == [0, 1, 2, 3]
+    timer.join()
+
+
+def test_save_wav(tmp_path):
+    buf = CaptureBuffer(sample_rate=100, max_seconds=1.0)
+    buf.callback(_block(0, 30), 30, None, _Status())
+    path = buf.save_wav(tmp_path / "rec.wav")
+    with wave.open(str(path), "rb") as wf:
+        assert (wf.getframerate(), wf.getnchannels(), wf.getsampwidth(), wf.getnframes()) == (100, 1, 2, 30)
+        assert _samples(wf.readframes(30)) == list(range(30))
@@ -0,0 +1,69 @@
+"""ConversationManager: whole-turn windows under a token budget, and background compaction."""
+
+from modules.conversation import ConversationManager, message_tokens
+
+
+def _chat(conv, n, size=40):
+    for i in range(n):
+        conv.add("user", f"question {i} " + "x" * size)
+        conv.add("assistant", f"answer {i} " + "y" * size)
+
+
+def test_window_keeps_whole_turns():
+    conv = ConversationManager("system", budget_tokens=70)
+    _chat(conv, 5)
+    conv.add("user", "latest question")
+    window = conv.window()
+    turns = window[1:]
+    assert turns[0]["role"] == "user"
+    assert turns[-1]["content"] == "latest question"
+    assert sum(message_tokens(m) for m in window) <= 70
+    assert len(turns) % 2 == 1                      # pairs plus the new question
+
+
+def test_window_never_opens_on_an_assistant_message():
+    # Budget fits the newest turn plus exactly one more message: the older
+    # turn's assistant reply alone would fit, but must not go in without its question
+    conv = ConversationManager("system", budget_tokens=1)
+    conv.add("user", "old question")
+    conv.add("assistant", "old answer")
+    conv.add("user", "new question")
+    sys_cost = message_tokens(conv.system)
+    conv.budget_tokens = sys_cost + message_tokens(conv.turns[1]) + message_tokens(conv.turns[2])
+    assert [m["content"] for m in conv.window()[1:]] == ["new question"]
+
+
+def test_newest_turn_goes_in_over_budget():
+    conv = ConversationManager("system", budget_tokens=5)
+    conv.add("user", "a very long question " * 20)
+    assert conv.window()[1:] == conv.turns
+
+
+def test_leading_orphan_after_max_turns_is_skipped():
+    conv = ConversationManager("system", budget_tokens=10_000, max_turns=3)
+    _chat(conv, 2, size=0)                          # u0 a0 u1 a1 -> a0 u1 a1 kept
+    assert conv.turns[0]["role"] == "assistant"
+    assert conv.window()[1]["content"].startswith("question 1")
+
+
+class _Summariser:
+    def __init__(self):
+        self.transcripts = []
+
+    def call(self, messages, temperature=0.7):
+        self.transcripts.append(messages[-1]["content"])
+        return "They talked."
+
+
+def test_compact_folds_the_turns_outside_the_window():
+    conv = ConversationManager("system", budget_tokens=70)
+    _chat(conv, 4)
+    conv.add("user", "latest question")
+    kept = conv.window()[1:]
+    llm = _Summariser()
+    conv.compact_async(llm)
+    conv._compacting.join()
+    assert conv.summary == "They talked."
+    assert conv.turns == kept
+    assert "question 0" in llm.transcripts[0] and "latest question" not in llm.transcripts[0]
+    assert conv.window()[1]["content"].startswith("Summary of the earlier conversation")
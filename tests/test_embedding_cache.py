@@ -0,0 +1,71 @@
+"""EmbeddingCache: save() appends rows in place and a reopened cache sees every one."""
+
+import numpy as np
+
+from modules.embedding_cache import EmbeddingCache
+
+
+def test_save_appends_only_new_rows(tmp_path):
+    cache = EmbeddingCache(tmp_path, "ollama:mock")
+    for i in range(3):
+        cache.add(f"text {i}", np.full(4, i))
+    cache.save()
+    size = cache.matrix_path.stat().st_size
+    inode = cache.matrix_path.stat().st_ino
+
+    for i in range(3, 5):
+        cache.add(f"text {i}", np.full(4, i))
+    cache.save()
+    assert cache.matrix_path.stat().st_ino == inode           # same file, not a rewrite
+    assert cache.matrix_path.stat().st_size == size + 2 * 4 * 4
+
+    reopened = EmbeddingCache(tmp_path, "ollama:mock")
+    hits, missing = reopened.lookup([f"text {i}" for i in range(6)])
+    assert missing == ["text 5"]
+    assert [hits[f"text {i}"][0] for i in range(5)] == [0, 1, 2, 3, 4]
+    assert np.load(cache.matrix_path).shape == (5, 4)
+
+
+def _fill(cache, texts):
+    for t in texts:
+        cache.add(t, np.full(4, float(len(t))))
+    cache.save()
+
+
+def test_lost_matrix_file_recovers_on_the_next_save(tmp_path):
+    _fill(EmbeddingCache(tmp_path, "ns"), ["a", "bb"])
+    cache = EmbeddingCache(tmp_path, "ns")
+    cache.matrix_path.unlink()                                # stale .keys left behind
+
+    reopened = EmbeddingCache(tmp_path, "ns")
+    assert len(reopened) == 0
+    _fill(reopened, ["ccc"])
+    again = EmbeddingCache(tmp_path, "ns")
+    assert len(again) == 1 and again.lookup(["ccc"])[0]["ccc"][0] == 3.0
+    _fill(again, ["dddd"])
+    assert len(EmbeddingCache(tmp_path, "ns")) == 2
+
+
+def test_interrupted_save_keeps_the_rows_both_files_have(tmp_path):
+    _fill(EmbeddingCache(tmp_path, "ns"), ["a", "bb", "ccc"])
+    keys_path = EmbeddingCache(tmp_path, "ns").keys_path
+
+    # Crash after the keys, before the matrix header: two keys with no rows, one torn
+    with open(keys_path, "ab") as f:
+        f.write(EmbeddingCache.digest("lost") + EmbeddingCache.digest("torn")[:7])
+    cache = EmbeddingCache(tmp_path, "ns")
+    hits, missing = cache.lookup(["a", "bb", "ccc", "lost"])
+    assert missing == ["lost"] and hits["ccc"][0] == 3.0
+    _fill(cache, ["dddd"])
+    assert keys_path.stat().st_size == 4 * 32
+
+    # Crash after the matrix, before the keys: a row with no key
+    with open(keys_path, "r+b") as f:
+        f.truncate(3 * 32)
+    cache = EmbeddingCache(tmp_path, "ns")
+    assert len(cache) == 3 and cache.lookup(["dddd"])[1] == ["dddd"]
+    _fill(cache, ["eeeee"])
+    reopened = EmbeddingCache(tmp_path, "ns")
+    hits, missing = reopened.lookup(["a", "bb", "ccc", "dddd", "eeeee"])
+    assert missing == ["dddd"] and hits["eeeee"][0] == 5.0
+    assert np.load(reopened.matrix_path).shape == (4, 4)
@@ -0,0 +1,160 @@
+"""
+HedgedLLM against two local mock servers (tests/mock_llm_server.py): one
+Ollama-style, one OpenAI-style. Skipped when httpx or the provider SDKs
+are not installed.
+
+The slow backend is held at its first token by a gate rather than a long
+delay, so which backend wins never depends on how busy the box is; the
+remaining time checks are lower bounds or fractions of a long deadline.
+"""
+
+import os
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("ollama")
+pytest.importorskip("openai")
+
+from modules.hedged_llm import HedgedLLM, TTFTHistogram
+from tests.mock_llm_server import start_mock_server
+
+
+def _ollama(url):
+    from modules.llm_handler import LLMHandler
+    return LLMHandler(provider="ollama", model="primary", base_url=url)
+
+
+def _openai(url):
+    from modules.llm_handler import LLMHandler
+    os.environ.setdefault("OPENAI_API_KEY", "mock")
+    return LLMHandler(provider="openai", model="secondary", base_url=url + "/v1")
+
+
+@pytest.fixture
+def servers():
+    gate = threading.Event()    # the slow server's first token waits for this
+    slow, slow_url = start_mock_server(ttft_ms=0, token_ms=5, reply="slow primary reply", gate=gate)
+    fast, fast_url = start_mock_server(ttft_ms=20, token_ms=5, reply="fast secondary reply")
+    slow.gate = gate
+    yield (slow, slow_url), (fast, fast_url)
+    gate.set()
+    slow.shutdown()
+    fast.shutdown()
+
+
+def _wait_for(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return predicate()
+
+
+def _collect(llm):
+    t0 = time.perf_counter()
+    first = None
+    parts = []
+    for chunk in llm.stream("Hello?", temperature=0.0):
+        assert "error" not in chunk, chunk
+        if first is None:
+            first = time.perf_counter() - t0
+        parts.append(chunk["content"])
+    return "".join(parts), first
+
+
+def test_hedge_wins_when_primary_is_slow(servers):
+    (slow, slow_url), (fast, fast_url) = servers
+    llm = HedgedLLM([_ollama(slow_url), _openai(fast_url)], deadline_s=0.1)
+    try:
+        text, first = _collect(llm)
+        assert text == "fast secondary reply"
+        assert first >= llm.deadline_s             # the hedge only starts at the deadline
+        assert llm.hedges == 1 and llm.wins == [0, 1]
+        assert llm.ttft[0].samples == 1            # censored: cancelled before its first token
+        assert llm.ttft[0].quantile(0.5) >= llm.deadline_s
+        slow.gate.set()                            # the held reply now meets a closed connection
+        assert _wait_for(lambda: slow.cancelled == 1)
+    finally:
+        llm.close()
+
+
+def test_no_hedge_when_primary_is_fast(servers):
+    (slow, slow_url), (fast, fast_url) = servers
+    llm = HedgedLLM([_ollama(fast_url), _openai(slow_url)], deadline_s=30.0)
+    try:
+        text, _ = _collect(llm)
+        assert text == "fast secondary reply"
+        assert llm.hedges == 0 and slow.requests == 0
+    finally:
+        llm.close()
+
+
+def test_fails_over_at_once_when_primary_is_down(servers):
+    _, (fast, fast_url) = servers
+    llm = HedgedLLM([_ollama("http://127.0.0.1:9"), _openai(fast_url)], deadline_s=60.0)
+    try:
+        text, first = _collect(llm)
+        assert text == "fast secondary reply"
+        assert first < llm.deadline_s / 4           # failed over on the error, not at the deadline
+    finally:
+        llm.close()
+
+
+def test_failure_chunk_when_every_backend_is_empty():
+    empty_a, url_a = start_mock_server(ttft_ms=10, reply="")
+    empty_b, url_b = start_mock_server(ttft_ms=10, reply="")
+    llm = HedgedLLM([_ollama(url_a), _openai(url_b)], deadline_s=5.0)
+    try:
+        chunks = list(llm.stream("Hello?", temperature=0.0))
+        assert len(chunks) == 1
+        assert chunks[0].content is None and chunks[0].error == "All LLM backends ended without a reply"
+        assert empty_a.requests == 1 and empty_b.requests == 1
+    finally:
+        llm.close()
+        empty_a.shutdown()
+        empty_b.shutdown()
+
+
+def test_warm_up_reaches_every_backend(servers):
+    (slow, slow_url), (fast, fast_url) = servers
+    slow.gate.set()
+    llm = HedgedLLM([_ollama(fast_url), _openai(slow_url)])
+    try:
+        llm.warm_up("You are terse.")
+        assert fast.requests == 1 and slow.requests == 1
+        assert all(b._warm_prefix[0]["content"] == "You are terse." for b in llm.backends)
+        llm.start_keep_warm(60)
+        assert llm.backends[0]._keep_warm is not None      # Ollama only; the OpenAI backend ignores it
+        llm.stop_keep_warm()
+        assert llm.backends[0]._keep_warm is None
+    finally:
+        llm.close()
+
+
+def test_warm_up_tolerates_a_dead_hedge(servers):
+    _, (fast, fast_url) = servers
+    llm = HedgedLLM([_ollama(fast_url), _ollama("http://127.0.0.1:9")])
+    try:
+        llm.warm_up()
+        assert fast.requests == 1
+        with pytest.raises(Exception):
+            HedgedLLM([_ollama("http://127.0.0.1:9"), _ollama(fast_url)]).warm_up()
+    finally:
+        llm.close()
+
+
+def test_ttft_histogram_quantiles_and_decay():
+    hist = TTFTHistogram(half_life=1000)
+    for _ in range(95):
+        hist.record(0.2)
+    for _ in range(5):
+        hist.record(2.0)
+    assert 0.19 <= hist.quantile(0.9) <= 0.22
+    assert 1.9 <= hist.quantile(0.99) <= 2.2
+
+    hist = TTFTHistogram(half_life=20)
+    for seconds in [0.2] * 100 + [2.0] * 100:
+        hist.record(seconds)
+    assert hist.quantile(0.5) >= 1.9   # the recent, slow samples dominate
@@ -0,0 +1,61 @@
+"""
+Import-time budget for the service's entry modules.
+
+Wall-clock budgets flake with the box and its load, so each budget is a
+multiple of a baseline measured in the same run: the import of asyncio, a
+pure-Python stdlib package of similar shape, in the same kind of fresh
+interpreter. The multiples are generous (on a Pi 4/5 asyncio takes ~100 ms).
+IMPORT_BUDGET_MS (applies to all) or IMPORT_BUDGET_MS_<MODULE>, e.g.
+IMPORT_BUDGET_MS_BUTTONTALK=800, set an absolute budget for a given box
+instead. Modules whose third-party deps are not installed are skipped
+rather than failed.
+"""
+
+import os
+
+import pytest
+
+from tests.import_time import measure, ImportFailed
+
+BASELINE = "asyncio"
+BUDGET_X = {
+    "modules.llm_handler": 4.0,     # provider SDKs must stay out of module import
+    "piper_tts": 2.5,               # no onnxruntime / voice load at import
+    "buttontalk": 15.0,
+}
+
+
+@pytest.fixture(scope="module")
+def baseline_ms() -> float:
+    return min(measure(BASELINE)[0] for _ in range(3))
+
+
+def _budget(module: str, baseline_ms: float) -> float:
+    key = "IMPORT_BUDGET_MS_" + module.rsplit(".", 1)[-1].upper()
+    fixed = os.getenv(key) or os.getenv("IMPORT_BUDGET_MS")
+    return float(fixed) if fixed else BUDGET_X[module] * baseline_ms
+
+
+@pytest.mark.parametrize("module", list(BUDGET_X))
+def test_import_budget(module, baseline_ms):
+    budget = _budget(module, baseline_ms)
+    try:
+        total_ms, rows = measure(module)
+        if total_ms > budget:                      # one noisy run is not a regression
+            total_ms, rows = min(measure(module), (total_ms, rows))
+    except ImportFailed as e:
+        pytest.skip(str(e))
+    heaviest = sorted(rows, key=lambda r: r[1], reverse=True)[:5]
+    detail = ", ".join(f"{name} {self_ms:.0f}ms" for name, self_ms, _ in heaviest)
+    assert total_ms <= budget, (f"import {module} took {total_ms:.0f} ms, budget {budget:.0f} ms "
+                                f"({BASELINE} {baseline_ms:.0f} ms; heaviest: {detail})")
+
+
+def test_provider_sdks_not_imported():
+    """Importing the handler must not drag in any provider SDK."""
+    try:
+        _, rows = measure("modules.llm_handler")
+    except ImportFailed as e:
+        pytest.skip(str(e))
+    loaded = {name for name, _, _ in rows}
+    assert not loaded & {"openai", "groq", "instructor", "ollama", "pydantic"}
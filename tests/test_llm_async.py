@@ -0,0 +1,84 @@
+"""
+LLMHandler's async methods (astream, acall, acall_schema, aembed) against
+tests/mock_llm_server.py, for both the Ollama and the OpenAI-style API.
+Skipped when httpx or the provider SDKs are not installed.
+"""
+
+import asyncio
+import os
+
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("ollama")
+pytest.importorskip("openai")
+
+from pydantic import BaseModel
+
+from modules.llm_handler import LLMHandler, with_scheme
+from tests.mock_llm_server import fake_embedding, start_mock_server
+
+
+class Answer(BaseModel):
+    answer: str
+
+
+@pytest.fixture
+def server():
+    server, url = start_mock_server(ttft_ms=10, token_ms=2, reply="Hello from the mock.")
+    yield server, url
+    server.shutdown()
+
+
+def _handler(provider, url):
+    os.environ.setdefault("OPENAI_API_KEY", "mock")
+    return LLMHandler(provider=provider, model="mock", base_url=url + ("/v1" if provider == "openai" else ""))
+
+
+@pytest.mark.parametrize("provider", ["ollama", "openai"])
+def test_async_methods(server, provider):
+    _, url = server
+    llm = _handler(provider, url)
+
+    async def run():
+        try:
+            chunks = [c async for c in llm.astream("Hi", temperature=0.0)]
+            assert all(c.error is None for c in chunks)
+            assert "".join(c.content or "" for c in chunks) == "Hello from the mock."
+            assert chunks[-1].finish_reason is not None
+            assert await llm.acall("Hi") == "Hello from the mock."
+            assert await llm.acall_schema([{"role": "user", "content": "Hi"}], Answer) == Answer(answer="ok")
+            assert await llm.aembed("Hi") == pytest.approx(fake_embedding("Hi"))
+        finally:
+            await llm.aclose()
+
+    asyncio.run(run())
+
+
+def test_astream_reports_a_dead_server_as_a_failure_chunk():
+    llm = _handler("ollama", "http://127.0.0.1:9")
+
+    async def run():
+        try:
+            return [c async for c in llm.astream("Hi")]
+        finally:
+            await llm.aclose()
+
+    chunks = asyncio.run(run())
+    assert len(chunks) == 1 and chunks[0].content is None and "Streaming error (ollama)" in chunks[0].error
+
+
+def test_ollama_host_without_scheme(server):
+    _, url = server
+    assert with_scheme("localhost:11434") == "http://localhost:11434"
+    assert with_scheme("https://ollama.lan") == "https://ollama.lan"
+    llm = LLMHandler(provider="ollama", model="mock", base_url=url.removeprefix("http://"))
+    assert llm.base_url == url
+
+    async def run():
+        try:
+            return await llm.acall("Hi")
+        finally:
+            await llm.aclose()
+
+    assert asyncio.run(run()) == "Hello from the mock."
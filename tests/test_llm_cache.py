@@ -0,0 +1,74 @@
+"""LLMCache: TTL expiry, LRU eviction and the amortised pruning in put()."""
+
+import sqlite3
+
+from modules.llm_cache import LLMCache
+
+
+class _Clock:
+    def __init__(self, t=1_000_000.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+def _rows(cache):
+    return sqlite3.connect(str(cache.path)).execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+def test_entries_expire_after_ttl(tmp_path, monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr("modules.llm_cache.time.time", clock)
+    cache = LLMCache(tmp_path / "c.sqlite", ttl_s=60)
+    cache.put("a", "alpha")
+    clock.t += 59
+    assert cache.get("a") == "alpha"
+    clock.t += 2
+    assert cache.get("a") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert _rows(cache) == 0
+
+
+def test_least_recently_used_are_evicted(tmp_path, monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr("modules.llm_cache.time.time", clock)
+    cache = LLMCache(tmp_path / "c.sqlite", max_entries=10, low_water=0.5)
+    for i in range(10):
+        clock.t += 1
+        cache.put(f"k{i}", str(i))
+    clock.t += 1
+    assert cache.get("k0") == "0"           # now the most recently used
+    clock.t += 1
+    cache.put("k10", "10")                  # over the limit: prune to 5
+
+    assert _rows(cache) == 5
+    assert cache.get("k0") == "0"
+    assert [cache.get(f"k{i}") for i in range(1, 7)] == [None] * 6
+    assert [cache.get(f"k{i}") for i in range(7, 11)] == ["7", "8", "9", "10"]
+
+
+def test_replacing_a_key_does_not_evict(tmp_path):
+    cache = LLMCache(tmp_path / "c.sqlite", max_entries=3)
+    for i in range(3):
+        cache.put(f"k{i}", str(i))
+    for _ in range(10):
+        cache.put("k0", "again")            # the running count over-counts; the prune recounts
+    assert _rows(cache) == 3
+    assert cache.get("k2") == "2"
+
+
+def test_expired_rows_go_at_open_and_on_prune(tmp_path, monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr("modules.llm_cache.time.time", clock)
+    cache = LLMCache(tmp_path / "c.sqlite", ttl_s=60, max_entries=4, low_water=1.0)
+    for i in range(4):
+        cache.put(f"old{i}", "x")
+    clock.t += 120
+    cache.put("new", "y")                   # over the limit: the expired rows go first, nothing live is evicted
+    assert _rows(cache) == 1 and cache.get("new") == "y"
+    cache.close()
+
+    clock.t += 120
+    LLMCache(tmp_path / "c.sqlite", ttl_s=60).close()
+    assert _rows(cache) == 0
@@ -0,0 +1,97 @@
+"""Stream chunk protocol, the SSE / NDJSON delta parsers and StreamStats timing."""
+
+import json
+
+import pytest
+
+from modules.llm_stream import NDJSONDeltaParser, SSEDeltaParser, StreamChunk, StreamStats
+
+
+def _sse(delta: dict, finish=None) -> str:
+    return "data: " + json.dumps({"choices": [{"index": 0, "delta": delta, "finish_reason": finish}]})
+
+
+def test_sse_skips_empty_deltas_and_keepalives():
+    parser = SSEDeltaParser()
+    lines = [": keep-alive", "", _sse({"role": "assistant"}), _sse({"content": ""}),
+             _sse({"content": "Hi"}), _sse({"content": " there"}), _sse({}, "stop"), "data: [DONE]"]
+    chunks = [c for c in map(parser.feed, lines) if c is not None]
+    assert [c.content for c in chunks] == ["Hi", " there", ""]
+    assert [c.index for c in chunks[:2]] == [0, 1]
+    assert chunks[-1].finish_reason == "stop" and parser.done
+    assert all(c.t_ns > 0 for c in chunks)
+
+
+def test_ndjson_done_and_error():
+    parser = NDJSONDeltaParser()
+    assert parser.feed(json.dumps({"message": {"content": ""}, "done": False})) is None
+    assert parser.feed(json.dumps({"message": {"content": "ok"}, "done": False})).content == "ok"
+    last = parser.feed(json.dumps({"message": {"content": ""}, "done": True, "done_reason": "length"}))
+    assert last.finish_reason == "length" and parser.done
+
+    failed = NDJSONDeltaParser().feed(json.dumps({"error": "model not found"}))
+    assert "error" in failed and failed.get("content", "") == ""
+
+
+def test_only_the_closing_chunk_is_empty():
+    sse = SSEDeltaParser()
+    lines = [_sse({"content": ""}), _sse({"content": "a"}), _sse({}), _sse({"content": "b"}), _sse({}, "stop")]
+    chunks = [c for c in map(sse.feed, lines) if c is not None]
+    assert [c.content for c in chunks] == ["a", "b", ""]
+    assert all(c.content for c in chunks[:-1]) and chunks[-1].finish_reason == "stop"
+
+    # finish on a content-bearing delta: no separate closing chunk at all
+    sse = SSEDeltaParser()
+    chunks = [c for c in map(sse.feed, [_sse({"content": "a"}), _sse({"content": "b"}, "stop")]) if c is not None]
+    assert [(c.content, c.finish_reason) for c in chunks] == [("a", None), ("b", "stop")]
+
+    ndjson = NDJSONDeltaParser()
+    lines = [json.dumps({"message": {"content": t}, "done": False}) for t in ("", "x", "", "y")]
+    lines.append(json.dumps({"message": {"content": ""}, "done": True, "done_reason": "stop", "eval_count": 2}))
+    chunks = [c for c in map(ndjson.feed, lines) if c is not None]
+    assert [c.content for c in chunks] == ["x", "y", ""]
+    assert chunks[-1].usage == {"eval_count": 2}
+
+
+def test_chunk_dict_compatibility():
+    chunk = StreamChunk("word ", index=3)
+    assert chunk.get("content", "") == "word " and chunk["content"] == "word "
+    assert "error" not in chunk and chunk.get("error") is None
+    assert not hasattr(chunk, "__dict__")
+
+
+def _stats_run(monkeypatch, times_ms, usage=None, first_request=False):
+    """StreamStats over content chunks at times_ms after the request; returns {metric: (value, tags)}."""
+    recorded = {}
+    monkeypatch.setattr("modules.llm_stream.bench.value",
+                        lambda name, v, **extra: recorded.setdefault(name, (v, extra)))
+    stats = StreamStats("ollama", "m", [{"role": "user", "content": "hi"}], first_request=first_request)
+    start = stats.start_ns
+    for i, ms in enumerate(times_ms):
+        stats.add(StreamChunk("tok ", index=i, t_ns=start + int(ms * 1e6)))
+    stats.add(StreamChunk("", "stop", t_ns=start + int(times_ms[-1] * 1e6) + 1, usage=usage))
+    stats.report()
+    return recorded
+
+
+def test_stream_stats_ttft_and_rate(monkeypatch):
+    # First token at 250 ms, then 10 more, one every 50 ms: 20 tokens/s after the first
+    r = _stats_run(monkeypatch, [250 + 50 * i for i in range(11)])
+    assert r["llm.stream.ttft_s"][0] == pytest.approx(0.25)
+    assert r["llm.stream.tokens_per_s"][0] == pytest.approx(20.0)
+    assert r["llm.stream.total_s"][0] == pytest.approx(0.75)
+    assert r["llm.stream.ttft_s"][1]["output_tokens"] == 11      # the closing chunk isn't a token
+    assert r["llm.stream.gap_p90_ms"][0] == 50 and r["llm.stream.gap_p90_ms"][1]["hist_ms"] == {"<=50": 10}
+    assert "llm.stream.ttft_warm_s" in r
+
+
+def test_stream_stats_cold_from_usage_or_first_request(monkeypatch):
+    assert "llm.stream.ttft_cold_s" in _stats_run(monkeypatch, [100, 120], usage={"load_duration": int(3e9)})
+    assert "llm.stream.ttft_warm_s" in _stats_run(monkeypatch, [100, 120], usage={"load_duration": 1000})
+    assert "llm.stream.ttft_cold_s" in _stats_run(monkeypatch, [100, 120], first_request=True)
+
+
+def test_stream_stats_single_token_has_no_rate(monkeypatch):
+    r = _stats_run(monkeypatch, [300])
+    assert r["llm.stream.ttft_s"][0] == pytest.approx(0.3)
+    assert "llm.stream.tokens_per_s" not in r and "llm.stream.gap_p90_ms" not in r
@@ -0,0 +1,22 @@
+"""rate_limit: one quota per provider, and interactive charges that never wait."""
+
+import time
+
+from modules.rate_limit import RateLimiter, limiter_for
+
+
+def test_reconfigure_keeps_one_shared_limiter():
+    first = limiter_for("test-provider", rpm=60)
+    second = limiter_for("test-provider", rpm=120, burst=2)
+    assert first is second
+    assert first.rate == 2.0 and first.burst == 2
+
+
+def test_charge_never_waits_but_delays_acquire():
+    limiter = RateLimiter(rpm=600, burst=1)      # one request per 0.1 s
+    t0 = time.perf_counter()
+    limiter.charge()
+    limiter.charge()                             # balance now -1
+    assert time.perf_counter() - t0 < 0.01
+    waited = limiter.acquire()
+    assert 0.15 < waited < 0.4                   # two tokens' worth of refill first
@@ -0,0 +1,94 @@
+"""Streaming sentence/clause segmenter used by stream_and_speak."""
+
+import random
+
+import pytest
+
+from modules.segmenter import SentenceSegmenter
+
+
+def segment(text: str, pieces: str = "chars", **kwargs) -> list[str]:
+    seg = SentenceSegmenter(**kwargs)
+    if pieces == "chars":
+        tokens = list(text)
+    else:
+        tokens = [w + " " for w in text.split(" ")]
+        tokens[-1] = tokens[-1].rstrip()
+    out = []
+    for token in tokens:
+        out.extend(seg.feed(token))
+    return out + seg.flush()
+
+
+@pytest.mark.parametrize("pieces", ["chars", "words"])
+def test_sentences(pieces):
+    text = "It is sunny today. Take a hat! Will it rain? No."
+    assert segment(text, pieces, min_clause_words=0) == [
+        "It is sunny today.", "Take a hat!", "Will it rain?", "No."]
+
+
+def test_abbreviations_numbers_and_initials():
+    text = "Dr. Smith paid $3.50 on Jan. 5 at example.com today. J. R. R. Tolkien wrote it."
+    assert segment(text, min_clause_words=0) == [
+        "Dr. Smith paid $3.50 on Jan. 5 at example.com today.", "J. R. R. Tolkien wrote it."]
+
+
+def test_list_numbers_and_ellipsis():
+    text = "1. Preheat the oven. 2. Wait... then bake it?! Done."
+    assert segment(text, min_clause_words=0) == [
+        "1. Preheat the oven.", "2. Wait...", "then bake it?!", "Done."]
+
+
+def test_closing_quotes_stay_with_sentence():
+    text = 'She said "Stop here." Then she left.'
+    assert segment(text, min_clause_words=0) == ['She said "Stop here."', "Then she left."]
+
+
+def test_boundary_waits_for_the_next_character():
+    seg = SentenceSegmenter(min_clause_words=0)
+    assert seg.feed("It costs 3.") == []
+    assert seg.feed("5 euros. Ok") == ["It costs 3.5 euros."]
+    assert seg.flush() == ["Ok"]
+
+
+def test_first_clause_flushes_early_then_whole_sentences():
+    text = "Well, the weather in Stockholm today is mild, with light winds, and rain later on. Bring a coat, just in case it pours."
+    assert segment(text, min_clause_words=6) == [
+        "Well, the weather in Stockholm today is mild,",
+        "with light winds, and rain later on.",
+        "Bring a coat, just in case it pours."]
+
+
+def test_every_clause_when_not_first_only():
+    text = "The first part is long enough, and so is the second part here; end."
+    assert segment(text, min_clause_words=5, clause_first_only=False) == [
+        "The first part is long enough,", "and so is the second part here;", "end."]
+
+
+def test_thousands_separator_is_not_a_clause():
+    assert segment("About 1,000,000 people live in the area, roughly.", min_clause_words=3) == [
+        "About 1,000,000 people live in the area,", "roughly."]
+
+
+def test_max_chars_cuts_at_a_space():
+    text = "word " * 30
+    out = segment(text.strip(), min_clause_words=0, max_chars=40)
+    assert all(len(s) <= 40 for s in out)
+    assert " ".join(out) == text.strip()
+
+
+@pytest.mark.parametrize("pieces", ["chars", "words"])
+def test_max_chars_holds_with_punctuation_runs(pieces):
+    rng = random.Random(7)
+    words = ["word", "and", "Dr.", "3.5", "stop.", 'end."', "what?!", "...", "!!!!!!!!", "?" * 60, "(aside)"]
+    text = " ".join(rng.choice(words) for _ in range(400))
+    for min_clause_words in (0, 3):
+        out = segment(text, pieces, min_clause_words=min_clause_words, max_chars=40)
+        assert max(len(s) for s in out) <= 40
+        assert "".join(out).replace(" ", "") == text.replace(" ", "")
+
+
+def test_flush_respects_max_chars():
+    seg = SentenceSegmenter(min_clause_words=0, max_chars=20)
+    assert seg.feed("Wow" + "!" * 50) == []          # a run at the end stays pending
+    assert [len(s) for s in seg.flush()] == [20, 20, 13]
@@ -0,0 +1,118 @@
+"""SemanticCache hit/miss thresholds, TTL and eviction; SemanticCachedLLM replay, with hand-made embeddings."""
+
+import math
+
+import numpy as np
+
+from modules.llm_stream import StreamChunk
+from modules.semantic_cache import SemanticCache, SemanticCachedLLM
+
+
+def _at(degrees: float) -> list[float]:
+    """Unit vector at an angle from the x axis: cosine similarity to "base" is cos(degrees)."""
+    r = math.radians(degrees)
+    return [math.cos(r), math.sin(r), 0.0]
+
+
+VECTORS = {
+    "base": _at(0),
+    "near": _at(18),        # cos 0.951
+    "far": _at(32),         # cos 0.848
+    "other": [0.0, 0.0, 5.0],
+}
+
+
+def _cache(**kw):
+    return SemanticCache(lambda text: VECTORS[text], **kw)
+
+
+def test_hit_and_miss_around_the_threshold():
+    cache = _cache(threshold=0.9)
+    assert cache.lookup("base")[0] is None                 # empty
+    cache.store("base", "the answer", llm_s=1.5)
+
+    answer, sim, _ = cache.lookup("near")
+    assert answer == "the answer" and sim >= 0.9
+    answer, sim, _ = cache.lookup("far")
+    assert answer is None and 0.8 < sim < 0.9
+    assert cache.lookup("other")[0] is None
+    assert (cache.hits, cache.misses) == (1, 3)
+    assert cache.saved_s == 1.5
+
+    loose = _cache(threshold=0.8)
+    loose.store("base", "the answer", llm_s=1.0)
+    assert loose.lookup("far")[0] == "the answer"
+
+
+def test_similarity_is_cosine_not_dot_product():
+    cache = SemanticCache(lambda text: [10.0, 0.0, 0.0] if text == "long" else VECTORS[text], threshold=0.99)
+    cache.store("long", "scaled", llm_s=0.1)
+    answer, sim, _ = cache.lookup("base")
+    assert answer == "scaled" and abs(sim - 1.0) < 1e-6
+
+
+def test_expired_entries_miss_and_are_reused_first(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("modules.semantic_cache.time.time", lambda: clock[0])
+    cache = _cache(threshold=0.9, max_entries=2, ttl_s=60)
+    cache.store("base", "old", llm_s=1.0)
+    clock[0] += 30
+    cache.store("other", "fresh", llm_s=1.0)
+    clock[0] += 31                                         # base expired, other still live
+    assert cache.lookup("near")[0] is None
+    cache.store("far", "newer", llm_s=1.0)                 # full: takes the expired slot
+    assert cache.lookup("other")[0] == "fresh"
+    assert cache.lookup("far")[0] == "newer"
+
+
+def test_least_recently_used_is_evicted(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("modules.semantic_cache.time.time", lambda: clock[0])
+    cache = _cache(threshold=0.99, max_entries=2)
+    cache.store("base", "a", llm_s=1.0)
+    clock[0] += 1
+    cache.store("other", "b", llm_s=1.0)
+    clock[0] += 1
+    assert cache.lookup("base")[0] == "a"                  # other is now the least recently used
+    clock[0] += 1
+    cache.store("far", "c", llm_s=1.0)
+    assert cache.lookup("other")[0] is None
+    assert cache.lookup("base")[0] == "a" and cache.lookup("far")[0] == "c"
+
+
+class _LLM:
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = 0
+
+    def stream(self, messages, temperature=0.7):
+        self.calls += 1
+        for i, word in enumerate(self.reply.split(" ")):
+            yield StreamChunk(word + " ", index=i)
+
+
+def test_cached_llm_streams_once_then_replays():
+    llm = _LLM("Paris is the capital.")
+    cached = SemanticCachedLLM(llm, _cache(threshold=0.9))
+    first = "".join(c["content"] for c in cached.stream([{"role": "user", "content": "base"}]))
+    again = "".join(c["content"] for c in cached.stream([{"role": "system", "content": "x"},
+                                                         {"role": "user", "content": "near"}]))
+    assert first.strip() == again.strip() == "Paris is the capital."
+    assert llm.calls == 1
+    list(cached.stream([{"role": "user", "content": "far"}]))
+    assert llm.calls == 2
+
+
+def test_failed_stream_is_not_cached():
+    class Failing(_LLM):
+        def stream(self, messages, temperature=0.7):
+            self.calls += 1
+            yield StreamChunk("Half ", index=0)
+            yield StreamChunk.failure("connection reset")
+
+    llm = Failing("")
+    cached = SemanticCachedLLM(llm, _cache(threshold=0.9))
+    for _ in range(2):
+        list(cached.stream([{"role": "user", "content": "base"}]))
+    assert llm.calls == 2
+    assert np.count_nonzero(cached.cache._used) == 0
@@ -0,0 +1,30 @@
+"""TTSCache: concurrent writers of one phrase, and round trips through disk."""
+
+import threading
+
+from modules.tts_cache import TTSCache
+from piper_tts import PcmChunk
+
+
+def test_concurrent_puts_of_one_phrase(tmp_path):
+    cache = TTSCache(tmp_path, "voice", "cfg")
+    chunks = [PcmChunk(bytes([i]) * 200_000, 22050, 2, 1) for i in range(8)]
+    errors = []
+
+    def put(chunk):
+        try:
+            cache.put("Hello! I'm ready when you are.", chunk)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=put, args=(c,)) for c in chunks]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert not list(tmp_path.glob("*.tmp"))
+
+    fresh = TTSCache(tmp_path, "voice", "cfg")          # read back from disk, not the hot tier
+    pcm = fresh.get("Hello!  I'm ready when you are.").pcm
+    assert len(pcm) == 200_000 and len(set(pcm)) == 1   # one writer's bytes, not an interleaving
@@ -0,0 +1,56 @@
+"""TurnTrace stage derivation, fed through a SpeechPipeline like stream_and_speak does."""
+
+import time
+
+from modules.speech_pipeline import SpeechPipeline
+from modules.turn_trace import TurnTrace
+
+
+def test_pipeline_turn(monkeypatch):
+    recorded = []
+    monkeypatch.setattr("modules.turn_trace.bench.value",
+                        lambda name, v, **extra: recorded.append((name, v, extra)))
+
+    trace = TurnTrace("test")
+    trace.stamp("press")
+    time.sleep(0.02)
+    trace.stamp("release")
+    trace.stamp("transcript")
+    trace.stamp("llm_request")
+    trace.stamp("first_token")
+
+    pipeline = SpeechPipeline(lambda text: [text.encode()] * 2, lambda pcm: time.sleep(0.01), trace=trace)
+    for sentence in ("One.", "Two."):
+        trace.stamp("first_sentence")
+        pipeline.submit(sentence)
+    pipeline.close()
+    timings = trace.finish()
+
+    assert timings["record"] >= 0.02
+    assert 0.0 <= timings["release_to_first_audio"] <= timings["press_to_done"]
+    assert timings["press_to_done"] >= timings["record"] + 0.04   # four 10 ms pieces played
+    assert trace.finish() == {}                                    # only once
+
+    recorded = [r for r in recorded if r[0].startswith("turn.")]
+    names = [name for name, _, _ in recorded]
+    assert names.count("turn.synth_s") == 2 and names.count("turn.play_s") == 2
+    assert [e["sentence"] for n, _, e in recorded if n == "turn.play_s"] == [0, 1]
+    assert all(e["trace"] == trace.id for _, _, e in recorded)
+    assert all(e["outcome"] == "answer" for n, _, e in recorded if n != "turn.synth_s" and n != "turn.play_s")
+    assert {"turn.release_to_first_audio_s", "turn.press_to_done_s", "turn.llm_first_sentence_s"} <= set(names)
+
+
+def test_canned_reply_skips_the_headline(monkeypatch):
+    recorded = []
+    monkeypatch.setattr("modules.turn_trace.bench.value",
+                        lambda name, v, **extra: recorded.append((name, v, extra)))
+
+    trace = TurnTrace("test")
+    for point in ("press", "release", "transcript", "first_audio"):
+        trace.stamp(point)
+    trace.outcome = "no_input"
+    timings = trace.finish()
+
+    assert set(timings) == {"record", "transcribe"}
+    assert {name for name, _, _ in recorded} == {"turn.record_s", "turn.transcribe_s"}
+    assert all(e["outcome"] == "no_input" for _, _, e in recorded)
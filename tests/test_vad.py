@@ -0,0 +1,74 @@
+"""VoiceActivityDetector onset and endpoint on synthetic frames (noise, tone bursts, hiss)."""
+
+import numpy as np
+
+from modules.vad import SPEECH_END, SPEECH_START, VoiceActivityDetector
+
+RATE = 16000
+
+
+def _noise(seconds, rng, sd=60):
+    return rng.normal(0, sd, int(RATE * seconds))
+
+
+def _tone(seconds, amplitude=6000, hz=220):
+    t = np.arange(int(RATE * seconds)) / RATE
+    return amplitude * np.sin(2 * np.pi * hz * t)
+
+
+def _feed(vad, signal, block=2048):
+    """(event, samples consumed when it fired) for every event, in capture-sized blocks."""
+    pcm = np.clip(signal, -32768, 32767).astype(np.int16).tobytes()
+    events = []
+    for off in range(0, len(pcm), block * 2):
+        event = vad.accept(pcm[off:off + block * 2])
+        if event:
+            events.append((event, vad.samples))
+    return events
+
+
+def test_onset_and_endpoint():
+    rng = np.random.default_rng(0)
+    vad = VoiceActivityDetector(sample_rate=RATE, tail_ms=300, onset_ms=60)
+    signal = np.concatenate((_noise(0.5, rng), _tone(0.8) + _noise(0.8, rng), _noise(1.0, rng)))
+    events = _feed(vad, signal)
+
+    assert [e for e, _ in events] == [SPEECH_START, SPEECH_END]
+    assert abs(vad.speech_start_sample - 0.5 * RATE) <= vad.frame
+    # The endpoint is the tail (hangover) after the last speech frame
+    assert abs(vad.speech_end_sample - (1.3 + 0.3) * RATE) <= 2 * vad.frame
+    assert not vad.in_speech
+
+
+def test_blip_shorter_than_onset_is_ignored():
+    rng = np.random.default_rng(1)
+    vad = VoiceActivityDetector(sample_rate=RATE, onset_ms=100)
+    signal = np.concatenate((_noise(0.5, rng), _tone(0.04), _noise(0.5, rng)))
+    assert _feed(vad, signal) == []
+    assert vad.speech_start_sample is None
+
+
+def test_pause_shorter_than_tail_keeps_the_utterance_open():
+    rng = np.random.default_rng(2)
+    vad = VoiceActivityDetector(sample_rate=RATE, tail_ms=400)
+    signal = np.concatenate((_noise(0.5, rng), _tone(0.4), _noise(0.2, rng), _tone(0.4), _noise(1.0, rng)))
+    assert [e for e, _ in _feed(vad, signal)] == [SPEECH_START, SPEECH_END]
+    assert abs(vad.speech_end_sample - (1.5 + 0.4) * RATE) <= 2 * vad.frame
+
+
+def test_quiet_hiss_counts_through_the_zero_crossing_rate():
+    rng = np.random.default_rng(3)
+    vad = VoiceActivityDetector(sample_rate=RATE, margin_db=12.0)
+    # ~9 dB over the floor: under the energy margin, over half of it, and white noise crosses zero often
+    signal = np.concatenate((_noise(0.5, rng), _noise(0.5, rng, sd=170), _noise(1.0, rng)))
+    assert [e for e, _ in _feed(vad, signal)] == [SPEECH_START, SPEECH_END]
+    assert _feed(VoiceActivityDetector(sample_rate=RATE, zcr_unvoiced=1.0), signal) == []   # energy alone: no
+
+
+def test_odd_sized_blocks_match_frame_aligned_ones():
+    rng = np.random.default_rng(4)
+    signal = np.concatenate((_noise(0.3, rng), _tone(0.5), _noise(0.8, rng)))
+    a, b = VoiceActivityDetector(sample_rate=RATE), VoiceActivityDetector(sample_rate=RATE)
+    _feed(a, signal, block=320)
+    _feed(b, signal, block=1001)
+    assert (a.speech_start_sample, a.speech_end_sample) == (b.speech_start_sample, b.speech_end_sample)
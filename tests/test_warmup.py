@@ -0,0 +1,34 @@
+"""Warmup: concurrent start, failure, retry on a warm-up thread, warmup.total_s once."""
+
+import threading
+
+from modules.warmup import ALL_READY, DEGRADED, FAILED, READY, Warmup
+
+
+def test_retry_runs_off_the_calling_thread(monkeypatch):
+    totals = []
+    monkeypatch.setattr("modules.warmup.bench.value", lambda name, v, **extra: totals.append(extra)
+                        if name == "warmup.total_s" else None)
+    attempts = []
+    release = threading.Event()
+
+    def load():
+        attempts.append(threading.current_thread().name)
+        if len(attempts) == 1:
+            raise RuntimeError("model missing")
+        release.wait(5)
+        return "model"
+
+    warmup = Warmup().add("fast", lambda: 1).add("flaky", load).start()
+    assert warmup.wait("fast", 5) and not warmup.wait("flaky", 5)
+    assert warmup.component_state("flaky") == FAILED and warmup.state == DEGRADED
+
+    assert warmup.retry("flaky", timeout=0) is False        # returns at once, loads in the background
+    assert warmup.retry("flaky", timeout=0) is False        # already running: no second attempt
+    release.set()
+    assert warmup.retry("flaky", timeout=5) is True
+    assert len(attempts) == 2
+    assert attempts[1].startswith("warmup-") and attempts[1] != threading.current_thread().name
+    assert warmup.component_state("flaky") == READY and warmup.state == ALL_READY
+    assert "flaky" not in warmup.errors
+    assert totals == [{"state": DEGRADED}]                  # settled once; the retry doesn't re-emit
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+tts_stream_bench.py — File-based vs streaming Piper synthesis.
+- Time to first sample: when could playback start?
+- Real-time factor: synthesis seconds per second of audio (< 1 is faster than real time).
+- Emits JSONL metrics if bench.py is enabled.
+
+Run from the project root:  python -m tests.tts_stream_bench --repeat 3
+"""
+
+from __future__ import annotations
+import time, wave, argparse, tempfile
+from pathlib import Path
+
+from bench import bench
+from piper_tts import synthesize_to_file, synthesize_stream
+
+SENTENCES = [
+    "Sure.",
+    "The weather today looks mild, with a light breeze from the west and clouds later on.",
+    "If you want, I can walk you through the recipe step by step, starting with the dough, "
+    "then the filling, and finally how long it needs in the oven before it is golden brown.",
+]
+
+
+def bench_file(text: str, out: Path) -> tuple[float, float]:
+    t0 = time.perf_counter()
+    synthesize_to_file(text, out)
+    total = time.perf_counter() - t0
+    with wave.open(str(out), "rb") as wf:
+        audio_s = wf.getnframes() / wf.getframerate()
+    # Nothing can play before the file is complete
+    return total, total / audio_s
+
+
+def bench_stream(text: str, split_clauses: bool) -> tuple[float, float]:
+    t0 = time.perf_counter()
+    first = None
+    frames = 0
+    rate = 1
+    for chunk in synthesize_stream(text, split_clauses=split_clauses):
+        if first is None:
+            first = time.perf_counter() - t0
+        frames += len(chunk.pcm) // (chunk.sample_width * chunk.channels)
+        rate = chunk.sample_rate
+    total = time.perf_counter() - t0
+    return first, total / (frames / rate)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    bench.start()
+    # First synthesis pays for onnxruntime warm-up; keep it out of the numbers
+    list(synthesize_stream("Warm up."))
+
+    print(f"{'words':>5}  {'mode':<14} {'first_s':>8} {'rtf':>6}")
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp) / "bench.wav"
+        for text in SENTENCES:
+            words = len(text.split())
+            for mode in ("file", "stream", "stream+clauses"):
+                firsts, rtfs = [], []
+                for _ in range(args.repeat):
+                    if mode == "file":
+                        first, rtf = bench_file(text, out)
+                    else:
+                        first, rtf = bench_stream(text, split_clauses=(mode == "stream+clauses"))
+                    firsts.append(first)
+                    rtfs.append(rtf)
+                    bench.value("tts.bench.first_sample_s", first, mode=mode, words=words)
+                    bench.value("tts.bench.rtf", rtf, mode=mode, words=words)
+                print(f"{words:>5}  {mode:<14} {min(firsts):>8.3f} {min(rtfs):>6.3f}")
+    bench.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+vad_bench.py — CPU cost of the hands-free VAD.
+- Feeds harvard_16k.wav (plus leading/trailing noise) through the VAD in capture-sized blocks.
+- Reports CPU milliseconds per second of audio and the detected utterances.
+- Emits JSONL metrics if bench.py is enabled.
+
+Run from the project root:  python -m tests.vad_bench --tail-ms 300
+"""
+
+from __future__ import annotations
+import time, wave, argparse
+from pathlib import Path
+
+import numpy as np
+
+from bench import bench
+from modules.vad import VoiceActivityDetector, SPEECH_START, SPEECH_END
+
+HERE = Path(__file__).resolve().parent
+
+
+def load(wav_path: Path, noise_s: float) -> tuple[bytes, int]:
+    with wave.open(str(wav_path), "rb") as wf:
+        assert wf.getnchannels() == 1 and wf.getsampwidth() == 2, "Expected 16-bit mono WAV"
+        rate = wf.getframerate()
+        speech = wf.readframes(wf.getnframes())
+    noise = np.random.default_rng(0).normal(0, 60, int(rate * noise_s)).astype(np.int16).tobytes()
+    return noise + speech + noise, rate
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--wav", type=str, default=str(HERE / "harvard_16k.wav"))
+    ap.add_argument("--block", type=int, default=2048, help="Samples per capture block")
+    ap.add_argument("--tail-ms", type=int, default=300)
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    bench.start()
+    pcm, rate = load(Path(args.wav), noise_s=1.0)
+    audio_s = len(pcm) / 2 / rate
+    step = args.block * 2
+    blocks = [memoryview(pcm)[i:i + step] for i in range(0, len(pcm), step)]
+
+    vad = VoiceActivityDetector(rate, tail_ms=args.tail_ms)
+    events = []
+    for block in blocks:
+        ev = vad.accept(block)
+        if ev == SPEECH_START:
+            events.append(("start", vad.speech_start_sample / rate))
+        elif ev == SPEECH_END:
+            events.append(("end", vad.speech_end_sample / rate))
+
+    cpu = []
+    for _ in range(args.repeat):
+        vad.reset()
+        t0 = time.process_time()
+        for block in blocks:
+            vad.accept(block)
+        cpu.append(time.process_time() - t0)
+    ms_per_s = min(cpu) / audio_s * 1000
+    bench.value("vad.cpu_ms_per_audio_s", ms_per_s, block=args.block, tail_ms=args.tail_ms)
+
+    print(f"audio {audio_s:.1f}s in {len(blocks)} blocks of {args.block} samples")
+    print(f"VAD CPU: {ms_per_s:.2f} ms per second of audio ({ms_per_s / 10:.2f}% of one core)")
+    for kind, t in events:
+        print(f"  {kind:<5} {t:6.2f}s")
+    bench.stop()
+
+
+if __name__ == "__main__":
+    main()